@@ -11,29 +11,29 @@ import sys
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-# Import your models
-from app.database import Base
-from app.models import User, Project, Calculation, UserSettings
-
-# Import settings for database URL
-from app.utils.config import settings
+# Import your models (all of them, so autogenerate sees every table)
+from app.database import Base, DATABASE_URL
+import app.models  # noqa: F401
 
 # this is the Alembic Config object
 config = context.config
 
-# Interpret the config file for Python logging
-if config.config_file_name is not None:
-    fileConfig(config.config_file_name)
+# Interpret the config file for Python logging (not when the app runs migrations in-process)
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
 
-# Set the SQLALCHEMY_DATABASE_URL from settings
-config.set_main_option('sqlalchemy.url', settings.DATABASE_URL)
+# Set the SQLALCHEMY_DATABASE_URL from DATABASE_URL (psycopg3 driver, like the app)
+config.set_main_option('sqlalchemy.url', DATABASE_URL.replace('%', '%%'))
 
 # Add models to metadata
 target_metadata = Base.metadata
 
 # Other values from the config
 def get_url():
-    return settings.DATABASE_URL
+    return DATABASE_URL
+
+# Serializes concurrent `migrate` runs (several machines releasing at once)
+MIGRATION_LOCK_ID = 7245001
 
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode."""
@@ -66,6 +66,7 @@ def run_migrations_online() -> None:
         )
 
         with context.begin_transaction():
+            connection.exec_driver_sql(f"SELECT pg_advisory_xact_lock({MIGRATION_LOCK_ID})")
             context.run_migrations()
 
 
@@ -0,0 +1,687 @@
+# backend/alembic/versions/0001_baseline.py
+# Baseline: the tables and SQL migration scripts as of the first revision, frozen
+
+"""baseline schema
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-19
+
+The DDL below is a frozen copy (tables as the models defined them, plus the
+backend/*.sql scripts of the time), not the live models: later schema changes
+go in new revisions, so a fresh database and an upgraded one stay identical.
+
+Idempotent, so it also adopts databases created by the former startup-time
+init_db (run `python manage_db.py migrate` once on those): existing tables are
+left as they are, like create_all(), and the scripts only apply what is missing.
+
+Downgrading drops every table the baseline creates, with all data.
+"""
+from alembic import op
+from sqlalchemy import text
+
+# revision identifiers, used by Alembic.
+revision = '0001_baseline'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# (table, CREATE TABLE and its indexes), in dependency order; created when missing
+TABLES = [
+    ("users", """
+CREATE TABLE users (
+    id SERIAL NOT NULL,
+    email VARCHAR(255) NOT NULL,
+    hashed_password VARCHAR(255) NOT NULL,
+    is_active BOOLEAN NOT NULL,
+    is_verified BOOLEAN NOT NULL,
+    is_superuser BOOLEAN NOT NULL,
+    token_version INTEGER DEFAULT '0' NOT NULL,
+    reset_token VARCHAR(255),
+    reset_token_expires TIMESTAMP WITH TIME ZONE,
+    full_name VARCHAR(255),
+    company VARCHAR(255),
+    license_number VARCHAR(100),
+    phone VARCHAR(50),
+    bio TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+    last_login_at TIMESTAMP WITH TIME ZONE,
+    PRIMARY KEY (id)
+);
+
+CREATE UNIQUE INDEX ix_users_email ON users (email);
+
+CREATE INDEX ix_users_id ON users (id);
+"""),
+    ("audit_logs", """
+CREATE TABLE audit_logs (
+    id SERIAL NOT NULL,
+    user_id INTEGER,
+    action VARCHAR(100) NOT NULL,
+    resource_type VARCHAR(50),
+    resource_id VARCHAR(100),
+    ip_address INET,
+    user_agent TEXT,
+    details JSONB,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+    PRIMARY KEY (id),
+    FOREIGN KEY(user_id) REFERENCES users (id) ON DELETE SET NULL
+);
+
+CREATE INDEX ix_audit_logs_action ON audit_logs (action);
+
+CREATE INDEX ix_audit_logs_created_at ON audit_logs (created_at);
+
+CREATE INDEX ix_audit_logs_id ON audit_logs (id);
+
+CREATE INDEX ix_audit_logs_resource_id ON audit_logs (resource_id);
+
+CREATE INDEX ix_audit_logs_resource_type ON audit_logs (resource_type);
+
+CREATE INDEX ix_audit_logs_user_id ON audit_logs (user_id);
+"""),
+    ("feedback_posts", """
+CREATE TABLE feedback_posts (
+    id SERIAL NOT NULL,
+    user_id INTEGER NOT NULL,
+    title VARCHAR(500) NOT NULL,
+    content TEXT NOT NULL,
+    category VARCHAR(50) NOT NULL,
+    is_pinned BOOLEAN NOT NULL,
+    is_locked BOOLEAN NOT NULL,
+    is_resolved BOOLEAN NOT NULL,
+    view_count INTEGER NOT NULL,
+    like_count INTEGER NOT NULL,
+    reply_count INTEGER NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+    search_vector TSVECTOR GENERATED ALWAYS AS (setweight(to_tsvector('english', coalesce(title, '')), 'A') || setweight(to_tsvector('english', coalesce(content, '')), 'B') || setweight(to_tsvector('french', coalesce(title, '')), 'A') || setweight(to_tsvector('french', coalesce(content, '')), 'B')) STORED,
+    PRIMARY KEY (id),
+    FOREIGN KEY(user_id) REFERENCES users (id) ON DELETE CASCADE
+);
+
+CREATE INDEX ix_feedback_posts_category ON feedback_posts (category);
+
+CREATE INDEX ix_feedback_posts_created_at ON feedback_posts (created_at);
+
+CREATE INDEX ix_feedback_posts_id ON feedback_posts (id);
+
+CREATE INDEX ix_feedback_posts_search_vector ON feedback_posts USING gin (search_vector);
+
+CREATE INDEX ix_feedback_posts_user_id ON feedback_posts (user_id);
+"""),
+    ("projects", """
+CREATE TABLE projects (
+    id SERIAL NOT NULL,
+    owner_id INTEGER NOT NULL,
+    name VARCHAR(200) NOT NULL,
+    description TEXT,
+    location VARCHAR(200),
+    client_name VARCHAR(200),
+    is_archived BOOLEAN NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+    search_vector TSVECTOR GENERATED ALWAYS AS (setweight(to_tsvector('english', coalesce(name, '')), 'A') || setweight(to_tsvector('english', coalesce(client_name, '')), 'A') || setweight(to_tsvector('english', coalesce(location, '')), 'B') || setweight(to_tsvector('english', coalesce(description, '')), 'C') || setweight(to_tsvector('french', coalesce(name, '')), 'A') || setweight(to_tsvector('french', coalesce(client_name, '')), 'A') || setweight(to_tsvector('french', coalesce(location, '')), 'B') || setweight(to_tsvector('french', coalesce(description, '')), 'C')) STORED,
+    PRIMARY KEY (id),
+    FOREIGN KEY(owner_id) REFERENCES users (id) ON DELETE CASCADE
+);
+
+CREATE INDEX ix_projects_client_name ON projects (client_name);
+
+CREATE INDEX ix_projects_client_name_trgm ON projects USING gin (client_name gin_trgm_ops);
+
+CREATE INDEX ix_projects_created_at ON projects (created_at);
+
+CREATE INDEX ix_projects_id ON projects (id);
+
+CREATE INDEX ix_projects_is_archived ON projects (is_archived);
+
+CREATE INDEX ix_projects_name ON projects (name);
+
+CREATE INDEX ix_projects_name_trgm ON projects USING gin (name gin_trgm_ops);
+
+CREATE INDEX ix_projects_owner_id ON projects (owner_id);
+
+CREATE INDEX ix_projects_search_vector ON projects USING gin (search_vector);
+"""),
+    ("user_settings", """
+CREATE TABLE user_settings (
+    id SERIAL NOT NULL,
+    user_id INTEGER NOT NULL,
+    language VARCHAR(10) NOT NULL,
+    theme VARCHAR(20) NOT NULL,
+    font_size VARCHAR(20) NOT NULL,
+    auto_save BOOLEAN NOT NULL,
+    cec_version VARCHAR(20) NOT NULL,
+    default_voltage INTEGER NOT NULL,
+    default_phase INTEGER NOT NULL,
+    email_notifications BOOLEAN NOT NULL,
+    calculation_reminders BOOLEAN NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+    PRIMARY KEY (id),
+    FOREIGN KEY(user_id) REFERENCES users (id) ON DELETE CASCADE
+);
+
+CREATE INDEX ix_user_settings_id ON user_settings (id);
+
+CREATE UNIQUE INDEX ix_user_settings_user_id ON user_settings (user_id);
+"""),
+    ("calculation_jobs", """
+CREATE TABLE calculation_jobs (
+    job_id UUID NOT NULL,
+    user_id INTEGER NOT NULL,
+    project_id INTEGER,
+    status VARCHAR(20) NOT NULL,
+    inputs JSONB NOT NULL,
+    result_id VARCHAR(36),
+    error TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+    started_at TIMESTAMP WITH TIME ZONE,
+    completed_at TIMESTAMP WITH TIME ZONE,
+    estimated_time_ms INTEGER,
+    PRIMARY KEY (job_id),
+    FOREIGN KEY(user_id) REFERENCES users (id) ON DELETE CASCADE,
+    FOREIGN KEY(project_id) REFERENCES projects (id) ON DELETE SET NULL
+);
+
+CREATE INDEX ix_calculation_jobs_created_at ON calculation_jobs (created_at);
+
+CREATE INDEX ix_calculation_jobs_project_id ON calculation_jobs (project_id);
+
+CREATE INDEX ix_calculation_jobs_result_id ON calculation_jobs (result_id);
+
+CREATE INDEX ix_calculation_jobs_status ON calculation_jobs (status);
+
+CREATE INDEX ix_calculation_jobs_user_id ON calculation_jobs (user_id);
+"""),
+    ("calculations", """
+CREATE TABLE calculations (
+    id VARCHAR(36) NOT NULL,
+    project_id INTEGER NOT NULL,
+    building_type VARCHAR(50) NOT NULL,
+    calculation_type VARCHAR(50) NOT NULL,
+    code_edition VARCHAR(10) NOT NULL,
+    code_type VARCHAR(10) NOT NULL,
+    inputs JSONB,
+    results JSONB,
+    steps JSONB,
+    warnings JSONB,
+    engine_version VARCHAR(50),
+    engine_commit VARCHAR(64),
+    bundle_hash VARCHAR(128),
+    cold_storage_key VARCHAR(255),
+    offloaded_at TIMESTAMP WITH TIME ZONE,
+    is_signed BOOLEAN NOT NULL,
+    signature JSONB,
+    signed_at TIMESTAMP WITH TIME ZONE,
+    signed_by VARCHAR(200),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+    calculation_time_ms INTEGER,
+    deleted_at TIMESTAMP WITH TIME ZONE,
+    PRIMARY KEY (id, created_at),
+    FOREIGN KEY(project_id) REFERENCES projects (id) ON DELETE CASCADE
+) PARTITION BY RANGE (created_at);
+
+CREATE INDEX ix_calculations_building_type ON calculations (building_type);
+
+CREATE INDEX ix_calculations_calculation_type ON calculations (calculation_type);
+
+CREATE INDEX ix_calculations_code_edition ON calculations (code_edition);
+
+CREATE INDEX ix_calculations_created_at ON calculations (created_at);
+
+CREATE INDEX ix_calculations_deleted_at ON calculations (deleted_at);
+
+CREATE INDEX ix_calculations_is_signed ON calculations (is_signed);
+
+CREATE INDEX ix_calculations_offload_candidates ON calculations (created_at) WHERE is_signed IS true AND cold_storage_key IS NULL;
+
+CREATE INDEX ix_calculations_project_id ON calculations (project_id);
+
+CREATE INDEX ix_calculations_project_live_created ON calculations (project_id, created_at DESC) WHERE deleted_at IS NULL;
+"""),
+    ("feedback_post_likes", """
+CREATE TABLE feedback_post_likes (
+    id SERIAL NOT NULL,
+    post_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+    PRIMARY KEY (id),
+    CONSTRAINT uq_feedback_post_likes_post_user UNIQUE (post_id, user_id),
+    FOREIGN KEY(post_id) REFERENCES feedback_posts (id) ON DELETE CASCADE,
+    FOREIGN KEY(user_id) REFERENCES users (id) ON DELETE CASCADE
+);
+
+CREATE INDEX ix_feedback_post_likes_id ON feedback_post_likes (id);
+
+CREATE INDEX ix_feedback_post_likes_post_id ON feedback_post_likes (post_id);
+
+CREATE INDEX ix_feedback_post_likes_user_id ON feedback_post_likes (user_id);
+"""),
+    ("feedback_replies", """
+CREATE TABLE feedback_replies (
+    id SERIAL NOT NULL,
+    post_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    parent_reply_id INTEGER,
+    content TEXT NOT NULL,
+    is_edited BOOLEAN NOT NULL,
+    like_count INTEGER NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+    PRIMARY KEY (id),
+    FOREIGN KEY(post_id) REFERENCES feedback_posts (id) ON DELETE CASCADE,
+    FOREIGN KEY(user_id) REFERENCES users (id) ON DELETE CASCADE,
+    FOREIGN KEY(parent_reply_id) REFERENCES feedback_replies (id) ON DELETE CASCADE
+);
+
+CREATE INDEX ix_feedback_replies_created_at ON feedback_replies (created_at);
+
+CREATE INDEX ix_feedback_replies_id ON feedback_replies (id);
+
+CREATE INDEX ix_feedback_replies_parent_reply_id ON feedback_replies (parent_reply_id);
+
+CREATE INDEX ix_feedback_replies_post_id ON feedback_replies (post_id);
+
+CREATE INDEX ix_feedback_replies_user_id ON feedback_replies (user_id);
+"""),
+    ("feedback_reply_likes", """
+CREATE TABLE feedback_reply_likes (
+    id SERIAL NOT NULL,
+    reply_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+    PRIMARY KEY (id),
+    CONSTRAINT uq_feedback_reply_likes_reply_user UNIQUE (reply_id, user_id),
+    FOREIGN KEY(reply_id) REFERENCES feedback_replies (id) ON DELETE CASCADE,
+    FOREIGN KEY(user_id) REFERENCES users (id) ON DELETE CASCADE
+);
+
+CREATE INDEX ix_feedback_reply_likes_id ON feedback_reply_likes (id);
+
+CREATE INDEX ix_feedback_reply_likes_reply_id ON feedback_reply_likes (reply_id);
+
+CREATE INDEX ix_feedback_reply_likes_user_id ON feedback_reply_likes (user_id);
+"""),
+]
+
+# backend/*.sql migration scripts, in order (stat counter triggers attach to the partitioned table)
+SCRIPTS = [
+    ("migrate_feedback_like_unique.sql", """
+-- Migration: One like per user per post/reply
+-- Removes duplicate likes left by the old read-then-write toggle, adds the unique
+-- constraints the atomic toggle (INSERT ... ON CONFLICT) relies on, and re-syncs
+-- the denormalized like_count columns.
+
+DO $$
+BEGIN
+    -- Post likes
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint WHERE conname = 'uq_feedback_post_likes_post_user'
+    ) THEN
+        DELETE FROM feedback_post_likes a
+        USING feedback_post_likes b
+        WHERE a.post_id = b.post_id AND a.user_id = b.user_id AND a.id > b.id;
+
+        ALTER TABLE feedback_post_likes
+            ADD CONSTRAINT uq_feedback_post_likes_post_user UNIQUE (post_id, user_id);
+
+        UPDATE feedback_posts p
+        SET like_count = (SELECT COUNT(*) FROM feedback_post_likes l WHERE l.post_id = p.id);
+
+        RAISE NOTICE 'Added uq_feedback_post_likes_post_user and re-synced post like counts';
+    END IF;
+
+    -- Reply likes
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint WHERE conname = 'uq_feedback_reply_likes_reply_user'
+    ) THEN
+        DELETE FROM feedback_reply_likes a
+        USING feedback_reply_likes b
+        WHERE a.reply_id = b.reply_id AND a.user_id = b.user_id AND a.id > b.id;
+
+        ALTER TABLE feedback_reply_likes
+            ADD CONSTRAINT uq_feedback_reply_likes_reply_user UNIQUE (reply_id, user_id);
+
+        UPDATE feedback_replies r
+        SET like_count = (SELECT COUNT(*) FROM feedback_reply_likes l WHERE l.reply_id = r.id);
+
+        RAISE NOTICE 'Added uq_feedback_reply_likes_reply_user and re-synced reply like counts';
+    END IF;
+END $$;
+"""),
+    ("migrate_search_indexes.sql", """
+-- Migration: Full-text search for feedback posts and projects
+-- Adds generated tsvector columns (English + French) with GIN indexes, plus
+-- pg_trgm indexes for fuzzy matching on project names and clients.
+-- Expressions must match app/utils/search.py (weighted_tsvector_sql).
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+ALTER TABLE feedback_posts ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(content, '')), 'B') ||
+        setweight(to_tsvector('french', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('french', coalesce(content, '')), 'B')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS ix_feedback_posts_search_vector
+    ON feedback_posts USING gin (search_vector);
+
+ALTER TABLE projects ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(client_name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(location, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'C') ||
+        setweight(to_tsvector('french', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('french', coalesce(client_name, '')), 'A') ||
+        setweight(to_tsvector('french', coalesce(location, '')), 'B') ||
+        setweight(to_tsvector('french', coalesce(description, '')), 'C')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS ix_projects_search_vector
+    ON projects USING gin (search_vector);
+CREATE INDEX IF NOT EXISTS ix_projects_name_trgm
+    ON projects USING gin (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_projects_client_name_trgm
+    ON projects USING gin (client_name gin_trgm_ops);
+"""),
+    ("migrate_calculations_partitioning.sql", """
+-- Migration: Monthly range partitioning of calculations by created_at
+-- - Partition management functions (idempotent, safe to re-run at every startup)
+-- - One-time conversion of an existing plain calculations table:
+--     calculations -> calculations_legacy, new partitioned calculations, rows copied.
+--     calculations_legacy is kept until verified, then: DROP TABLE calculations_legacy;
+--   For very large tables run this script in a maintenance window: the copy holds
+--   an ACCESS EXCLUSIVE lock on the old table.
+-- - Current month plus CALCULATIONS_PARTITION_MONTHS_AHEAD months of partitions
+--
+-- Partitions are named calculations_pYYYY_MM, bounds are UTC month starts.
+-- Rows outside every partition land in calculations_default, which
+-- calculations_ensure_partitions() drains when it creates the matching month.
+-- Detach/archive of old months: see manage_partitions.py.
+
+CREATE OR REPLACE FUNCTION calculations_partition_name(p_month TIMESTAMPTZ) RETURNS TEXT AS $$
+    SELECT 'calculations_p' || to_char(p_month AT TIME ZONE 'UTC', 'YYYY_MM');
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Create monthly partitions from the month of p_from up to p_months_ahead months
+-- after the current month. Returns the number of partitions created.
+CREATE OR REPLACE FUNCTION calculations_ensure_partitions(
+    p_from TIMESTAMPTZ,
+    p_months_ahead INTEGER
+) RETURNS INTEGER AS $$
+DECLARE
+    v_month TIMESTAMPTZ := date_trunc('month', p_from AT TIME ZONE 'UTC') AT TIME ZONE 'UTC';
+    v_last TIMESTAMPTZ := (date_trunc('month', now() AT TIME ZONE 'UTC')
+                           + make_interval(months => p_months_ahead)) AT TIME ZONE 'UTC';
+    v_next TIMESTAMPTZ;
+    v_name TEXT;
+    v_created INTEGER := 0;
+BEGIN
+    -- Serialize concurrent callers (every worker runs the maintenance loop)
+    PERFORM pg_advisory_xact_lock(hashtext('calculations_ensure_partitions'));
+
+    IF to_regclass('calculations_default') IS NULL THEN
+        CREATE TABLE calculations_default PARTITION OF calculations DEFAULT;
+    END IF;
+
+    WHILE v_month <= v_last LOOP
+        v_next := ((v_month AT TIME ZONE 'UTC') + INTERVAL '1 month') AT TIME ZONE 'UTC';
+        v_name := calculations_partition_name(v_month);
+
+        IF to_regclass(v_name) IS NULL THEN
+            IF EXISTS (
+                SELECT 1 FROM calculations_default
+                WHERE created_at >= v_month AND created_at < v_next
+            ) THEN
+                -- Rows for this month are in the default partition: move them into a
+                -- standalone table, then attach it (direct partition DML does not fire
+                -- the statement-level stat counter triggers on calculations)
+                EXECUTE format(
+                    'CREATE TABLE %I (LIKE calculations INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+                    v_name
+                );
+                EXECUTE format(
+                    'WITH moved AS (DELETE FROM calculations_default '
+                    'WHERE created_at >= %L AND created_at < %L RETURNING *) '
+                    'INSERT INTO %I SELECT * FROM moved',
+                    v_month, v_next, v_name
+                );
+                EXECUTE format(
+                    'ALTER TABLE calculations ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                    v_name, v_month, v_next
+                );
+            ELSE
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF calculations FOR VALUES FROM (%L) TO (%L)',
+                    v_name, v_month, v_next
+                );
+            END IF;
+            v_created := v_created + 1;
+        END IF;
+
+        v_month := v_next;
+    END LOOP;
+
+    RETURN v_created;
+END;
+$$ LANGUAGE plpgsql;
+
+-- One-time conversion of a plain (non-partitioned) calculations table
+DO $$
+DECLARE
+    v_index RECORD;
+    v_oldest TIMESTAMPTZ;
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = to_regclass('calculations')) IS DISTINCT FROM 'r' THEN
+        RETURN;
+    END IF;
+
+    LOCK TABLE calculations IN ACCESS EXCLUSIVE MODE;
+
+    -- Free the index/constraint names for the new table
+    FOR v_index IN
+        SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() AND tablename = 'calculations'
+    LOOP
+        EXECUTE format('ALTER INDEX %I RENAME TO %I', v_index.indexname, left(v_index.indexname, 56) || '_legacy');
+    END LOOP;
+    ALTER TABLE calculations RENAME TO calculations_legacy;
+
+    -- Stat counters must not follow the old table
+    DROP TRIGGER IF EXISTS stat_counters_calculations_insert ON calculations_legacy;
+    DROP TRIGGER IF EXISTS stat_counters_calculations_delete ON calculations_legacy;
+
+    -- calculations.id is no longer unique on its own (primary key is (id, created_at))
+    ALTER TABLE calculation_jobs DROP CONSTRAINT IF EXISTS calculation_jobs_result_id_fkey;
+
+    CREATE TABLE calculations (
+        LIKE calculations_legacy INCLUDING DEFAULTS INCLUDING STORAGE INCLUDING COMMENTS,
+        PRIMARY KEY (id, created_at),
+        FOREIGN KEY (project_id) REFERENCES projects (id) ON DELETE CASCADE
+    ) PARTITION BY RANGE (created_at);
+
+    -- Same index names as the model (app/models/calculation.py)
+    CREATE INDEX ix_calculations_project_live_created
+        ON calculations (project_id, created_at DESC) WHERE deleted_at IS NULL;
+    CREATE INDEX ix_calculations_project_id ON calculations (project_id);
+    CREATE INDEX ix_calculations_building_type ON calculations (building_type);
+    CREATE INDEX ix_calculations_calculation_type ON calculations (calculation_type);
+    CREATE INDEX ix_calculations_code_edition ON calculations (code_edition);
+    CREATE INDEX ix_calculations_is_signed ON calculations (is_signed);
+    CREATE INDEX ix_calculations_created_at ON calculations (created_at);
+    CREATE INDEX ix_calculations_deleted_at ON calculations (deleted_at);
+
+    SELECT min(created_at) INTO v_oldest FROM calculations_legacy;
+    PERFORM calculations_ensure_partitions(coalesce(v_oldest, now()), 3);
+
+    INSERT INTO calculations SELECT * FROM calculations_legacy;
+
+    RAISE NOTICE 'calculations converted to a partitioned table; drop calculations_legacy after verification';
+END $$;
+
+-- Partitions for the current month and the next 3 months (the app extends this daily)
+SELECT calculations_ensure_partitions(now(), 3);
+"""),
+    ("migrate_stat_counters.sql", """
+-- Migration: Incrementally maintained counters for /api/v1/stats
+-- Statement-level triggers keep per-table and per-month row counts in
+-- stat_counters, so the stats endpoint never counts the big tables.
+-- Counters are sharded by backend pid: concurrent inserts update different
+-- rows instead of queueing on one hot row. Readers sum the shards.
+--
+-- Counter names: 'projects', 'calculations', 'calculations:YYYY-MM' (UTC month)
+-- After a TRUNCATE or manual bulk load that bypasses triggers, run:
+--     SELECT stat_counters_reconcile();
+
+CREATE TABLE IF NOT EXISTS stat_counters (
+    name VARCHAR(64) NOT NULL,
+    shard SMALLINT NOT NULL DEFAULT 0,
+    value BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (name, shard)
+);
+
+-- TG_ARGV[0]: counter name; TG_ARGV[1] = 'monthly' also maintains <name>:YYYY-MM
+CREATE OR REPLACE FUNCTION stat_counters_apply() RETURNS TRIGGER AS $$
+DECLARE
+    v_delta INTEGER := CASE WHEN TG_OP = 'DELETE' THEN -1 ELSE 1 END;
+    v_shard SMALLINT := pg_backend_pid() % 16;
+BEGIN
+    INSERT INTO stat_counters AS c (name, shard, value)
+    SELECT TG_ARGV[0], v_shard, v_delta * COUNT(*) FROM changed_rows HAVING COUNT(*) > 0
+    ON CONFLICT (name, shard) DO UPDATE SET value = c.value + EXCLUDED.value;
+
+    IF TG_NARGS > 1 AND TG_ARGV[1] = 'monthly' THEN
+        INSERT INTO stat_counters AS c (name, shard, value)
+        SELECT TG_ARGV[0] || ':' || to_char(created_at AT TIME ZONE 'UTC', 'YYYY-MM'),
+               v_shard, v_delta * COUNT(*)
+        FROM changed_rows
+        GROUP BY 1
+        ON CONFLICT (name, shard) DO UPDATE SET value = c.value + EXCLUDED.value;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Recompute every counter from the tables (takes a SHARE lock on both tables)
+CREATE OR REPLACE FUNCTION stat_counters_reconcile() RETURNS VOID AS $$
+BEGIN
+    LOCK TABLE projects, calculations IN SHARE MODE;
+
+    DELETE FROM stat_counters
+    WHERE name IN ('projects', 'calculations') OR name LIKE 'calculations:%';
+
+    INSERT INTO stat_counters (name, shard, value)
+    SELECT 'projects', 0, COUNT(*) FROM projects;
+
+    INSERT INTO stat_counters (name, shard, value)
+    SELECT 'calculations', 0, COUNT(*) FROM calculations;
+
+    INSERT INTO stat_counters (name, shard, value)
+    SELECT 'calculations:' || to_char(created_at AT TIME ZONE 'UTC', 'YYYY-MM'), 0, COUNT(*)
+    FROM calculations
+    GROUP BY 1;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Transition tables allow one event per trigger: separate INSERT and DELETE triggers
+DROP TRIGGER IF EXISTS stat_counters_projects_insert ON projects;
+CREATE TRIGGER stat_counters_projects_insert AFTER INSERT ON projects
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION stat_counters_apply('projects');
+
+DROP TRIGGER IF EXISTS stat_counters_projects_delete ON projects;
+CREATE TRIGGER stat_counters_projects_delete AFTER DELETE ON projects
+    REFERENCING OLD TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION stat_counters_apply('projects');
+
+DROP TRIGGER IF EXISTS stat_counters_calculations_insert ON calculations;
+CREATE TRIGGER stat_counters_calculations_insert AFTER INSERT ON calculations
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION stat_counters_apply('calculations', 'monthly');
+
+DROP TRIGGER IF EXISTS stat_counters_calculations_delete ON calculations;
+CREATE TRIGGER stat_counters_calculations_delete AFTER DELETE ON calculations
+    REFERENCING OLD TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION stat_counters_apply('calculations', 'monthly');
+
+-- Initial backfill (first run only)
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM stat_counters WHERE name = 'projects') THEN
+        PERFORM stat_counters_reconcile();
+    END IF;
+END $$;
+"""),
+    ("migrate_cold_storage.sql", """
+-- Migration: Cold storage of old signed calculation bundles
+-- Offloaded rows keep bundle_hash and a pointer to the compressed blob; their
+-- JSONB bundle columns become NULL (see app/services/cold_storage.py).
+
+ALTER TABLE calculations ADD COLUMN IF NOT EXISTS cold_storage_key VARCHAR(255);
+ALTER TABLE calculations ADD COLUMN IF NOT EXISTS offloaded_at TIMESTAMPTZ;
+
+ALTER TABLE calculations ALTER COLUMN inputs DROP NOT NULL;
+ALTER TABLE calculations ALTER COLUMN results DROP NOT NULL;
+ALTER TABLE calculations ALTER COLUMN steps DROP NOT NULL;
+
+CREATE INDEX IF NOT EXISTS ix_calculations_offload_candidates
+    ON calculations (created_at)
+    WHERE is_signed IS true AND cold_storage_key IS NULL;
+"""),
+    ("migrate_token_version.sql", """
+-- Migration: Access token revocation version
+-- users.token_version is bumped on password change and deactivation; access
+-- tokens carrying an older version are rejected (see app/utils/token_versions.py).
+
+ALTER TABLE users ADD COLUMN IF NOT EXISTS token_version INTEGER NOT NULL DEFAULT 0;
+"""),
+]
+
+# Objects created by the scripts rather than TABLES
+SCRIPT_TABLES = ["stat_counters", "calculations_legacy"]
+SCRIPT_FUNCTIONS = [
+    "stat_counters_apply",
+    "stat_counters_reconcile",
+    "calculations_ensure_partitions",
+    "calculations_partition_name",
+]
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    raw = connection.execution_options(no_parameters=True)
+
+    # Extensions required by indexes (pg_trgm for fuzzy project search)
+    connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+    for table, ddl in TABLES:
+        if connection.scalar(text("SELECT to_regclass(:table)"), {"table": table}) is None:
+            raw.exec_driver_sql(ddl)
+
+    # Widen bundle_hash from VARCHAR(64) (databases created before SHA-256 prefixes)
+    length = connection.scalar(text("""
+        SELECT character_maximum_length
+        FROM information_schema.columns
+        WHERE table_name = 'calculations' AND column_name = 'bundle_hash'
+    """))
+    if length == 64:
+        connection.execute(text("ALTER TABLE calculations ALTER COLUMN bundle_hash TYPE VARCHAR(128)"))
+
+    for _, sql in SCRIPTS:
+        raw.exec_driver_sql(sql)
+
+
+def downgrade() -> None:
+    # Partitions, indexes and triggers go with their tables. pg_trgm stays
+    # installed: objects in other schemas may use it.
+    tables = SCRIPT_TABLES + [table for table, _ in reversed(TABLES)]
+    for table in tables:
+        op.execute(f'DROP TABLE IF EXISTS "{table}" CASCADE')
+    for function in SCRIPT_FUNCTIONS:
+        op.execute(f"DROP FUNCTION IF EXISTS {function} CASCADE")
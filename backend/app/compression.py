@@ -0,0 +1,217 @@
+# backend/app/compression.py
+# Response compression: Accept-Encoding negotiation (zstd, br, gzip) as ASGI middleware
+#
+# JSON and text bodies of at least COMPRESSION_MIN_SIZE bytes are compressed
+# with the best encoding both sides support (server preference order breaks
+# q-value ties). gzip is always available; br needs the brotli package and
+# zstd the zstandard package, and are skipped without them.
+#
+# A compressed body is a different representation, so a strong ETag gets the
+# encoding appended inside the quotes ("sha256:ab..-gzip", as Apache does);
+# etag_matches() in app/utils/responses.py accepts those suffixes back in
+# If-None-Match. Chunked bodies (BaseHTTPMiddleware re-streams every response)
+# are buffered until complete; the app has no long-lived streams, and
+# text/event-stream is never compressed.
+
+import gzip
+from typing import Callable, Dict, List, Optional, Sequence
+
+import anyio
+
+try:
+    import brotli
+except ImportError:  # Optional: pip install brotli
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # Optional: pip install zstandard
+    zstandard = None
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4  # Close to gzip -6 in speed, noticeably smaller
+ZSTD_LEVEL = 3
+
+# Bodies at least this large are compressed in a worker thread (zlib, brotli and
+# zstd release the GIL), so a big bundle does not block the event loop
+THREAD_MIN_SIZE = 256 * 1024
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml", "image/svg+xml")
+
+
+def _compressors() -> Dict[str, Callable[[bytes], bytes]]:
+    compressors = {}
+    if zstandard is not None:
+        # A ZstdCompressor must not be shared between threads: one per call
+        compressors["zstd"] = lambda body: zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+    if brotli is not None:
+        compressors["br"] = lambda body: brotli.compress(body, quality=BROTLI_QUALITY)
+    compressors["gzip"] = lambda body: gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    return compressors
+
+
+COMPRESSORS = _compressors()
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """
+    Parse an Accept-Encoding header.
+
+    Returns:
+        Encoding (lower case) -> q-value; malformed q-values count as 0
+    """
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+def negotiate_encoding(header: Optional[str], available: Sequence[str]) -> Optional[str]:
+    """
+    Pick the content coding for a response.
+
+    Args:
+        header: Accept-Encoding request header (None: no compression)
+        available: Server-supported codings in preference order
+
+    Returns:
+        Chosen coding, or None for identity
+    """
+    if not header:
+        return None
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for coding in available:
+        quality = accepted.get(coding, wildcard)
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """ETag of the encoded representation; weak ETags are left as they are"""
+    if etag.startswith('"') and etag.endswith('"') and len(etag) >= 2:
+        return f'{etag[:-1]}-{encoding}"'
+    return etag
+
+
+def _merge_vary(headers: List[tuple]) -> List[tuple]:
+    for index, (name, value) in enumerate(headers):
+        if name.lower() == b"vary":
+            if b"accept-encoding" not in value.lower() and value.strip() != b"*":
+                headers[index] = (name, value + b", Accept-Encoding")
+            return headers
+    headers.append((b"vary", b"Accept-Encoding"))
+    return headers
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing JSON/text responses for clients that accept it.
+
+    Responses that already have a Content-Encoding, are smaller than min_size
+    or are not a compressible type are sent unchanged.
+    """
+
+    def __init__(self, app, min_size: int = 1024, encodings: Sequence[str] = ("zstd", "br", "gzip")):
+        self.app = app
+        self.min_size = min_size
+        self.encodings = [encoding for encoding in encodings if encoding in COMPRESSORS]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.encodings:
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = None
+        for name, value in scope.get("headers", ()):
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = negotiate_encoding(accept_encoding, self.encodings)
+
+        start_message = None
+        passthrough = False
+        chunks: List[bytes] = []
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", ()))
+                content_type = ""
+                already_encoded = False
+                for name, value in headers:
+                    lowered = name.lower()
+                    if lowered == b"content-type":
+                        content_type = value.decode("latin-1").lower()
+                    elif lowered == b"content-encoding":
+                        already_encoded = True
+                compressible = content_type.startswith(COMPRESSIBLE_TYPES) and "event-stream" not in content_type
+                if already_encoded or not compressible:
+                    if message["status"] == 304 and encoding and not already_encoded:
+                        message["headers"] = self._encoded_etag_headers(headers, encoding)
+                    passthrough = True
+                    await send(message)
+                    return
+                message["headers"] = _merge_vary(headers)
+                start_message = message
+                return
+
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            if encoding is None:
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            body = b"".join(chunks)
+            if len(body) < self.min_size:
+                # Small: send the held start message unchanged
+                passthrough = True
+                await send(start_message)
+                await send({"type": "http.response.body", "body": body, "more_body": False})
+                return
+
+            compress = COMPRESSORS[encoding]
+            if len(body) >= THREAD_MIN_SIZE:
+                compressed = await anyio.to_thread.run_sync(compress, body)
+            else:
+                compressed = compress(body)
+            headers = [
+                (name, value) for name, value in self._encoded_etag_headers(start_message["headers"], encoding)
+                if name.lower() != b"content-length"
+            ]
+            headers += [(b"content-encoding", encoding.encode("latin-1")),
+                        (b"content-length", str(len(compressed)).encode("latin-1"))]
+            start_message["headers"] = headers
+            passthrough = True
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed, "more_body": False})
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def _encoded_etag_headers(headers: List[tuple], encoding: str) -> List[tuple]:
+        return [
+            (name, encoded_etag(value.decode("latin-1"), encoding).encode("latin-1"))
+            if name.lower() == b"etag" else (name, value)
+            for name, value in headers
+        ]
@@ -1,13 +1,27 @@
 # backend/app/database.py
 # Database Configuration and Connection Management
 
-from sqlalchemy import create_engine
+import logging
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession, AsyncAttrs
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
 from dotenv import load_dotenv
 load_dotenv()
 
+from fastapi import Request
+
+from .db_pool import PoolMetrics, derive_pool_size, instrumented_pool_class, env_int, env_float, env_bool
+from .db_routing import RoutingSession, ReplicaRouter, REPLICA_BIND_KEY, wants_replica
+from .metrics import REGISTRY, instrument_engine, pool_collector
+from .tracing import instrument_engine as trace_engine
+
+logger = logging.getLogger(__name__)
+
 # Get database URL from environment variable
 # Note: We use psycopg3 (psycopg package), so URL must use postgresql+psycopg://
 # SQLAlchemy 2.0+ supports psycopg3, but we must explicitly specify it in the URL
@@ -18,29 +32,208 @@ DATABASE_URL_RAW = os.getenv(
 
 # Convert to psycopg3 URL format (required for psycopg3)
 # psycopg3 uses postgresql+psycopg:// prefix
-if DATABASE_URL_RAW.startswith("postgresql://"):
-    # Convert to psycopg3 format
-    DATABASE_URL = DATABASE_URL_RAW.replace("postgresql://", "postgresql+psycopg://", 1)
-elif DATABASE_URL_RAW.startswith("postgresql+psycopg://"):
-    # Already in correct format
-    DATABASE_URL = DATABASE_URL_RAW
-elif "+" in DATABASE_URL_RAW:
-    # Has other driver prefix, keep it
-    DATABASE_URL = DATABASE_URL_RAW
-else:
+def to_psycopg_url(raw_url: str) -> str:
+    if raw_url.startswith("postgresql://"):
+        # Convert to psycopg3 format
+        return raw_url.replace("postgresql://", "postgresql+psycopg://", 1)
+    if raw_url.startswith("postgresql+psycopg://"):
+        # Already in correct format
+        return raw_url
+    if "+" in raw_url:
+        # Has other driver prefix, keep it
+        return raw_url
     # Default to psycopg3
-    DATABASE_URL = DATABASE_URL_RAW.replace("postgresql://", "postgresql+psycopg://", 1) if "://" in DATABASE_URL_RAW else DATABASE_URL_RAW
+    return raw_url.replace("postgresql://", "postgresql+psycopg://", 1) if "://" in raw_url else raw_url
+
+DATABASE_URL = to_psycopg_url(DATABASE_URL_RAW)
+
+# Read replicas (optional, comma-separated). GET requests read from a replica
+# unless its lag exceeds DB_REPLICA_MAX_LAG seconds; see app/db_routing.py
+DATABASE_REPLICA_URLS = [
+    to_psycopg_url(url.strip())
+    for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",")
+    if url.strip()
+]
+
+# Connection pool configuration (environment, like DATABASE_URL above)
+#   WEB_CONCURRENCY       uvicorn worker processes per instance (default 1)
+#   DB_MAX_CONNECTIONS    connection budget per instance and server, shared by all workers (default 40);
+#                         on the primary it covers the async and sync pools, each replica gets its own
+#   DB_POOL_SIZE / DB_MAX_OVERFLOW   explicit per-worker overrides of the derived sizes
+#   DB_SYNC_POOL_SIZE / DB_SYNC_MAX_OVERFLOW   sync engine pool per worker (default 1 / 1),
+#                         reserved from the primary budget before the async pool is sized
+#   DB_POOL_TIMEOUT       seconds to wait for a free connection (default 30)
+#   DB_POOL_RECYCLE       recycle connections older than this many seconds (default 1800)
+#   DB_POOL_PRE_PING      ping on every checkout (default off: recycle + invalidation on error)
+#   DB_EXTERNAL_POOLER    connecting through PgBouncer in transaction mode (default off)
+WEB_CONCURRENCY = env_int("WEB_CONCURRENCY", 1)
+DB_MAX_CONNECTIONS = env_int("DB_MAX_CONNECTIONS", 40)
+DB_SYNC_POOL_SIZE = env_int("DB_SYNC_POOL_SIZE", 1)  # Scripts only need a few connections
+DB_SYNC_MAX_OVERFLOW = env_int("DB_SYNC_MAX_OVERFLOW", 1)
+DB_POOL_SIZE, DB_MAX_OVERFLOW = derive_pool_size(
+    max_connections=DB_MAX_CONNECTIONS,
+    workers=WEB_CONCURRENCY,
+    pool_size=env_int("DB_POOL_SIZE", None),
+    max_overflow=env_int("DB_MAX_OVERFLOW", None),
+    reserved=DB_SYNC_POOL_SIZE + DB_SYNC_MAX_OVERFLOW,
+)
+DB_POOL_TIMEOUT = env_float("DB_POOL_TIMEOUT", 30.0)
+DB_POOL_RECYCLE = env_int("DB_POOL_RECYCLE", 1800)
+DB_POOL_PRE_PING = env_bool("DB_POOL_PRE_PING", False)
+DB_EXTERNAL_POOLER = env_bool("DB_EXTERNAL_POOLER", False)
+
+# PgBouncer in transaction mode hands each transaction to any server connection,
+# so psycopg's automatic server-side prepared statements must be disabled
+connect_args = {"prepare_threshold": None} if DB_EXTERNAL_POOLER else {}
 
-# Create database engine
+async_pool_metrics = PoolMetrics("async")
+sync_pool_metrics = PoolMetrics("sync")
+
+# Create async database engine (used by the FastAPI app)
+# psycopg3 supports asyncio natively, so the same postgresql+psycopg:// URL is used
+async_engine = create_async_engine(
+    DATABASE_URL,
+    poolclass=instrumented_pool_class(async_pool_metrics, is_async=True),
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,  # Stale connections are replaced before server/proxy idle timeouts
+    pool_pre_ping=DB_POOL_PRE_PING,
+    connect_args=connect_args,
+    echo=os.getenv("ENVIRONMENT") == "development"  # Show SQL in development mode
+)
+
+# Replica engines share the per-worker pool sizing of the primary's async engine
+# (each replica server gets the whole budget, as no sync engine connects to it)
+replica_pool_metrics = [PoolMetrics(f"replica{i}") for i in range(len(DATABASE_REPLICA_URLS))]
+replica_engines = [
+    create_async_engine(
+        url,
+        poolclass=instrumented_pool_class(metrics, is_async=True),
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        connect_args=connect_args,
+        echo=os.getenv("ENVIRONMENT") == "development"
+    )
+    for url, metrics in zip(DATABASE_REPLICA_URLS, replica_pool_metrics)
+]
+
+replica_router = ReplicaRouter(
+    replica_engines,
+    max_lag=env_float("DB_REPLICA_MAX_LAG", 5.0),
+    check_interval=env_float("DB_REPLICA_CHECK_INTERVAL", 2.0),
+    sticky_seconds=env_float("DB_REPLICA_STICKY_SECONDS", 5.0)  # Read-your-writes window after a write
+)
+
+# Create async session factory
+# expire_on_commit=False: attributes stay loaded after commit, since lazy
+# refreshes are not possible on an AsyncSession
+# RoutingSession: SELECTs go to session.info["replica_bind"] when set (primary otherwise)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    sync_session_class=RoutingSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+# Sync compatibility layer (scripts, migrations, init_db)
 engine = create_engine(
     DATABASE_URL,
-    pool_pre_ping=True,  # Verify connection before use
-    pool_size=20,        # Connection pool size
-    max_overflow=40,     # Maximum overflow connections
+    poolclass=instrumented_pool_class(sync_pool_metrics, is_async=False),
+    pool_size=DB_SYNC_POOL_SIZE,
+    max_overflow=DB_SYNC_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+    connect_args=connect_args,
     echo=os.getenv("ENVIRONMENT") == "development"  # Show SQL in development mode
 )
 
-# Create session factory
+
+def _track_disconnects(metrics: PoolMetrics):
+    """
+    Count connection-level errors.
+
+    Without pre-ping, a dead connection surfaces as an error on first use;
+    SQLAlchemy then invalidates that connection and every older pooled
+    connection, so the next checkout gets a fresh one.
+    """
+    def handle_error(context):
+        if context.is_disconnect:
+            metrics.observe_disconnect()
+    return handle_error
+
+
+event.listen(async_engine.sync_engine, "handle_error", _track_disconnects(async_pool_metrics))
+event.listen(engine, "handle_error", _track_disconnects(sync_pool_metrics))
+
+# Prometheus: SQL statement counts/durations per engine, pool gauges at scrape time
+instrument_engine(async_engine.sync_engine, "async")
+instrument_engine(engine, "sync")
+for _index, _replica in enumerate(replica_engines):
+    instrument_engine(_replica.sync_engine, f"replica{_index}")
+
+# Tracing: a db.query span per statement inside traced requests (no-op otherwise)
+for _traced in (async_engine.sync_engine, engine, *(replica.sync_engine for replica in replica_engines)):
+    trace_engine(_traced)
+
+REGISTRY.register_collector(pool_collector(lambda: [
+    ("async", async_pool_metrics, async_engine.sync_engine.pool),
+    ("sync", sync_pool_metrics, engine.pool),
+    *(
+        (metrics.name, metrics, replica.sync_engine.pool)
+        for metrics, replica in zip(replica_pool_metrics, replica_engines)
+    ),
+]))
+
+
+def connection_budget() -> dict:
+    """Maximum connections per server from every pool, per worker and for the instance"""
+    primary_per_worker = DB_POOL_SIZE + DB_MAX_OVERFLOW + DB_SYNC_POOL_SIZE + DB_SYNC_MAX_OVERFLOW
+    replica_per_worker = DB_POOL_SIZE + DB_MAX_OVERFLOW if replica_engines else 0
+    return {
+        "max_connections": DB_MAX_CONNECTIONS,
+        "primary_per_worker": primary_per_worker,
+        "primary_total": primary_per_worker * WEB_CONCURRENCY,
+        "replica_per_worker": replica_per_worker,  # Each replica server
+        "replica_total": replica_per_worker * WEB_CONCURRENCY,
+    }
+
+
+_budget = connection_budget()
+if max(_budget["primary_total"], _budget["replica_total"]) > DB_MAX_CONNECTIONS:
+    logger.warning(
+        "Connection pools allow %s connections per server (%s workers), over DB_MAX_CONNECTIONS=%s",
+        max(_budget["primary_total"], _budget["replica_total"]), WEB_CONCURRENCY, DB_MAX_CONNECTIONS
+    )
+
+
+def pool_status() -> dict:
+    """Pool configuration, connection budget and metrics for every engine"""
+    return {
+        "config": {
+            "workers": WEB_CONCURRENCY,
+            "pool_size": DB_POOL_SIZE,
+            "max_overflow": DB_MAX_OVERFLOW,
+            "sync_pool_size": DB_SYNC_POOL_SIZE,
+            "sync_max_overflow": DB_SYNC_MAX_OVERFLOW,
+            "pool_recycle": DB_POOL_RECYCLE,
+            "pre_ping": DB_POOL_PRE_PING,
+            "external_pooler": DB_EXTERNAL_POOLER,
+        },
+        "budget": connection_budget(),
+        "async": async_pool_metrics.snapshot(async_engine.sync_engine.pool),
+        "sync": sync_pool_metrics.snapshot(engine.pool),
+        "replicas": [
+            {**metrics.snapshot(replica.sync_engine.pool), **lag}
+            for metrics, replica, lag in zip(replica_pool_metrics, replica_engines, replica_router.status())
+        ],
+    }
+
+# Create sync session factory
 SessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
@@ -48,14 +241,40 @@ SessionLocal = sessionmaker(
 )
 
 # Declarative base class
-Base = declarative_base()
+# AsyncAttrs provides `await obj.awaitable_attrs.<relationship>` for loading
+# relationships explicitly on an AsyncSession
+Base = declarative_base(cls=AsyncAttrs)
+
+async def replica_session(use_replica: bool = True) -> AsyncSession:
+    """
+    New session reading from a healthy replica (primary if none is available).
+    
+    Usage: async with await replica_session() as db: ...
+    """
+    db = AsyncSessionLocal()
+    replica = await replica_router.choose() if use_replica else None
+    if replica is not None:
+        db.info[REPLICA_BIND_KEY] = replica.sync_engine
+    return db
 
 # Dependency injection: Get database session
-def get_db():
+async def get_db(request: Request):
     """
     FastAPI dependency injection function.
     
-    Usage: db: Session = Depends(get_db)
+    GET/HEAD requests read from a replica when one is configured and healthy;
+    writes and read-after-write go to the primary (see app/db_routing.py).
+    
+    Usage: db: AsyncSession = Depends(get_db)
+    """
+    async with await replica_session(wants_replica(request, replica_router)) as db:
+        yield db
+
+def get_sync_db():
+    """
+    Sync session dependency/generator for scripts and sync code paths.
+    
+    Usage: db: Session = Depends(get_sync_db)
     """
     db = SessionLocal()
     try:
@@ -63,45 +282,72 @@ def get_db():
     finally:
         db.close()
 
-# Initialize database
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Alembic head revision this code expects (alembic/versions). Startup only checks
+# that the database is at this revision; migrations run via `python manage_db.py migrate`.
+# Each revision carries its own frozen DDL: schema changes go in a new revision,
+# never in an existing one (the models are not used to create tables).
+SCHEMA_REVISION = "0002_calculation_ids"
+
+
+def alembic_config():
+    """Alembic configuration for backend/alembic (importing alembic is deferred to callers)"""
+    from alembic.config import Config
+
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    return config
+
+
+def run_migrations(revision: str = "head", configure_logging: bool = False) -> None:
+    """
+    Upgrade the database schema (one-shot: deploy release command or manage_db.py).
+
+    Concurrent runs are serialized by an advisory lock in alembic/env.py.
+
+    Args:
+        revision: Target revision
+        configure_logging: Apply the logging section of alembic.ini (CLI use)
+    """
+    from alembic import command
+
+    config = alembic_config()
+    config.attributes["configure_logger"] = configure_logging
+    command.upgrade(config, revision)
+
+
+async def current_schema_revision() -> Optional[str]:
+    """Revision recorded in alembic_version, or None if the database was never migrated"""
+    async with async_engine.connect() as conn:
+        exists = await conn.scalar(text("SELECT to_regclass('alembic_version') IS NOT NULL"))
+        if not exists:
+            return None
+        return await conn.scalar(text("SELECT version_num FROM alembic_version"))
+
+
+async def verify_schema() -> str:
+    """
+    Check that the database is at SCHEMA_REVISION (one query, no DDL).
+
+    Returns:
+        The current revision
+
+    Raises:
+        RuntimeError: If the database is behind, ahead or was never migrated
+    """
+    revision = await current_schema_revision()
+    if revision != SCHEMA_REVISION:
+        raise RuntimeError(
+            f"Database schema revision is {revision or 'missing'}, expected {SCHEMA_REVISION}; "
+            f"run `python manage_db.py migrate`"
+        )
+    return revision
+
+
 def init_db():
-    """Create all tables and run migrations"""
-    # Import all models to ensure they are registered with Base.metadata
-    from app.models import (
-        User, Project, Calculation, UserSettings, AuditLog, CalculationJob,
-        FeedbackPost, FeedbackPostLike, FeedbackReply, FeedbackReplyLike
-    )  # noqa: F401
-    
-    # Create all tables defined by models
-    Base.metadata.create_all(bind=engine)
-    
-    # Run migrations (update bundle_hash column length if needed)
-    try:
-        from sqlalchemy import text
-        with engine.connect() as conn:
-            # Check if bundle_hash column exists and has length 64
-            result = conn.execute(
-                text("""
-                    SELECT character_maximum_length 
-                    FROM information_schema.columns 
-                    WHERE table_name = 'calculations' 
-                    AND column_name = 'bundle_hash'
-                """)
-            )
-            row = result.fetchone()
-            if row and row[0] == 64:
-                # Update column length to 128
-                conn.execute(
-                    text("""
-                        ALTER TABLE calculations 
-                        ALTER COLUMN bundle_hash TYPE VARCHAR(128)
-                    """)
-                )
-                conn.commit()
-                print("✅ Migrated bundle_hash column from VARCHAR(64) to VARCHAR(128)")
-    except Exception as e:
-        # Migration failed, but continue (column might not exist yet or already updated)
-        print(f"⚠️ Migration check skipped: {e}")
+    """Create all tables and run migrations (kept for scripts; same as run_migrations)"""
+    run_migrations()
 
 # Drop all tables (for testing only!)
 def drop_all_tables():
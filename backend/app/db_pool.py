@@ -0,0 +1,159 @@
+# backend/app/db_pool.py
+# Connection pool sizing and pool metrics
+#
+# Every uvicorn worker owns its own engines (and pools), so the total number of
+# connections to one Postgres server is pods x workers x (pool_size + max_overflow)
+# summed over the engines connecting to it (async + sync on the primary, one async
+# engine per replica). Pool sizes are derived from a per-instance connection budget
+# divided by the worker count instead of being hardcoded per process.
+
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+# Upper bounds (seconds) of the checkout wait histogram buckets
+CHECKOUT_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+def env_int(name: str, default: Optional[int]) -> Optional[int]:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else default
+
+
+def env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def derive_pool_size(
+    max_connections: int,
+    workers: int,
+    pool_size: Optional[int] = None,
+    max_overflow: Optional[int] = None,
+    reserved: int = 0
+) -> Tuple[int, int]:
+    """
+    Derive (pool_size, max_overflow) for one worker process.
+
+    Args:
+        max_connections: Connection budget for this instance, shared by all workers
+        workers: Number of worker processes (WEB_CONCURRENCY)
+        pool_size: Explicit pool size override
+        max_overflow: Explicit overflow override
+        reserved: Connections per worker held back for other pools on the same server
+
+    Returns:
+        (pool_size, max_overflow) such that workers x (size + overflow + reserved) <= budget
+    """
+    per_worker = max(2, max_connections // max(1, workers) - reserved)
+    if pool_size is None:
+        pool_size = max(1, per_worker // 2)
+    if max_overflow is None:
+        max_overflow = max(0, per_worker - pool_size)
+    return pool_size, max_overflow
+
+
+class PoolMetrics:
+    """
+    Counters for one engine's pool.
+
+    Checkout wait time is measured around the pool's internal get, so it covers
+    time spent waiting for a free connection as well as opening new ones.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.disconnects = 0
+        self.wait_sum = 0.0
+        self.wait_max = 0.0
+        self.wait_buckets = [0] * (len(CHECKOUT_WAIT_BUCKETS) + 1)  # Last bucket is +Inf
+
+    def observe_checkout(self, wait: float, failed: bool = False) -> None:
+        with self._lock:
+            if failed:
+                self.checkout_failures += 1
+                return
+            self.checkouts += 1
+            self.wait_sum += wait
+            self.wait_max = max(self.wait_max, wait)
+            for i, bound in enumerate(CHECKOUT_WAIT_BUCKETS):
+                if wait <= bound:
+                    self.wait_buckets[i] += 1
+                    break
+            else:
+                self.wait_buckets[-1] += 1
+
+    def observe_disconnect(self) -> None:
+        with self._lock:
+            self.disconnects += 1
+
+    def snapshot(self, pool=None) -> Dict:
+        """
+        Current counters plus pool gauges.
+
+        Args:
+            pool: The engine's pool, used for size / in-use / overflow gauges
+
+        Returns:
+            Dictionary of metrics
+        """
+        with self._lock:
+            data = {
+                "checkouts_total": self.checkouts,
+                "checkout_failures_total": self.checkout_failures,
+                "disconnects_total": self.disconnects,
+                "checkout_wait_seconds_sum": round(self.wait_sum, 6),
+                "checkout_wait_seconds_max": round(self.wait_max, 6),
+                "checkout_wait_seconds_buckets": {
+                    **{str(bound): count for bound, count in zip(CHECKOUT_WAIT_BUCKETS, self.wait_buckets)},
+                    "+Inf": self.wait_buckets[-1],
+                },
+            }
+        if isinstance(pool, QueuePool):
+            data.update({
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "in_use": pool.checkedout(),
+                "overflow": max(0, pool.overflow()),
+            })
+        return data
+
+
+class _TimedCheckoutMixin:
+    """Pool mixin recording checkout wait time into `metrics`"""
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            self.metrics.observe_checkout(time.perf_counter() - start, failed=True)  # Timeout or connect error
+            raise
+        self.metrics.observe_checkout(time.perf_counter() - start)
+        return connection
+
+
+def instrumented_pool_class(metrics: PoolMetrics, is_async: bool):
+    """
+    QueuePool subclass that reports checkout waits to `metrics`.
+
+    A class is built per engine because create_engine() instantiates the pool
+    itself (and re-instantiates it on dispose()), so metrics cannot be passed in.
+    """
+    base = AsyncAdaptedQueuePool if is_async else QueuePool
+    return type(f"Instrumented{base.__name__}", (_TimedCheckoutMixin, base), {"metrics": metrics})
@@ -0,0 +1,172 @@
+# backend/app/db_routing.py
+# Read-replica routing for database sessions
+#
+# GET/HEAD requests read from a replica when one is configured and healthy;
+# everything else (writes, flushes, read-after-write) goes to the primary.
+# Routing happens in Session.get_bind(), so services and routes are unchanged.
+
+import asyncio
+import hashlib
+import itertools
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import Select, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+
+# Replication lag in seconds; 0 when the replica has replayed everything it received
+# (pg_last_xact_replay_timestamp() alone grows while the primary is idle).
+# COALESCE: a server that is not in recovery reports NULL, i.e. no lag.
+REPLICA_LAG_SQL = text("""
+    SELECT COALESCE(
+        CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+             ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+        END, 0)
+""")
+
+# Request header to override routing: "primary" (read-your-writes) or "replica"
+READ_CONSISTENCY_HEADER = "X-Read-Consistency"
+
+SAFE_METHODS = ("GET", "HEAD")
+
+# Session.info key holding the replica bind chosen for the session
+REPLICA_BIND_KEY = "replica_bind"
+
+
+class RoutingSession(Session):
+    """
+    Session that sends SELECTs to the replica bind in session.info, if any.
+
+    The first flush or DML statement drops the replica bind, so the rest of
+    the session (including reads after the write) stays on the primary.
+    Only Select constructs count as reads: text() statements, whatever they
+    contain, are treated as writes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        replica = self.info.get(REPLICA_BIND_KEY)
+        if replica is not None:
+            if self._flushing or (clause is not None and not isinstance(clause, Select)):
+                self.info.pop(REPLICA_BIND_KEY, None)
+            else:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
+class ReplicaRouter:
+    """
+    Picks a replica engine for read-only sessions.
+
+    - Replicas are used round-robin
+    - A replica whose lag exceeds max_lag (or that cannot be reached) is skipped;
+      when none qualifies, reads fall back to the primary
+    - Lag is measured at most once per check_interval per replica
+    - Clients that just wrote are pinned to the primary for sticky_seconds
+      (per worker process; clients can also send X-Read-Consistency: primary)
+    """
+
+    def __init__(
+        self,
+        engines: List[AsyncEngine],
+        max_lag: float,
+        check_interval: float,
+        sticky_seconds: float
+    ):
+        self.engines = engines
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.sticky_seconds = sticky_seconds
+        self._cycle = itertools.cycle(range(len(engines))) if engines else None
+        self._lag: Dict[int, Optional[float]] = {}
+        self._checked_at: Dict[int, float] = {}
+        self._recent_writers: Dict[str, float] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.engines)
+
+    async def _lag_of(self, index: int) -> Optional[float]:
+        """Cached replication lag of a replica, None if it is unreachable"""
+        now = time.monotonic()
+        if now - self._checked_at.get(index, float("-inf")) < self.check_interval:
+            return self._lag.get(index)
+
+        self._checked_at[index] = now
+        try:
+            async with self.engines[index].connect() as conn:
+                lag = await asyncio.wait_for(conn.scalar(REPLICA_LAG_SQL), timeout=self.check_interval)
+            self._lag[index] = float(lag or 0)
+        except Exception:
+            self._lag[index] = None
+        return self._lag[index]
+
+    async def choose(self) -> Optional[AsyncEngine]:
+        """
+        Next healthy replica engine.
+
+        Returns:
+            Replica engine, or None if reads should go to the primary
+        """
+        if not self.engines:
+            return None
+        for _ in range(len(self.engines)):
+            index = next(self._cycle)
+            lag = await self._lag_of(index)
+            if lag is not None and lag <= self.max_lag:
+                return self.engines[index]
+        return None
+
+    def mark_write(self, client_key: str) -> None:
+        """Pin a client to the primary after a successful write"""
+        if not self.engines or self.sticky_seconds <= 0:
+            return
+        now = time.monotonic()
+        self._recent_writers[client_key] = now + self.sticky_seconds
+        if len(self._recent_writers) > 10000:
+            self._recent_writers = {k: v for k, v in self._recent_writers.items() if v > now}
+
+    def recently_wrote(self, client_key: str) -> bool:
+        expires_at = self._recent_writers.get(client_key)
+        return expires_at is not None and expires_at > time.monotonic()
+
+    def status(self) -> List[Dict]:
+        """Last measured lag of each replica"""
+        return [
+            {"replica": index, "lag_seconds": self._lag.get(index), "healthy": (
+                self._lag.get(index) is not None and self._lag[index] <= self.max_lag
+            )}
+            for index in range(len(self.engines))
+        ]
+
+
+def client_address(request) -> str:
+    """Address of the client: first X-Forwarded-For hop behind a proxy, else the peer"""
+    forwarded = request.headers.get("x-forwarded-for")
+    if forwarded:
+        first = forwarded.split(",")[0].strip()
+        if first:
+            return first
+    return request.client.host if request.client else "unknown"
+
+
+def client_key(request) -> str:
+    """Identify the client of a request: bearer token if present, else address"""
+    authorization = request.headers.get("authorization")
+    if authorization:
+        return "auth:" + hashlib.sha256(authorization.encode()).hexdigest()[:32]
+    return "addr:" + client_address(request)
+
+
+def wants_replica(request, router: ReplicaRouter) -> bool:
+    """Whether a request may read from a replica"""
+    if not router.enabled:
+        return False
+    override = request.headers.get(READ_CONSISTENCY_HEADER, "").strip().lower()
+    if override == "primary":
+        return False
+    if override == "replica":
+        return True
+    if request.method not in SAFE_METHODS:
+        return False
+    return not router.recently_wrote(client_key(request))
@@ -0,0 +1,258 @@
+# backend/app/log_config.py
+# Logging setup: JSON lines, request-id correlation, queued output, debug sampling
+#
+# configure_logging() installs one QueueHandler on the root logger. Records are
+# formatted (message merged, traceback rendered) in the calling thread and put on
+# an in-memory queue; a QueueListener thread writes them to stdout, so request
+# handlers never block on log I/O. LOG_FORMAT=json writes one JSON object per
+# line with the request id (RequestIdMiddleware, X-Request-ID) and, when tracing
+# is on, the trace/span ids; text keeps the classic one-line format.
+#
+# Per-logger levels come from LOG_LEVELS ("sqlalchemy.engine=WARNING,app.services=DEBUG").
+# DEBUG records can be sampled (LOG_DEBUG_SAMPLE_RATIO) and rate limited per call
+# site (LOG_DEBUG_RATE_LIMIT records per second); dropped records are filtered
+# before they are queued. uvicorn's own loggers are routed through the same queue.
+#
+# Use %-style arguments (logger.info("Created %d partition(s)", n)), not f-strings:
+# the message is only formatted if the record passes the level and the filters.
+
+import atexit
+import logging
+import logging.handlers
+import queue
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+import orjson
+
+from .tracing import current_ids
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Incoming X-Request-ID values are reused only if they look like an id
+_REQUEST_ID = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+# Attributes every LogRecord has; anything else came from extra={...}
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def current_request_id() -> Optional[str]:
+    """Request id of the request being handled (None outside requests)"""
+    return request_id_var.get()
+
+
+class ContextFilter(logging.Filter):
+    """Adds request_id ('-' outside requests), trace_id and span_id to every record"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "request_id", None) is None:  # Unless passed in extra={...}
+            record.request_id = request_id_var.get() or "-"
+        record.trace_id, record.span_id = current_ids()
+        return True
+
+
+class DebugSampler(logging.Filter):
+    """
+    Sampling and per-call-site rate limiting of DEBUG records.
+
+    Higher levels always pass. The rate limit is a token bucket per
+    (logger, source line) allowing `rate_limit` records per second with bursts
+    of the same size; 0 disables it.
+    """
+
+    def __init__(self, sample_ratio: float = 1.0, rate_limit: float = 0.0):
+        super().__init__()
+        self.sample_ratio = sample_ratio
+        self.rate_limit = rate_limit
+        self._buckets: Dict[Tuple[str, str, int], Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG:
+            return True
+        if self.sample_ratio < 1.0 and random.random() >= self.sample_ratio:
+            return False
+        if self.rate_limit <= 0:
+            return True
+        key = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (self.rate_limit, now))
+            tokens = min(self.rate_limit, tokens + (now - updated) * self.rate_limit)
+            if tokens < 1.0:
+                self._buckets[key] = (tokens, now)
+                return False
+            self._buckets[key] = (tokens - 1.0, now)
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record; extra={...} fields are included as keys"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        document = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and value is not None and value != "-":
+                document.setdefault(key, value)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            document["exception"] = record.exc_text
+        if record.stack_info:
+            document["stack"] = record.stack_info
+        return orjson.dumps(document, default=str).decode("utf-8")
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler keeping exc_text separate from the message.
+
+    The stock prepare() formats the whole record into msg, which would bury the
+    traceback inside the JSON message; here only the arguments are merged and
+    the traceback is rendered to exc_text (exc_info holds frames and is not
+    safe to keep on a queued record).
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        message = record.getMessage()
+        exc_text = record.exc_text
+        if record.exc_info and not exc_text:
+            exc_text = logging.Formatter().formatException(record.exc_info)
+        record = logging.makeLogRecord(vars(record))
+        record.msg, record.args = message, None
+        record.exc_info, record.exc_text = None, exc_text
+        return record
+
+
+def parse_logger_levels(spec: str) -> Dict[str, str]:
+    """
+    Parse LOG_LEVELS ("name=LEVEL,name=LEVEL").
+
+    Raises:
+        ValueError: If an entry is malformed or names an unknown level
+    """
+    levels = {}
+    for entry in spec.split(","):
+        if not entry.strip():
+            continue
+        name, separator, level = entry.partition("=")
+        level = level.strip().upper()
+        if not separator or not name.strip() or not isinstance(logging.getLevelName(level), int):
+            raise ValueError(f"Invalid LOG_LEVELS entry: {entry.strip()!r}")
+        levels[name.strip()] = level
+    return levels
+
+
+def configure_logging(
+    level: str = "INFO",
+    fmt: str = "json",
+    logger_levels: str = "",
+    debug_sample_ratio: float = 1.0,
+    debug_rate_limit: float = 0.0
+) -> None:
+    """
+    Route all logging through a queue to stdout (idempotent: reconfigures on a second call).
+
+    Args:
+        level: Root level
+        fmt: json or text
+        logger_levels: Per-logger levels, "name=LEVEL,..."
+        debug_sample_ratio: Share of DEBUG records kept
+        debug_rate_limit: DEBUG records per second per call site (0: unlimited)
+    """
+    global _listener
+    shutdown_logging()
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+
+    handler = _QueueHandler(queue.SimpleQueue())
+    handler.addFilter(DebugSampler(debug_sample_ratio, debug_rate_limit))
+    handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level.upper())
+
+    # uvicorn installs its own handlers before importing the app; send its records here too
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers.clear()
+        uvicorn_logger.propagate = True
+
+    for name, logger_level in parse_logger_levels(logger_levels).items():
+        logging.getLogger(name).setLevel(logger_level)
+
+    _listener = logging.handlers.QueueListener(handler.queue, output)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Stop the listener thread after writing the queued records"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
+
+
+class RequestIdMiddleware:
+    """
+    ASGI middleware assigning each HTTP request an id for log correlation.
+
+    A well-formed incoming X-Request-ID (from the proxy or client) is kept,
+    otherwise a new one is generated; the response echoes it. The id is also
+    stored in request.state.request_id for code running outside this middleware
+    (the 500 handler runs in ServerErrorMiddleware, after the context is reset).
+    """
+
+    def __init__(self, app, header: str = "x-request-id"):
+        self.app = app
+        self.header = header.lower().encode("latin-1")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", ()):
+            if name == self.header:
+                candidate = value.decode("latin-1")
+                if _REQUEST_ID.match(candidate):
+                    request_id = candidate
+                break
+        if request_id is None:
+            request_id = uuid.uuid4().hex
+        scope.setdefault("state", {})["request_id"] = request_id
+        token = request_id_var.set(request_id)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", ())) + [(self.header, request_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id_var.reset(token)
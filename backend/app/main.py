@@ -2,40 +2,112 @@
 # TradesPro FastAPI Backend - Optional Online Services
 # V4.1 Architecture Compliant - User authentication, data sync, PDF generation
 
+import time
+_import_started = time.perf_counter()
+
 from fastapi import FastAPI, HTTPException, status, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from contextlib import asynccontextmanager
+from fastapi.responses import JSONResponse, Response
+from contextlib import asynccontextmanager, contextmanager
+import asyncio
 import os
 import logging
 
 # Import routes
 from .routes import auth_router, projects_router, calculations_router, feedback_router
 from .utils.config import settings
+from .database import replica_router, pool_status, run_migrations, verify_schema
+from .compression import CompressionMiddleware
+from .log_config import RequestIdMiddleware, configure_logging
+from .metrics import REGISTRY, CONTENT_TYPE, MetricsMiddleware
+from .tracing import TracingMiddleware, instrument_routes, tracer
+from .services.view_counter import view_counter
+from .services.partition_service import PartitionService
+from .services.cold_storage import ColdStorage
+from .services.stats_service import stats_cache
+from .utils.security import password_hash_pool
+from .db_routing import SAFE_METHODS, client_key
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging (JSON lines through a background queue, see app/log_config.py)
+configure_logging(
+    level=settings.LOG_LEVEL,
+    fmt=settings.LOG_FORMAT,
+    logger_levels=settings.LOG_LEVELS,
+    debug_sample_ratio=settings.LOG_DEBUG_SAMPLE_RATIO,
+    debug_rate_limit=settings.LOG_DEBUG_RATE_LIMIT
+)
 logger = logging.getLogger(__name__)
 
+# Startup phase durations in ms (module import, schema check, background tasks)
+startup_timings = {}
+
+@contextmanager
+def startup_phase(name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        startup_timings[name] = round((time.perf_counter() - started) * 1000, 1)
+
+async def ensure_schema():
+    """Schema handling at startup according to DB_STARTUP_SCHEMA (verify, migrate or skip)"""
+    mode = settings.DB_STARTUP_SCHEMA
+    if mode == "skip":
+        return
+    if mode == "migrate":
+        # Development convenience; deployments run `python manage_db.py migrate` once instead
+        await asyncio.to_thread(run_migrations)
+    try:
+        revision = await verify_schema()
+    except RuntimeError:
+        raise
+    except Exception as e:
+        # Database unreachable: start anyway, requests needing it will fail on their own
+        logger.warning("Schema check skipped: %s", e)
+        return
+    logger.info("Database schema at revision %s", revision)
+
 # Application lifecycle management
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application startup and shutdown operations"""
     logger.info("TradesPro Backend Starting...")
-    logger.info(f"Environment: {settings.ENVIRONMENT}")
-    logger.info(f"Database: {'Configured' if settings.DATABASE_URL else 'Not configured'}")
+    logger.info("Environment: %s", settings.ENVIRONMENT)
+    logger.info("Database: %s", "Configured" if settings.DATABASE_URL else "Not configured")
     
-    # Initialize database tables
-    try:
-        from .database import init_db
-        init_db()
-        logger.info("Database initialized (tables ensured)")
-    except Exception as e:
-        logger.warning(f"Database initialization skipped or failed: {e}")
+    # No DDL at startup: only check the Alembic revision (one query)
+    with startup_phase("schema"):
+        await ensure_schema()
+    
+    with startup_phase("background_tasks"):
+        # Start write-behind flushing of feedback view counts
+        view_counter_task = asyncio.create_task(view_counter.run())
+        
+        # Keep future monthly calculations partitions created
+        partition_task = asyncio.create_task(PartitionService.run())
+        
+        # Offload old signed calculation bundles to cold storage (when configured)
+        cold_storage_task = asyncio.create_task(ColdStorage.run()) if ColdStorage.enabled() else None
+    
+    startup_timings["total"] = round(sum(startup_timings.get(phase, 0) for phase in ("import", "schema", "background_tasks")), 1)
+    logger.info("Startup timings (ms): %s", ", ".join(f"{phase}={ms}" for phase, ms in startup_timings.items()),
+                extra={"startup_timings": startup_timings})
     
     yield
     
-    # Cleanup resources
+    # Cleanup resources (cancelling the flush loop writes any buffered views).
+    # Each task is awaited, so an offload or partition run unwinds (rolls back,
+    # releases its connection) before the engines are disposed at exit
+    for task in (cold_storage_task, partition_task, view_counter_task):
+        if task is None:
+            continue
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    password_hash_pool.shutdown()
+    tracer.shutdown()
     logger.info("TradesPro Backend Shutting down...")
 
 # Create FastAPI application
@@ -68,9 +140,48 @@ else:
     )
     
 # Log CORS configuration for debugging
-logger.info(f"CORS configured: {len(settings.CORS_ORIGINS)} origin(s) allowed")
+logger.info("CORS configured: %d origin(s) allowed", len(settings.CORS_ORIGINS))
 if settings.CORS_ORIGINS:
-    logger.info(f"CORS origins: {', '.join(settings.CORS_ORIGINS[:3])}{'...' if len(settings.CORS_ORIGINS) > 3 else ''}")
+    logger.info("CORS origins: %s%s", ", ".join(settings.CORS_ORIGINS[:3]), "..." if len(settings.CORS_ORIGINS) > 3 else "")
+
+# Middleware added later wraps the ones added before it. Outer to inner:
+# RequestId -> Tracing -> Metrics -> Compression -> pin_writers_to_primary -> CORS
+
+# Read-your-writes: after a successful write, this client's reads go to the primary
+@app.middleware("http")
+async def pin_writers_to_primary(request: Request, call_next):
+    response = await call_next(request)
+    if request.method not in SAFE_METHODS and response.status_code < 400:
+        replica_router.mark_write(client_key(request))
+    return response
+
+# Response compression (inside metrics and tracing, so they include the time spent compressing)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        min_size=settings.COMPRESSION_MIN_SIZE,
+        encodings=[encoding.strip() for encoding in settings.COMPRESSION_ENCODINGS.split(",") if encoding.strip()]
+    )
+
+# Prometheus request metrics (wraps compression, so compression time is included)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Request tracing (wraps metrics and compression: the root span covers them)
+if settings.TRACING_ENABLED:
+    tracer.configure(
+        exporter=settings.TRACING_EXPORTER,
+        file_path=settings.TRACING_FILE,
+        sample_ratio=settings.TRACING_SAMPLE_RATIO,
+        slow_request_ms=settings.TRACING_SLOW_REQUEST_MS,
+        n_plus_one_threshold=settings.TRACING_N_PLUS_ONE_THRESHOLD,
+        max_spans=settings.TRACING_MAX_SPANS
+    )
+    app.add_middleware(TracingMiddleware)
+
+# Request ids for log correlation (outermost, so every log line of the request carries it,
+# including the tracing and metrics middleware's)
+app.add_middleware(RequestIdMiddleware)
 
 # Include routers
 app.include_router(auth_router, prefix=settings.API_V1_PREFIX)
@@ -97,6 +208,28 @@ async def health_check():
         }
     }
 
+@app.get("/health/db-pool")
+async def db_pool_health():
+    """Connection pool configuration, gauges and checkout wait metrics"""
+    return pool_status()
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics of this worker process (text exposition format)"""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
+
+@app.get("/health/startup")
+async def startup_health():
+    """Startup phase durations of this worker (ms)"""
+    return startup_timings
+
+@app.get("/health/password-hashing")
+async def password_hashing_health():
+    """Password hashing pool size, queue depth and rejected calls"""
+    return password_hash_pool.status()
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -114,37 +247,11 @@ async def root():
 
 @app.get("/api/v1/stats")
 async def get_statistics():
-    """Basic statistics aggregated from database (best-effort)."""
+    """Basic statistics from incrementally maintained counters (cached, best-effort)."""
     try:
-        from sqlalchemy import func
-        from .database import SessionLocal
-        from .models.project import Project
-        from .models.calculation import Calculation
-
-        db = SessionLocal()
-        try:
-            total_projects = db.query(func.count(Project.id)).scalar() or 0
-            total_calculations = db.query(func.count(Calculation.id)).scalar() or 0
-
-            # Current month calculations
-            from datetime import datetime
-            now = datetime.utcnow()
-            start_month = datetime(now.year, now.month, 1)
-            calculations_this_month = (
-                db.query(func.count(Calculation.id))
-                .filter(Calculation.created_at >= start_month)
-                .scalar() or 0
-            )
-
-            return {
-                "total_projects": int(total_projects),
-                "total_calculations": int(total_calculations),
-                "calculations_this_month": int(calculations_this_month),
-            }
-        finally:
-            db.close()
+        return await stats_cache.get()
     except Exception as e:
-        logger.warning(f"Stats aggregation unavailable: {e}")
+        logger.warning("Stats aggregation unavailable: %s", e)
         return {
             "total_projects": 0,
             "total_calculations": 0,
@@ -169,7 +276,8 @@ async def http_exception_handler(request: Request, exc: HTTPException):
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
     """General exception handler"""
-    logger.error(f"Unhandled exception: {exc}", exc_info=True)
+    request_id = getattr(request.state, "request_id", None)
+    logger.error("Unhandled exception: %s", exc, exc_info=True, extra={"request_id": request_id})
     
     return JSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -178,7 +286,8 @@ async def general_exception_handler(request: Request, exc: Exception):
                 "code": 500,
                 "message": "Internal server error"
             }
-        }
+        },
+        headers={"X-Request-ID": request_id} if request_id else None
     )
 
 # Development Endpoint
@@ -197,6 +306,12 @@ if settings.ENVIRONMENT == "development":
             "python_version": os.sys.version
         }
 
+# route.handler / response.serialize spans for every route registered above
+if settings.TRACING_ENABLED:
+    instrument_routes(app)
+
+startup_timings["import"] = round((time.perf_counter() - _import_started) * 1000, 1)
+
 # Application Entry Point
 
 if __name__ == "__main__":
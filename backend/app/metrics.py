@@ -0,0 +1,320 @@
+# backend/app/metrics.py
+# Prometheus metrics: in-process registry, text exposition and ASGI middleware
+#
+# Served by GET /metrics (text format 0.0.4). Metrics are per worker process:
+# scrape each worker, or aggregate by instance in Prometheus. Recording is a
+# dict lookup and a few additions under a lock, cheap enough for every request
+# and every SQL statement.
+#
+# Lives outside app.utils (like db_pool/db_routing) so database.py can import it.
+
+import re
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from sqlalchemy import event
+
+# Request / query latencies (seconds)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Fast operations: SQL statements, hashing
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+# Calculation engine subprocess
+ENGINE_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonic counter; label values are passed positionally"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{format_labels(self.labelnames, labels)} {format_value(value)}"
+            for labels, value in items
+        ]
+
+
+class Gauge(Counter):
+    """Value that goes up and down"""
+
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    """Cumulative histogram with fixed upper bounds"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (last is +Inf), sum]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def time(self, *labels: str) -> "_Timer":
+        """Context manager observing the duration of its block"""
+        return _Timer(self, labels)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(labels, list(counts), total) for labels, (counts, total) in self._values.items()]
+        lines = self.header()
+        names = self.labelnames + ("le",)
+        for labels, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{format_labels(names, labels + (format_value(bound),))} {cumulative}")
+            label_text = format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram: Histogram, labels: Tuple[str, ...]):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+        return False
+
+
+class Registry:
+    """Metrics plus collectors (callables returning exposition lines at scrape time)"""
+
+    def __init__(self):
+        self.metrics: List[_Metric] = []
+        self.collectors: List[Callable[[], Iterable[str]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], Iterable[str]]) -> None:
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        for collector in self.collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4"  # Starlette appends the charset
+
+# HTTP
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "http_requests_total", "HTTP requests by route template and status", ("method", "route", "status")))
+HTTP_REQUEST_DURATION = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency until the response is sent",
+    ("method", "route", "status")))
+HTTP_IN_FLIGHT = REGISTRY.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served"))
+
+# Database
+DB_QUERY_DURATION = REGISTRY.register(Histogram(
+    "db_query_duration_seconds", "SQL statement execution time by engine and statement type",
+    ("engine", "operation"), buckets=FAST_BUCKETS))
+DB_QUERY_ERRORS = REGISTRY.register(Counter(
+    "db_query_errors_total", "SQL statements that raised an error", ("engine", "operation")))
+
+# Calculation engine (Node.js subprocess)
+ENGINE_DURATION = REGISTRY.register(Histogram(
+    "calculation_engine_duration_seconds", "Calculation engine subprocess run time by outcome",
+    ("outcome",), buckets=ENGINE_BUCKETS))
+ENGINE_FAILURES = REGISTRY.register(Counter(
+    "calculation_engine_failures_total", "Failed calculation engine runs by reason", ("reason",)))
+
+# Bundle hashing / signing and password hashing
+SIGNING_DURATION = REGISTRY.register(Histogram(
+    "bundle_signing_duration_seconds", "Bundle canonicalization + hashing / signing time",
+    ("operation",), buckets=FAST_BUCKETS))
+PASSWORD_HASH_DURATION = REGISTRY.register(Histogram(
+    "password_hash_duration_seconds", "bcrypt hash / verify time on the password hashing pool",
+    ("operation",)))
+
+# SQL statement type from its first keyword
+_OPERATION = re.compile(r"\s*(\w+)")
+_OPERATIONS = frozenset({"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "BEGIN", "COMMIT", "ROLLBACK"})
+_QUERY_START_KEY = "metrics_query_start"
+
+
+def _operation(statement: str) -> str:
+    match = _OPERATION.match(statement)
+    operation = match.group(1).upper() if match else ""
+    return operation if operation in _OPERATIONS else "OTHER"
+
+
+def instrument_engine(sync_engine, name: str) -> None:
+    """
+    Record SQL statement counts and durations of an engine.
+
+    Args:
+        sync_engine: Engine (for async engines, engine.sync_engine)
+        name: Value of the engine label
+    """
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault(_QUERY_START_KEY, []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get(_QUERY_START_KEY)
+        if starts:
+            DB_QUERY_DURATION.observe(time.perf_counter() - starts.pop(), name, _operation(statement))
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(context):
+        connection = context.connection
+        starts = connection.info.get(_QUERY_START_KEY) if connection is not None else None
+        if starts:
+            starts.pop()
+        DB_QUERY_ERRORS.inc(name, _operation(context.statement or ""))
+
+
+# (metric name, type, PoolMetrics.snapshot key, help)
+_POOL_SERIES = (
+    ("db_pool_size", "gauge", "size", "Configured pool size"),
+    ("db_pool_connections_in_use", "gauge", "in_use", "Connections checked out"),
+    ("db_pool_connections_idle", "gauge", "checked_in", "Connections idle in the pool"),
+    ("db_pool_overflow", "gauge", "overflow", "Connections open beyond pool_size"),
+    ("db_pool_checkouts_total", "counter", "checkouts_total", "Successful connection checkouts"),
+    ("db_pool_checkout_failures_total", "counter", "checkout_failures_total", "Checkouts that timed out or failed to connect"),
+    ("db_pool_disconnects_total", "counter", "disconnects_total", "Connection-level errors (dead connections)"),
+)
+
+
+def pool_collector(pools: Callable[[], Iterable[Tuple[str, object, object]]]) -> Callable[[], List[str]]:
+    """
+    Collector exposing db_pool.PoolMetrics snapshots.
+
+    Args:
+        pools: Returns (engine name, PoolMetrics, pool) for each engine
+    """
+    def collect() -> List[str]:
+        snapshots = [(name, metrics.snapshot(pool)) for name, metrics, pool in pools()]
+        lines: List[str] = []
+        for metric, kind, key, documentation in _POOL_SERIES:
+            lines += [f"# HELP {metric} {documentation}", f"# TYPE {metric} {kind}"]
+            lines += [
+                f"{metric}{format_labels(('engine',), (name,))} {snapshot[key]}"
+                for name, snapshot in snapshots if key in snapshot
+            ]
+
+        metric = "db_pool_checkout_wait_seconds"
+        lines += [f"# HELP {metric} Time waiting for a pooled connection", f"# TYPE {metric} histogram"]
+        for name, snapshot in snapshots:
+            cumulative = 0
+            for bound, count in snapshot["checkout_wait_seconds_buckets"].items():
+                cumulative += count
+                lines.append(f"{metric}_bucket{format_labels(('engine', 'le'), (name, bound))} {cumulative}")
+            label_text = format_labels(("engine",), (name,))
+            lines.append(f"{metric}_sum{label_text} {snapshot['checkout_wait_seconds_sum']}")
+            lines.append(f"{metric}_count{label_text} {cumulative}")
+        return lines
+
+    return collect
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request count, latency and in-flight requests.
+
+    Routes are labelled by their template (/api/v1/projects/{project_id}), so
+    label cardinality stays bounded; unmatched paths share one label.
+    """
+
+    def __init__(self, app, skip_paths: Sequence[str] = ("/metrics",)):
+        self.app = app
+        self.skip_paths = frozenset(skip_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            route = scope.get("route")
+            labels = (scope["method"], getattr(route, "path", None) or "unmatched", str(status_code))
+            HTTP_REQUESTS.inc(*labels)
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - start, *labels)
@@ -3,7 +3,7 @@
 
 from .user import User
 from .project import Project
-from .calculation import Calculation
+from .calculation import Calculation, CalculationId
 from .user_settings import UserSettings
 from .audit_log import AuditLog
 from .calculation_job import CalculationJob
@@ -11,7 +11,7 @@ from .feedback_post import FeedbackPost, FeedbackPostLike
 from .feedback_reply import FeedbackReply, FeedbackReplyLike
 
 __all__ = [
-    'User', 'Project', 'Calculation', 'UserSettings', 'AuditLog', 'CalculationJob',
+    'User', 'Project', 'Calculation', 'CalculationId', 'UserSettings', 'AuditLog', 'CalculationJob',
     'FeedbackPost', 'FeedbackPostLike', 'FeedbackReply', 'FeedbackReplyLike'
 ]
 
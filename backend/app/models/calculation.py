@@ -1,7 +1,7 @@
 # backend/app/models/calculation.py
 # Calculation Model - Store calculation bundles from shared engine
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean, Index, select
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -22,6 +22,10 @@ class Calculation(Base):
     __tablename__ = "calculations"
     
     # Primary Key (bundle_id from calculation engine)
+    # The table is range-partitioned by created_at (monthly, see
+    # migrate_calculations_partitioning.sql), so the database primary key is
+    # (id, created_at); the ORM identity stays `id` (__mapper_args__ below).
+    # Ids are kept unique by calculation_ids (CalculationId below).
     id = Column(String(36), primary_key=True)
     
     # Foreign Keys
@@ -36,9 +40,10 @@ class Calculation(Base):
     code_type = Column(String(10), nullable=False, default="cec")
     
     # Complete Calculation Bundle (JSONB for indexing)
-    inputs = Column(JSONB, nullable=False)
-    results = Column(JSONB, nullable=False)
-    steps = Column(JSONB, nullable=False)
+    # NULL once the bundle has been moved to cold storage (see cold_storage_key)
+    inputs = Column(JSONB, nullable=True)
+    results = Column(JSONB, nullable=True)
+    steps = Column(JSONB, nullable=True)
     warnings = Column(JSONB, nullable=True)
     
     # Engine Metadata
@@ -49,6 +54,11 @@ class Calculation(Base):
     # Note: sha256:<64-hex-chars> = 71 characters, so we use 128 for safety
     bundle_hash = Column(String(128), nullable=True)
     
+    # Cold storage (app/services/cold_storage.py): blob key of the offloaded
+    # inputs/results/steps/warnings, rehydrated on read and verified against bundle_hash
+    cold_storage_key = Column(String(255), nullable=True)
+    offloaded_at = Column(DateTime(timezone=True), nullable=True)
+    
     # Signing (future feature)
     is_signed = Column(Boolean, default=False, nullable=False, index=True)
     signature = Column(JSONB, nullable=True)
@@ -56,7 +66,7 @@ class Calculation(Base):
     signed_by = Column(String(200), nullable=True)
     
     # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), primary_key=True, index=True)
     calculation_time_ms = Column(Integer, nullable=True)
     
     # Soft Delete
@@ -65,9 +75,43 @@ class Calculation(Base):
     # Relationships
     project = relationship("Project", back_populates="calculations")
     
+    __table_args__ = (
+        # Live calculations of a project, newest first (list endpoints)
+        Index(
+            'ix_calculations_project_live_created',
+            project_id, created_at.desc(),
+            postgresql_where=deleted_at.is_(None)
+        ),
+        # Offload candidates: signed calculations still stored inline
+        Index(
+            'ix_calculations_offload_candidates',
+            created_at,
+            postgresql_where=(is_signed.is_(True) & cold_storage_key.is_(None))
+        ),
+        {'postgresql_partition_by': 'RANGE (created_at)'},
+    )
+    
+    __mapper_args__ = {
+        'primary_key': [id],
+        'eager_defaults': True,  # Fetch server-generated created_at with RETURNING
+    }
+    
     def __repr__(self):
         return f"<Calculation(id={self.id}, building_type='{self.building_type}', project_id={self.project_id})>"
     
+    @classmethod
+    def by_id(cls, calc_id: str):
+        """
+        WHERE clause selecting a calculation by id, scanning only its partition.
+        
+        created_at comes from calculation_ids in a scalar subquery, which
+        PostgreSQL evaluates before the scan and prunes the other partitions with.
+        
+        Usage: select(Calculation).where(Calculation.by_id(calc_id))
+        """
+        created_at = select(CalculationId.created_at).where(CalculationId.id == calc_id).scalar_subquery()
+        return (cls.id == calc_id) & (cls.created_at == created_at)
+    
     @staticmethod
     def _to_int_or_none(value):
         """Helper to safely convert value to int, handling strings and floats."""
@@ -87,12 +131,14 @@ class Calculation(Base):
         except (ValueError, TypeError):
             return None
     
-    def to_dict(self, include_bundle=True):
+    def to_dict(self, include_bundle=True, fields=None):
         """
         Convert calculation to dictionary.
         
         Args:
             include_bundle: If True, includes full inputs, results, steps, warnings
+            fields: Only these bundle fields (with include_bundle); the others may be
+                deferred columns and are not touched
         """
         data = {
             'id': self.id,
@@ -113,16 +159,21 @@ class Calculation(Base):
         }
         
         if include_bundle:
-            data['inputs'] = self.inputs if isinstance(self.inputs, dict) else {}
-            data['results'] = self.results if isinstance(self.results, dict) else {}
-            data['steps'] = self.steps if isinstance(self.steps, list) else []
-            data['warnings'] = self.warnings if isinstance(self.warnings, list) else []
+            if fields is None or 'inputs' in fields:
+                data['inputs'] = self.inputs if isinstance(self.inputs, dict) else {}
+            if fields is None or 'results' in fields:
+                data['results'] = self.results if isinstance(self.results, dict) else {}
+            if fields is None or 'steps' in fields:
+                data['steps'] = self.steps if isinstance(self.steps, list) else []
+            if fields is None or 'warnings' in fields:
+                data['warnings'] = self.warnings if isinstance(self.warnings, list) else []
             if self.is_signed and self.signature:
                 data['signature'] = self.signature
         
         # Extract legacy fields from results for backward compatibility
-        # Convert to int to match schema requirements
-        if isinstance(self.results, dict):
+        # Convert to int to match schema requirements (skipped if results is deferred:
+        # loaded column values live in the instance __dict__)
+        if 'results' in self.__dict__ and isinstance(self.results, dict):
             load_w = self.results.get('chosenCalculatedLoad_W') or self.results.get('calculatedLoadW')
             data['calculated_load_w'] = self._to_int_or_none(load_w)
             
@@ -154,4 +205,18 @@ class Calculation(Base):
         }
 
 
-
+class CalculationId(Base):
+    """
+    One row per calculation id: uniqueness of bundle ids across partitions.
+    
+    Maintained by triggers on calculations (migrate_calculation_ids.sql), in
+    the same transaction as the insert or delete; a second calculation with
+    an existing id fails with an IntegrityError on calculation_ids_pkey.
+    """
+    __tablename__ = "calculation_ids"
+    
+    id = Column(String(36), primary_key=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    
+    def __repr__(self):
+        return f"<CalculationId(id={self.id}, created_at={self.created_at})>"
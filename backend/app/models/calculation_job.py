@@ -44,7 +44,9 @@ class CalculationJob(Base):
     
     # Inputs and Result
     inputs = Column(JSONB, nullable=False)  # Calculation inputs
-    result_id = Column(String(36), ForeignKey("calculations.id", ondelete="SET NULL"), nullable=True)  # Reference to calculation result
+    # Reference to calculation result. calculations is partitioned by created_at, so
+    # calculations.id alone is not unique: the key references calculation_ids instead
+    result_id = Column(String(36), ForeignKey("calculation_ids.id", ondelete="SET NULL"), nullable=True, index=True)
     error = Column(Text, nullable=True)  # Error message if failed
     
     # Timestamps
@@ -56,7 +58,7 @@ class CalculationJob(Base):
     # Relationships
     user = relationship("User", foreign_keys=[user_id])
     project = relationship("Project", foreign_keys=[project_id])
-    calculation = relationship("Calculation", foreign_keys=[result_id])
+    calculation = relationship("Calculation", primaryjoin="foreign(CalculationJob.result_id) == Calculation.id")
     
     def __repr__(self):
         return f"<CalculationJob(job_id={self.job_id}, status='{self.status}', user_id={self.user_id})>"
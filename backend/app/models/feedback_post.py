@@ -1,10 +1,12 @@
 # backend/app/models/feedback_post.py
 # Feedback Post Model - User feedback and discussion posts
 
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, UniqueConstraint, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from ..database import Base
+from ..utils.search import search_vector_computed
 
 
 class FeedbackPost(Base):
@@ -42,11 +44,22 @@ class FeedbackPost(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
     
+    # Full-text search (generated, English + French, GIN indexed; never loaded by default)
+    search_vector = deferred(Column(
+        TSVECTOR,
+        search_vector_computed(('title', 'A'), ('content', 'B')),
+        nullable=True
+    ))
+    
     # Relationships
     author = relationship("User", back_populates="feedback_posts")
     replies = relationship("FeedbackReply", back_populates="post", cascade="all, delete-orphan", order_by="FeedbackReply.created_at")
     likes = relationship("FeedbackPostLike", back_populates="post", cascade="all, delete-orphan")
     
+    __table_args__ = (
+        Index('ix_feedback_posts_search_vector', 'search_vector', postgresql_using='gin'),
+    )
+    
     def __repr__(self):
         return f"<FeedbackPost(id={self.id}, title='{self.title[:50]}...', user_id={self.user_id})>"
     
@@ -99,6 +112,7 @@ class FeedbackPostLike(Base):
     
     # Unique constraint: one like per user per post
     __table_args__ = (
+        UniqueConstraint('post_id', 'user_id', name='uq_feedback_post_likes_post_user'),
         {'sqlite_autoincrement': True},
     )
 
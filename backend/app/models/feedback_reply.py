@@ -1,7 +1,7 @@
 # backend/app/models/feedback_reply.py
 # Feedback Reply Model - Replies to feedback posts
 
-from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, Boolean, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..database import Base
@@ -91,6 +91,7 @@ class FeedbackReplyLike(Base):
     
     # Unique constraint: one like per user per reply
     __table_args__ = (
+        UniqueConstraint('reply_id', 'user_id', name='uq_feedback_reply_likes_reply_user'),
         {'sqlite_autoincrement': True},
     )
 
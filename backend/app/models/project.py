@@ -1,10 +1,12 @@
 # backend/app/models/project.py
 # Project Model - Project Management
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from ..database import Base
+from ..utils.search import search_vector_computed
 
 
 class Project(Base):
@@ -36,15 +38,39 @@ class Project(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
     
+    # Full-text search (generated, English + French, GIN indexed; never loaded by default)
+    search_vector = deferred(Column(
+        TSVECTOR,
+        search_vector_computed(('name', 'A'), ('client_name', 'A'), ('location', 'B'), ('description', 'C')),
+        nullable=True
+    ))
+    
     # Relationships
     owner = relationship("User", back_populates="projects")
     calculations = relationship("Calculation", back_populates="project", cascade="all, delete-orphan")
     
+    __table_args__ = (
+        Index('ix_projects_search_vector', 'search_vector', postgresql_using='gin'),
+        # pg_trgm indexes for fuzzy matching on names and clients
+        Index('ix_projects_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+        Index('ix_projects_client_name_trgm', 'client_name', postgresql_using='gin', postgresql_ops={'client_name': 'gin_trgm_ops'}),
+    )
+    
     def __repr__(self):
         return f"<Project(id={self.id}, name='{self.name}', is_archived={self.is_archived})>"
     
-    def to_dict(self):
-        """Convert project to dictionary"""
+    def to_dict(self, calculation_count=None):
+        """
+        Convert project to dictionary.
+        
+        Args:
+            calculation_count: Precomputed calculation count (see ProjectService.count_calculations).
+                If None, the count is taken from the calculations relationship when it is loaded.
+        """
+        if calculation_count is None:
+            loaded = self.__dict__.get('calculations')
+            calculation_count = len(loaded) if loaded else 0
+        
         return {
             'id': self.id,
             'owner_id': self.owner_id,
@@ -55,7 +81,7 @@ class Project(Base):
             'is_archived': self.is_archived,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'calculation_count': len(self.calculations) if self.calculations else 0,
+            'calculation_count': calculation_count,
         }
 
 
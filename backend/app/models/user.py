@@ -27,6 +27,9 @@ class User(Base):
     is_active = Column(Boolean, default=True, nullable=False)
     is_verified = Column(Boolean, default=False, nullable=False)
     is_superuser = Column(Boolean, default=False, nullable=False)
+    # Bumped on password change / deactivation: access tokens carrying an
+    # older version are rejected (see app/utils/token_versions.py)
+    token_version = Column(Integer, default=0, server_default="0", nullable=False)
     
     # Password Reset
     reset_token = Column(String(255), nullable=True)
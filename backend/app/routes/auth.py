@@ -2,13 +2,15 @@
 # Authentication Routes
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..database import get_db
 from ..models import User
 from ..schemas import UserCreate, UserLogin, UserResponse, UserUpdate, Token, SuccessResponse
 from ..services.user_service import UserService
-from ..utils.security import get_current_user, create_access_token
+from ..utils.security import (
+    get_current_user, get_current_active_superuser, create_access_token, access_token_claims
+)
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
@@ -16,17 +18,17 @@ router = APIRouter(prefix="/auth", tags=["authentication"])
 @router.post("/register", response_model=Token, status_code=status.HTTP_201_CREATED)
 async def register(
     user_data: UserCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Register a new user.
     
     Creates a new user account and returns an access token.
     """
-    user = UserService.create_user(db, user_data)
+    user = await UserService.create_user(db, user_data)
     
     # Create access token
-    access_token = create_access_token(data={"sub": str(user.id), "email": user.email})
+    access_token = create_access_token(data=access_token_claims(user))
     
     return {
         "access_token": access_token,
@@ -38,12 +40,12 @@ async def register(
 @router.post("/token", response_model=Token)
 async def login(
     credentials: UserLogin,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Login user and get access token.
     """
-    result = UserService.login_for_access_token(db, credentials.email, credentials.password)
+    result = await UserService.login_for_access_token(db, credentials.email, credentials.password)
     return result
 
 
@@ -63,12 +65,12 @@ async def get_current_user_info(
 async def update_profile(
     user_data: UserUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Update current user's profile.
     """
-    updated_user = UserService.update_user(db, current_user, user_data)
+    updated_user = await UserService.update_user(db, current_user, user_data)
     return updated_user
 
 
@@ -77,14 +79,12 @@ async def change_password(
     old_password: str,
     new_password: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Change user password.
     """
-    from ..schemas.user import UserChangePassword
-    
-    UserService.change_password(db, current_user, old_password, new_password)
+    await UserService.change_password(db, current_user, old_password, new_password)
     
     return {
         "success": True,
@@ -92,3 +92,41 @@ async def change_password(
     }
 
 
+@router.post("/deactivate", response_model=SuccessResponse)
+async def deactivate_account(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Deactivate the current user's account.
+    
+    Access tokens issued before are revoked immediately.
+    """
+    await UserService.set_user_active(db, current_user, False)
+    
+    return {
+        "success": True,
+        "message": "Account deactivated"
+    }
+
+
+@router.put("/users/{user_id}/active", response_model=UserResponse)
+async def set_user_active(
+    user_id: int,
+    is_active: bool,
+    current_user: User = Depends(get_current_active_superuser),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Activate or deactivate a user account (superuser only).
+    
+    Deactivation revokes the user's access tokens immediately.
+    """
+    user = await UserService.get_user_by_id(db, user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    
+    return await UserService.set_user_active(db, user, is_active)
@@ -1,29 +1,105 @@
 # backend/app/routes/calculations.py
 # Calculation Management Routes
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import Response
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Awaitable, Callable, Optional, Tuple, Union
+from datetime import datetime
 
 from ..database import get_db
-from ..models import User
+from ..models import Calculation, Project
 from ..schemas import (
-    CalculationCreate, CalculationResponse, CalculationList,
-    CalculationListItem, PaginatedResponse, PaginationMeta
+    CalculationCreate, CalculationResponse, CalculationPartialResponse, CalculationList,
+    CalculationListItem, PaginatedResponse, PaginationMeta,
+    CalculationBulkSyncRequest, CalculationBulkSyncResponse
 )
 from ..services.calculation_service import CalculationService
+from ..services.cold_storage import BUNDLE_FIELDS
 from ..services.calculation_coordinator import CalculationCoordinator
-from ..utils.security import get_current_user
+from ..utils.security import get_current_principal
+from ..utils.auth_cache import Principal
+from ..utils.responses import IMMUTABLE_CACHE_CONTROL, etag_matches, json_response, not_modified_response
 
 router = APIRouter(prefix="/calculations", tags=["calculations"])
 
+# Fields left out of a projected response when absent (not requested)
+PROJECTED_FIELDS = (*BUNDLE_FIELDS, 'steps_offset', 'steps_total', 'calculated_load_w', 'service_amperage')
+
+
+def _parse_fields(fields: str) -> Tuple[str, ...]:
+    """
+    Parse the ?fields= projection (comma-separated bundle fields, '' for none).
+    
+    Raises:
+        HTTPException: If a field is not a bundle field
+    """
+    selected = tuple(dict.fromkeys(field.strip() for field in fields.split(",") if field.strip()))
+    unknown = [field for field in selected if field not in BUNDLE_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)} (allowed: {', '.join(BUNDLE_FIELDS)})"
+        )
+    return selected
+
+
+async def _bundle_response(
+    request: Request,
+    db: AsyncSession,
+    calc_id: str,
+    user_id: int,
+    load: Callable[[AsyncSession, str, int], Awaitable[Calculation]],
+    fields: Optional[str] = None,
+    steps_offset: int = 0,
+    steps_limit: Optional[int] = None
+) -> Response:
+    """
+    Calculation response with conditional GET for signed bundles and optional projection.
+    
+    Signed bundles carry a strong ETag (their bundle_hash) and may be cached as
+    immutable. A matching If-None-Match is answered with 304 after a metadata-only
+    lookup, before the JSONB columns (or a cold storage blob) are read.
+    
+    With fields and/or steps paging, only the requested bundle fields and steps
+    are loaded (CalculationService.get_calculation_projection).
+    """
+    selected = _parse_fields(fields) if fields is not None else BUNDLE_FIELDS
+    page_steps = steps_offset > 0 or steps_limit is not None
+    if page_steps and 'steps' not in selected:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="steps_offset and steps_limit require steps in fields"
+        )
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        etag = await CalculationService.get_calculation_etag(db, calc_id, user_id)
+        if etag and etag_matches(if_none_match, etag):
+            return not_modified_response({"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL})
+    
+    if fields is None and not page_steps:
+        calculation = await load(db, calc_id, user_id)
+        etag = CalculationService.bundle_etag(calculation)
+        headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL} if etag else None
+        return json_response(CalculationResponse, calculation.to_dict(include_bundle=True), headers=headers)
+    
+    calculation, data = await CalculationService.get_calculation_projection(
+        db, calc_id, user_id, selected, steps_offset, steps_limit
+    )
+    etag = CalculationService.bundle_etag(calculation)
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL} if etag else None
+    exclude = [field for field in PROJECTED_FIELDS if field not in data]
+    return json_response(CalculationPartialResponse, data, headers=headers, exclude=exclude)
+
 
 @router.post("", response_model=CalculationResponse, status_code=status.HTTP_201_CREATED)
 async def create_calculation(
     inputs: dict,
     project_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
     jurisdiction_config: Optional[dict] = None
 ):
     """
@@ -56,22 +132,22 @@ async def create_calculation(
     if 'jurisdictionConfig' in inputs:
         inputs = {k: v for k, v in inputs.items() if k != 'jurisdictionConfig'}
     
-    calculation = CalculationCoordinator.execute_calculation(
+    calculation = await CalculationCoordinator.execute_calculation(
         db=db,
         inputs=inputs,
         user_id=current_user.id,
         project_id=project_id,
         jurisdiction_config=config
     )
-    return calculation.to_dict(include_bundle=True)
+    return json_response(CalculationResponse, calculation.to_dict(include_bundle=True), status.HTTP_201_CREATED)
 
 
 @router.post("/execute", response_model=CalculationResponse, status_code=status.HTTP_201_CREATED)
 async def execute_calculation(
     inputs: dict,
     project_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Execute an authoritative calculation with trusted audit trail.
@@ -90,21 +166,21 @@ async def execute_calculation(
     if 'jurisdictionConfig' in inputs:
         inputs = {k: v for k, v in inputs.items() if k != 'jurisdictionConfig'}
     
-    calculation = CalculationCoordinator.execute_calculation(
+    calculation = await CalculationCoordinator.execute_calculation(
         db=db,
         inputs=inputs,
         user_id=current_user.id,
         project_id=project_id,
         jurisdiction_config=config
     )
-    return calculation.to_dict(include_bundle=True)
+    return json_response(CalculationResponse, calculation.to_dict(include_bundle=True), status.HTTP_201_CREATED)
 
 
 @router.post("/sync", response_model=CalculationResponse, status_code=status.HTTP_201_CREATED)
 async def sync_calculation(
     calc_data: CalculationCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Sync a calculation to the cloud (legacy endpoint).
@@ -115,44 +191,67 @@ async def sync_calculation(
     Note: This endpoint exists for backward compatibility but should not be used
     for new calculations. Use /execute instead for trusted, auditable results.
     """
-    calculation = CalculationService.create_calculation(db, calc_data, current_user.id)
+    calculation = await CalculationService.create_calculation(db, calc_data, current_user.id)
     return calculation
 
 
+@router.post("/sync/bulk", response_model=CalculationBulkSyncResponse)
+async def bulk_sync_calculations(
+    request: CalculationBulkSyncRequest,
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Sync many offline calculations in one request (legacy bundles).
+    
+    Same semantics as /sync for each item, but ownership is checked for all
+    projects at once and rows are upserted in batches with a single commit.
+    Each item gets its own outcome; one failing item does not fail the request.
+    """
+    results = await CalculationService.bulk_sync_calculations(db, request.calculations, current_user.id)
+    counts = {status_: sum(1 for r in results if r['status'] == status_) for status_ in ('created', 'updated', 'skipped', 'error')}
+    return {
+        "results": results,
+        "created": counts['created'],
+        "updated": counts['updated'],
+        "skipped": counts['skipped'],
+        "failed": counts['error'],
+    }
+
+
 @router.get("", response_model=CalculationList)
 async def list_calculations(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    created_after: Optional[datetime] = Query(None, description="Only calculations created at or after this time"),
+    created_before: Optional[datetime] = Query(None, description="Only calculations created before this time"),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     List user's calculations across all projects.
     
     Note: This endpoint returns list items without full bundle_data for performance.
     Use the detail endpoint to get the complete bundle.
+    created_after/created_before limit the scan to the matching monthly partitions.
     """
-    from ..models import Calculation, Project
-    from sqlalchemy import select
-    
-    # Get user's project IDs
-    user_projects = db.query(Project).filter(Project.owner_id == current_user.id).all()
-    project_ids = [p.id for p in user_projects]
-    
-    if not project_ids:
-        return {"calculations": [], "total": 0}
+    # User's projects (exclude soft-deleted calculations)
+    user_project_ids = select(Project.id).where(Project.owner_id == current_user.id)
+    filters = (
+        Calculation.project_id.in_(user_project_ids),
+        Calculation.deleted_at.is_(None),  # Exclude soft-deleted
+        *CalculationService.created_range_filters(created_after, created_before)
+    )
     
-    # Get calculations (exclude soft-deleted)
-    calculations = db.query(Calculation).filter(
-        Calculation.project_id.in_(project_ids),
-        Calculation.deleted_at.is_(None)  # Exclude soft-deleted
-    ).order_by(Calculation.created_at.desc()).offset(skip).limit(limit).all()
+    # Get calculations
+    result = await db.scalars(
+        select(Calculation).where(*filters)
+        .order_by(Calculation.created_at.desc()).offset(skip).limit(limit)
+    )
+    calculations = list(result)
     
-    # Get total (exclude soft-deleted)
-    total = db.query(Calculation).filter(
-        Calculation.project_id.in_(project_ids),
-        Calculation.deleted_at.is_(None)
-    ).count()
+    # Get total
+    total = await db.scalar(select(func.count(Calculation.id)).where(*filters))
     
     return {
         "calculations": [calc.to_dict(include_bundle=False) for calc in calculations],
@@ -160,50 +259,69 @@ async def list_calculations(
     }
 
 
-@router.get("/{calc_id}", response_model=CalculationResponse)
+@router.get("/{calc_id}", response_model=Union[CalculationResponse, CalculationPartialResponse])
 async def get_calculation(
     calc_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    fields: Optional[str] = Query(None, description="Bundle fields to return, comma-separated (inputs,results,steps,warnings)"),
+    steps_offset: int = Query(0, ge=0, description="First audit trail step to return"),
+    steps_limit: Optional[int] = Query(None, ge=1, le=1000, description="Maximum number of steps to return"),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get calculation by bundle ID (includes full bundle_data).
+    
+    Signed calculations return an ETag and honour If-None-Match (304).
+    ?fields= and steps_offset/steps_limit return only part of the bundle; the
+    rest is not read from the database.
     """
-    calculation = CalculationService.get_calculation_by_id(db, calc_id, current_user.id)
-    return calculation.to_dict(include_bundle=True)
+    return await _bundle_response(
+        request, db, calc_id, current_user.id, CalculationService.get_calculation_by_id,
+        fields, steps_offset, steps_limit
+    )
 
 
 @router.delete("/{calc_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_calculation(
     calc_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Delete a calculation (soft delete).
     """
-    CalculationService.delete_calculation(db, calc_id, current_user.id)
+    await CalculationService.delete_calculation(db, calc_id, current_user.id)
     return None
 
 
-@router.get("/by-bundle/{bundle_id}", response_model=CalculationResponse)
+@router.get("/by-bundle/{bundle_id}", response_model=Union[CalculationResponse, CalculationPartialResponse])
 async def get_calculation_by_bundle_id(
     bundle_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    fields: Optional[str] = Query(None, description="Bundle fields to return, comma-separated (inputs,results,steps,warnings)"),
+    steps_offset: int = Query(0, ge=0, description="First audit trail step to return"),
+    steps_limit: Optional[int] = Query(None, ge=1, le=1000, description="Maximum number of steps to return"),
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get calculation by bundle_id (includes full bundle_data).
+    
+    Signed calculations return an ETag and honour If-None-Match (304).
+    ?fields= and steps_offset/steps_limit return only part of the bundle.
     """
-    calculation = CalculationService.get_calculation_by_bundle_id(db, bundle_id, current_user.id)
-    return calculation.to_dict(include_bundle=True)
+    return await _bundle_response(
+        request, db, bundle_id, current_user.id, CalculationService.get_calculation_by_bundle_id,
+        fields, steps_offset, steps_limit
+    )
 
 
 @router.post("/{calc_id}/sign", response_model=CalculationResponse, status_code=status.HTTP_200_OK)
 async def sign_calculation(
     calc_id: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Sign a calculation bundle after user approval.
@@ -223,11 +341,11 @@ async def sign_calculation(
     Returns:
         Signed Calculation object
     """
-    calculation = CalculationCoordinator.sign_calculation(
+    calculation = await CalculationCoordinator.sign_calculation(
         db=db,
         calculation_id=calc_id,
         user_id=current_user.id
     )
-    return calculation.to_dict(include_bundle=True)
+    return json_response(CalculationResponse, calculation.to_dict(include_bundle=True))
 
 
@@ -1,56 +1,88 @@
 # backend/app/routes/feedback.py
 # Feedback/Forum Routes
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, or_, desc
-from typing import Optional, List
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from sqlalchemy.orm import joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, desc
+from typing import Optional, List, Set
 
 from ..database import get_db
-from ..models import User, FeedbackPost, FeedbackReply, FeedbackPostLike, FeedbackReplyLike
+from ..db_routing import client_key
+from ..models import FeedbackPost, FeedbackReply, FeedbackPostLike, FeedbackReplyLike
 from ..schemas.feedback import (
-    FeedbackPostCreate, FeedbackPostUpdate, FeedbackPostResponse, FeedbackPostListResponse,
+    FeedbackPostCreate, FeedbackPostUpdate, FeedbackPostResponse,
     FeedbackPostList, FeedbackReplyCreate, FeedbackReplyUpdate, FeedbackReplyResponse
 )
 from ..schemas.common import SuccessResponse
-from ..utils.security import get_current_user, get_current_user_optional
+from ..services.feedback_service import FeedbackService
+from ..services.view_counter import view_counter
+from ..utils.security import get_current_principal, get_current_principal_optional
+from ..utils.auth_cache import Principal
+from ..utils.search import prefix_tsquery, tsquery_expression
+from ..utils.responses import json_response
 
 router = APIRouter(prefix="/feedback", tags=["feedback"])
 
 
+async def _get_liked_post_ids(db: AsyncSession, user_id: int, post_ids: List[int]) -> Set[int]:
+    """
+    Return the subset of post_ids the user has liked, using a single IN-list query.
+    
+    Args:
+        db: Database session
+        user_id: User ID to check likes for
+        post_ids: Post IDs on the current page
+        
+    Returns:
+        Set of liked post IDs
+    """
+    if not post_ids:
+        return set()
+    
+    result = await db.scalars(
+        select(FeedbackPostLike.post_id).where(
+            FeedbackPostLike.user_id == user_id,
+            FeedbackPostLike.post_id.in_(post_ids)
+        )
+    )
+    return set(result)
+
+
 @router.get("/posts", response_model=FeedbackPostList)
 async def get_posts(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     category: Optional[str] = Query(None),
     search: Optional[str] = Query(None),
-    sort: str = Query("newest", pattern="^(newest|oldest|most_liked|most_replies)$"),
-    current_user: Optional[User] = Depends(get_current_user_optional),
-    db: Session = Depends(get_db)
+    sort: str = Query("newest", pattern="^(newest|oldest|most_liked|most_replies|relevance)$"),
+    current_user: Optional[Principal] = Depends(get_current_principal_optional),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get list of feedback posts with pagination.
     
-    Supports filtering by category, search, and sorting.
+    Supports filtering by category, full-text search, and sorting.
+    sort=relevance ranks search matches (falls back to newest without a search).
     """
-    query = db.query(FeedbackPost)
+    query = select(FeedbackPost)
     
     # Filter by category
     if category:
-        query = query.filter(FeedbackPost.category == category)
-    
-    # Search in title and content
-    if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            or_(
-                FeedbackPost.title.ilike(search_term),
-                FeedbackPost.content.ilike(search_term)
-            )
-        )
+        query = query.where(FeedbackPost.category == category)
+    
+    # Full-text search in title and content (English + French, prefix matching)
+    rank = None
+    query_text = prefix_tsquery(search) if search else None
+    if query_text:
+        ts_query = tsquery_expression(query_text)
+        query = query.where(FeedbackPost.search_vector.op('@@')(ts_query))
+        rank = func.ts_rank(FeedbackPost.search_vector, ts_query)
     
     # Sorting
-    if sort == "newest":
+    if sort == "relevance" and rank is not None:
+        query = query.order_by(desc(FeedbackPost.is_pinned), desc(rank), desc(FeedbackPost.created_at))
+    elif sort in ("newest", "relevance"):
         query = query.order_by(desc(FeedbackPost.is_pinned), desc(FeedbackPost.created_at))
     elif sort == "oldest":
         query = query.order_by(desc(FeedbackPost.is_pinned), FeedbackPost.created_at)
@@ -60,50 +92,56 @@ async def get_posts(
         query = query.order_by(desc(FeedbackPost.is_pinned), desc(FeedbackPost.reply_count))
     
     # Get total count
-    total = query.count()
+    total = await db.scalar(select(func.count()).select_from(query.order_by(None).subquery()))
     
-    # Pagination
+    # Pagination (authors are loaded in the same statement to avoid N+1 lazy loads)
     offset = (page - 1) * page_size
-    posts = query.offset(offset).limit(page_size).all()
+    result = await db.scalars(query.options(joinedload(FeedbackPost.author)).offset(offset).limit(page_size))
+    posts = list(result)
+    
+    # Resolve user_has_liked for the whole page in one query
+    liked_post_ids = (
+        await _get_liked_post_ids(db, current_user.id, [post.id for post in posts])
+        if current_user else set()
+    )
     
     # Convert to response format
     items = []
     for post in posts:
         post_dict = post.to_dict()
-        # Check if current user has liked this post
-        if current_user:
-            like = db.query(FeedbackPostLike).filter(
-                FeedbackPostLike.post_id == post.id,
-                FeedbackPostLike.user_id == current_user.id
-            ).first()
-            post_dict['user_has_liked'] = like is not None
-        else:
-            post_dict['user_has_liked'] = False
-        items.append(FeedbackPostListResponse(**post_dict))
+        post_dict['user_has_liked'] = post.id in liked_post_ids
+        items.append(post_dict)
     
     total_pages = (total + page_size - 1) // page_size
     
-    return FeedbackPostList(
-        items=items,
-        total=total,
-        page=page,
-        page_size=page_size,
-        total_pages=total_pages
-    )
+    return json_response(FeedbackPostList, {
+        "items": items,
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "total_pages": total_pages
+    })
 
 
 @router.get("/posts/{post_id}", response_model=FeedbackPostResponse)
 async def get_post(
     post_id: int,
-    current_user: Optional[User] = Depends(get_current_user_optional),
-    db: Session = Depends(get_db)
+    request: Request,
+    threaded: bool = Query(False, description="Return replies nested under their parents"),
+    max_depth: Optional[int] = Query(None, ge=0, description="Maximum reply nesting depth (0 = top-level only)"),
+    reply_limit: Optional[int] = Query(None, ge=1, le=500, description="Maximum number of top-level replies"),
+    reply_offset: int = Query(0, ge=0, description="Number of top-level replies to skip"),
+    current_user: Optional[Principal] = Depends(get_current_principal_optional),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get a single post with all replies.
     
-    Increments view count.
+    Records a view (buffered and deduplicated per viewer). Replies are returned as a flat list in
+    creation order (clients rebuild the thread from parent_reply_id) unless threaded=true. Huge threads can be
+    paged by top-level reply and truncated by depth.
     """
-    post = db.query(FeedbackPost).filter(FeedbackPost.id == post_id).first()
+    post = await db.get(FeedbackPost, post_id, options=[joinedload(FeedbackPost.author)])
     
     if not post:
         raise HTTPException(
@@ -111,31 +149,42 @@ async def get_post(
             detail="Post not found"
         )
     
-    # Increment view count
-    post.view_count += 1
-    db.commit()
+    # Record the view in the write-behind buffer (flushed in batches, no row lock here)
+    if current_user:
+        viewer_key = f"user:{current_user.id}"
+    else:
+        # Behind the proxy request.client is the proxy itself; client_key uses the forwarded address
+        viewer_key = f"anon:{client_key(request)}"
+    view_counter.record(post.id, viewer_key)
     
-    # Get post with replies
-    post_dict = post.to_dict(include_replies=True)
+    post_dict = post.to_dict()
+    post_dict['view_count'] += view_counter.pending(post.id)
+    
+    # Load the whole reply tree (authors and reply likes included) in one query
+    post_dict['replies'] = await FeedbackService.load_reply_tree(
+        db,
+        post.id,
+        user_id=current_user.id if current_user else None,
+        max_depth=max_depth,
+        limit=reply_limit,
+        offset=reply_offset,
+        threaded=threaded
+    )
     
     # Check if current user has liked this post
     if current_user:
-        like = db.query(FeedbackPostLike).filter(
-            FeedbackPostLike.post_id == post.id,
-            FeedbackPostLike.user_id == current_user.id
-        ).first()
-        post_dict['user_has_liked'] = like is not None
+        post_dict['user_has_liked'] = post.id in await _get_liked_post_ids(db, current_user.id, [post.id])
     else:
         post_dict['user_has_liked'] = False
     
-    return FeedbackPostResponse(**post_dict)
+    return json_response(FeedbackPostResponse, post_dict)
 
 
 @router.post("/posts", response_model=FeedbackPostResponse, status_code=status.HTTP_201_CREATED)
 async def create_post(
     post_data: FeedbackPostCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Create a new feedback post.
@@ -150,28 +199,29 @@ async def create_post(
     )
     
     db.add(post)
-    db.commit()
-    db.refresh(post)
+    await db.commit()
+    await db.refresh(post)
+    await post.awaitable_attrs.author
     
     post_dict = post.to_dict()
     post_dict['user_has_liked'] = False
     
-    return FeedbackPostResponse(**post_dict)
+    return json_response(FeedbackPostResponse, post_dict, status.HTTP_201_CREATED)
 
 
 @router.put("/posts/{post_id}", response_model=FeedbackPostResponse)
 async def update_post(
     post_id: int,
     post_data: FeedbackPostUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Update a post.
     
     Only the author or superuser can update.
     """
-    post = db.query(FeedbackPost).filter(FeedbackPost.id == post_id).first()
+    post = await db.get(FeedbackPost, post_id)
     
     if not post:
         raise HTTPException(
@@ -196,32 +246,29 @@ async def update_post(
     if post_data.is_resolved is not None:
         post.is_resolved = post_data.is_resolved
     
-    db.commit()
-    db.refresh(post)
+    await db.commit()
+    await db.refresh(post)
+    await post.awaitable_attrs.author
     
     post_dict = post.to_dict()
     # Check if current user has liked
-    like = db.query(FeedbackPostLike).filter(
-        FeedbackPostLike.post_id == post.id,
-        FeedbackPostLike.user_id == current_user.id
-    ).first()
-    post_dict['user_has_liked'] = like is not None
+    post_dict['user_has_liked'] = post.id in await _get_liked_post_ids(db, current_user.id, [post.id])
     
-    return FeedbackPostResponse(**post_dict)
+    return json_response(FeedbackPostResponse, post_dict)
 
 
 @router.delete("/posts/{post_id}", response_model=SuccessResponse)
 async def delete_post(
     post_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Delete a post.
     
     Only the author or superuser can delete.
     """
-    post = db.query(FeedbackPost).filter(FeedbackPost.id == post_id).first()
+    post = await db.get(FeedbackPost, post_id)
     
     if not post:
         raise HTTPException(
@@ -236,8 +283,8 @@ async def delete_post(
             detail="Not authorized to delete this post"
         )
     
-    db.delete(post)
-    db.commit()
+    await db.delete(post)
+    await db.commit()
     
     return SuccessResponse(success=True, message="Post deleted successfully")
 
@@ -245,49 +292,35 @@ async def delete_post(
 @router.post("/posts/{post_id}/like", response_model=SuccessResponse)
 async def toggle_post_like(
     post_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Toggle like on a post.
     
     If already liked, removes the like. Otherwise, adds a like.
+    The toggle and the like_count update happen in a single atomic statement.
     """
-    post = db.query(FeedbackPost).filter(FeedbackPost.id == post_id).first()
+    result = await FeedbackService.toggle_like(
+        db, FeedbackPostLike, FeedbackPost, 'post_id', post_id, current_user.id
+    )
     
-    if not post:
+    if result is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Post not found"
         )
     
-    # Check if already liked
-    existing_like = db.query(FeedbackPostLike).filter(
-        FeedbackPostLike.post_id == post_id,
-        FeedbackPostLike.user_id == current_user.id
-    ).first()
-    
-    if existing_like:
-        # Remove like
-        db.delete(existing_like)
-        post.like_count = max(0, post.like_count - 1)
-        db.commit()
-        return SuccessResponse(success=True, message="Like removed")
-    else:
-        # Add like
-        like = FeedbackPostLike(post_id=post_id, user_id=current_user.id)
-        db.add(like)
-        post.like_count += 1
-        db.commit()
-        return SuccessResponse(success=True, message="Post liked")
+    liked, _ = result
+    return SuccessResponse(success=True, message="Post liked" if liked else "Like removed")
 
 
 @router.post("/posts/{post_id}/replies", response_model=FeedbackReplyResponse, status_code=status.HTTP_201_CREATED)
 async def create_reply(
     post_id: int,
     reply_data: FeedbackReplyCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Create a reply to a post.
@@ -295,7 +328,7 @@ async def create_reply(
     Can also reply to another reply (nested replies).
     """
     # Verify post exists
-    post = db.query(FeedbackPost).filter(FeedbackPost.id == post_id).first()
+    post = await db.get(FeedbackPost, post_id)
     
     if not post:
         raise HTTPException(
@@ -311,10 +344,12 @@ async def create_reply(
     
     # If replying to another reply, verify it exists and belongs to the same post
     if reply_data.parent_reply_id:
-        parent_reply = db.query(FeedbackReply).filter(
-            FeedbackReply.id == reply_data.parent_reply_id,
-            FeedbackReply.post_id == post_id
-        ).first()
+        parent_reply = await db.scalar(
+            select(FeedbackReply).where(
+                FeedbackReply.id == reply_data.parent_reply_id,
+                FeedbackReply.post_id == post_id
+            )
+        )
         
         if not parent_reply:
             raise HTTPException(
@@ -332,25 +367,26 @@ async def create_reply(
     
     db.add(reply)
     post.reply_count += 1
-    db.commit()
-    db.refresh(reply)
+    await db.commit()
+    await db.refresh(reply)
+    await reply.awaitable_attrs.author
     
-    return FeedbackReplyResponse(**reply.to_dict())
+    return json_response(FeedbackReplyResponse, reply.to_dict(), status.HTTP_201_CREATED)
 
 
 @router.put("/replies/{reply_id}", response_model=FeedbackReplyResponse)
 async def update_reply(
     reply_id: int,
     reply_data: FeedbackReplyUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Update a reply.
     
     Only the author can update.
     """
-    reply = db.query(FeedbackReply).filter(FeedbackReply.id == reply_id).first()
+    reply = await db.get(FeedbackReply, reply_id)
     
     if not reply:
         raise HTTPException(
@@ -367,24 +403,25 @@ async def update_reply(
     
     reply.content = reply_data.content
     reply.is_edited = True
-    db.commit()
-    db.refresh(reply)
+    await db.commit()
+    await db.refresh(reply)
+    await reply.awaitable_attrs.author
     
-    return FeedbackReplyResponse(**reply.to_dict())
+    return json_response(FeedbackReplyResponse, reply.to_dict())
 
 
 @router.delete("/replies/{reply_id}", response_model=SuccessResponse)
 async def delete_reply(
     reply_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Delete a reply.
     
     Only the author or superuser can delete.
     """
-    reply = db.query(FeedbackReply).filter(FeedbackReply.id == reply_id).first()
+    reply = await db.get(FeedbackReply, reply_id)
     
     if not reply:
         raise HTTPException(
@@ -400,12 +437,12 @@ async def delete_reply(
         )
     
     # Decrement reply count on post
-    post = db.query(FeedbackPost).filter(FeedbackPost.id == reply.post_id).first()
+    post = await db.get(FeedbackPost, reply.post_id)
     if post:
         post.reply_count = max(0, post.reply_count - 1)
     
-    db.delete(reply)
-    db.commit()
+    await db.delete(reply)
+    await db.commit()
     
     return SuccessResponse(success=True, message="Reply deleted successfully")
 
@@ -413,39 +450,24 @@ async def delete_reply(
 @router.post("/replies/{reply_id}/like", response_model=SuccessResponse)
 async def toggle_reply_like(
     reply_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Toggle like on a reply.
     """
-    reply = db.query(FeedbackReply).filter(FeedbackReply.id == reply_id).first()
+    result = await FeedbackService.toggle_like(
+        db, FeedbackReplyLike, FeedbackReply, 'reply_id', reply_id, current_user.id
+    )
     
-    if not reply:
+    if result is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Reply not found"
         )
     
-    # Check if already liked
-    existing_like = db.query(FeedbackReplyLike).filter(
-        FeedbackReplyLike.reply_id == reply_id,
-        FeedbackReplyLike.user_id == current_user.id
-    ).first()
-    
-    if existing_like:
-        # Remove like
-        db.delete(existing_like)
-        reply.like_count = max(0, reply.like_count - 1)
-        db.commit()
-        return SuccessResponse(success=True, message="Like removed")
-    else:
-        # Add like
-        like = FeedbackReplyLike(reply_id=reply_id, user_id=current_user.id)
-        db.add(like)
-        reply.like_count += 1
-        db.commit()
-        return SuccessResponse(success=True, message="Reply liked")
+    liked, _ = result
+    return SuccessResponse(success=True, message="Reply liked" if liked else "Like removed")
 
 
 @router.get("/categories", response_model=List[dict])
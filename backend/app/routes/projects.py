@@ -2,18 +2,19 @@
 # Project Management Routes
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from datetime import datetime
 
 from ..database import get_db
-from ..models import User, Project
+from ..models import Project
 from ..schemas import (
     ProjectCreate, ProjectUpdate, ProjectResponse, ProjectList,
     PaginatedResponse, PaginationMeta
 )
 from ..services.project_service import ProjectService
-from ..utils.security import get_current_user
+from ..utils.security import get_current_principal
+from ..utils.auth_cache import Principal
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
@@ -21,13 +22,13 @@ router = APIRouter(prefix="/projects", tags=["projects"])
 @router.post("", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
 async def create_project(
     project_data: ProjectCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Create a new project.
     """
-    project = ProjectService.create_project(db, project_data, current_user.id)
+    project = await ProjectService.create_project(db, project_data, current_user.id)
     return project
 
 
@@ -37,8 +38,8 @@ async def list_projects(
     limit: int = Query(100, ge=1, le=100),
     search: Optional[str] = None,
     archived: Optional[bool] = Query(None, description="Filter by archived status (true=archived, false=active)"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     List user's projects with pagination.
@@ -47,16 +48,19 @@ async def list_projects(
     Supports filtering by archived status.
     """
     # Get projects
-    projects = ProjectService.list_user_projects(
+    projects = await ProjectService.list_user_projects(
         db, current_user.id, skip, limit, search, archived
     )
     
-    # Get total count (simplified - in production, use a separate count query)
-    total = len(ProjectService.list_user_projects(db, current_user.id, 0, 10000, search, archived))
+    # Get total count
+    total = await ProjectService.count_user_projects(db, current_user.id, search, archived)
+    
+    # Calculation counts for the page in one grouped query
+    calculation_counts = await ProjectService.count_calculations(db, [project.id for project in projects])
     
     # Create response
     return PaginatedResponse(
-        items=[project.to_dict() for project in projects],
+        items=[project.to_dict(calculation_count=calculation_counts.get(project.id, 0)) for project in projects],
         meta=PaginationMeta.from_params(skip // limit + 1, limit, total)
     )
 
@@ -64,13 +68,13 @@ async def list_projects(
 @router.get("/{project_id}", response_model=ProjectResponse)
 async def get_project(
     project_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get project by ID.
     """
-    project = ProjectService.get_project_by_id(db, project_id, current_user.id)
+    project = await ProjectService.get_project_by_id(db, project_id, current_user.id)
     return project
 
 
@@ -78,28 +82,28 @@ async def get_project(
 async def update_project(
     project_id: int,
     project_data: ProjectUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Update a project.
     """
-    project = ProjectService.update_project(db, project_id, project_data, current_user.id)
+    project = await ProjectService.update_project(db, project_id, project_data, current_user.id)
     return project
 
 
 @router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_project(
     project_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Delete a project.
     
     This will also delete all associated calculations.
     """
-    ProjectService.delete_project(db, project_id, current_user.id)
+    await ProjectService.delete_project(db, project_id, current_user.id)
     return None
 
 
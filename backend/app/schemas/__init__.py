@@ -3,7 +3,10 @@
 
 from .user import UserCreate, UserLogin, UserResponse, UserUpdate, Token, TokenData
 from .project import ProjectCreate, ProjectUpdate, ProjectResponse, ProjectList
-from .calculation import CalculationCreate, CalculationResponse, CalculationList, CalculationListItem
+from .calculation import (
+    CalculationCreate, CalculationResponse, CalculationPartialResponse, CalculationList, CalculationListItem,
+    CalculationBulkSyncRequest, CalculationSyncResult, CalculationBulkSyncResponse
+)
 from .feedback import (
     FeedbackPostCreate, FeedbackPostUpdate, FeedbackPostResponse, FeedbackPostListResponse,
     FeedbackPostList, FeedbackReplyCreate, FeedbackReplyUpdate, FeedbackReplyResponse
@@ -16,7 +19,8 @@ __all__ = [
     # Project schemas
     'ProjectCreate', 'ProjectUpdate', 'ProjectResponse', 'ProjectList',
     # Calculation schemas
-    'CalculationCreate', 'CalculationResponse', 'CalculationList',
+    'CalculationCreate', 'CalculationResponse', 'CalculationPartialResponse', 'CalculationList',
+    'CalculationBulkSyncRequest', 'CalculationSyncResult', 'CalculationBulkSyncResponse',
     # Feedback schemas
     'FeedbackPostCreate', 'FeedbackPostUpdate', 'FeedbackPostResponse', 'FeedbackPostListResponse',
     'FeedbackPostList', 'FeedbackReplyCreate', 'FeedbackReplyResponse',
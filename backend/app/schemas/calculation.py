@@ -51,6 +51,20 @@ class CalculationResponse(CalculationBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class CalculationPartialResponse(CalculationResponse):
+    """
+    Schema for a projected calculation (?fields= and steps paging).
+    
+    Bundle fields that were not requested are omitted from the response, and so
+    are the legacy fields unless results was requested.
+    """
+    inputs: Optional[Dict[str, Any]] = None
+    results: Optional[Dict[str, Any]] = None
+    steps: Optional[List[Dict[str, Any]]] = None
+    steps_offset: Optional[int] = None  # First step returned (steps paging only)
+    steps_total: Optional[int] = None  # Length of the whole audit trail (steps paging only)
+
+
 class CalculationListItem(BaseModel):
     """Schema for calculation list item (bundle excluded for performance)"""
     id: int
@@ -75,4 +89,23 @@ class CalculationList(BaseModel):
     total: int
 
 
+class CalculationBulkSyncRequest(BaseModel):
+    """Schema for bulk sync of offline calculations"""
+    calculations: List[CalculationCreate] = Field(..., min_length=1, max_length=500)
+
+
+class CalculationSyncResult(BaseModel):
+    """Outcome of one item of a bulk sync"""
+    index: int  # Position in the request
+    bundle_id: str
+    status: str  # created, updated, skipped, error
+    detail: Optional[str] = None
+
 
+class CalculationBulkSyncResponse(BaseModel):
+    """Schema for bulk sync response"""
+    results: List[CalculationSyncResult]
+    created: int
+    updated: int
+    skipped: int
+    failed: int
@@ -43,6 +43,7 @@ class FeedbackReplyResponse(FeedbackReplyBase):
     updated_at: Optional[datetime] = None
     author: Optional[AuthorInfo] = None
     replies: Optional[List['FeedbackReplyResponse']] = None  # Nested replies
+    user_has_liked: Optional[bool] = None  # Whether current user has liked this reply
     
     model_config = ConfigDict(from_attributes=True)
 
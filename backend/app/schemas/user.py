@@ -64,6 +64,10 @@ class TokenData(BaseModel):
     """Data extracted from JWT token"""
     user_id: Optional[int] = None
     email: Optional[str] = None
+    # Stateless claims (JWT_STATELESS_CLAIMS), absent from older tokens
+    is_active: Optional[bool] = None
+    is_superuser: Optional[bool] = None
+    token_version: Optional[int] = None
 
 
 
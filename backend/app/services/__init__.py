@@ -4,8 +4,9 @@
 from .user_service import UserService
 from .project_service import ProjectService
 from .calculation_service import CalculationService
+from .feedback_service import FeedbackService
 
-__all__ = ['UserService', 'ProjectService', 'CalculationService']
+__all__ = ['UserService', 'ProjectService', 'CalculationService', 'FeedbackService']
 
 
 
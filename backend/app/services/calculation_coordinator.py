@@ -7,18 +7,28 @@
 # - Audit Coordinator (/services): Orchestrates calculations and meticulously records each action
 # - Backend: "Trust anchor" - executes authoritative calculations and generates secure bundles
 
-import subprocess
+import asyncio
 import json
 import os
 import uuid
 import hashlib
+import logging
+import time
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, Any, Optional
-from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 
-from ..models import Calculation, Project
+from ..models import Calculation, User
 from ..utils.config import settings
+from ..utils.signing import BundleSigner
+from .project_service import ProjectService
+from ..metrics import ENGINE_DURATION, ENGINE_FAILURES
+from ..tracing import span
+
+logger = logging.getLogger(__name__)
 
 
 class CalculationCoordinator:
@@ -33,65 +43,19 @@ class CalculationCoordinator:
     """
     
     @staticmethod
-    def execute_calculation(
-        db: Session,
-        inputs: Dict[str, Any],
-        user_id: int,
-        project_id: int,
-        jurisdiction_config: Optional[Dict[str, Any]] = None
-    ) -> Calculation:
+    async def _run_engine(engine_input: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Execute a calculation with trusted audit trail generation.
-        
-        This is the ONLY way to generate official, trusted calculation results.
-        Frontend calculations are for preview only and cannot be trusted.
+        Run the shared calculation engine (Node.js wrapper subprocess).
         
         Args:
-            db: Database session
-            inputs: Calculation inputs (matches CecInputsSingle from engine)
-            user_id: User ID executing the calculation
-            project_id: Project ID to associate with
+            engine_input: Inputs, engine metadata and code selection for the wrapper
             
         Returns:
-            Calculation object with complete audit trail
+            The engine's bundle (id, inputs, results, steps, warnings)
             
         Raises:
-            HTTPException: If project not found or access denied
+            HTTPException: If the wrapper is missing, times out or fails
         """
-        from fastapi import HTTPException, status
-        
-        # Verify project ownership
-        project = db.query(Project).filter(Project.id == project_id).first()
-        if not project:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Project not found"
-            )
-        
-        if project.owner_id != user_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not enough permissions"
-            )
-        
-        # Generate engine metadata
-        # V4.1 Architecture: engine.commit MUST be injected by CI/CD pipeline
-        # This links each calculation to the exact code version that produced it
-        engine_meta = {
-            "name": "tradespro-backend-engine",
-            "version": settings.APP_VERSION,
-            "commit": settings.GIT_COMMIT,  # Injected by CI/CD pipeline
-            "executed_at": datetime.utcnow().isoformat(),
-            "executed_by": user_id
-        }
-        
-        # Call shared calculation engine via Node.js subprocess
-        # The engine executes calculations and returns a bundle with steps
-        # However, in V4.1 architecture, we consider this the "preliminary" calculation
-        # The coordinator validates and re-signs the audit trail to ensure trust
-        
-        calculation_start = datetime.utcnow()
-        
         # Find the calculation engine wrapper script
         wrapper_script = Path(__file__).parent / 'calculation_engine_wrapper.js'
         if not wrapper_script.exists():
@@ -100,51 +64,31 @@ class CalculationCoordinator:
                 detail="Calculation engine wrapper not found"
             )
         
-        # Extract code type and method from inputs
-        code_type = inputs.get('codeType', inputs.get('code_type', 'cec'))
-        nec_method = inputs.get('necMethod', inputs.get('nec_method', 'standard'))
-        
-        # Determine code edition based on code type
-        code_edition = inputs.get('codeEdition', inputs.get('code_edition'))
-        if not code_edition:
-            code_edition = '2023' if code_type == 'nec' else '2024'
-        
-        # Prepare input for calculation engine
-        # Include jurisdiction configuration if provided
-        # Note: jurisdiction_config can come from user settings or request body
-        engine_input = {
-            "inputs": {
-                **inputs,
-                # Add jurisdiction config to inputs so wrapper can extract it
-                "jurisdictionConfig": jurisdiction_config
-            },
-            "engineMeta": engine_meta,
-            "codeEdition": code_edition,
-            "codeType": code_type,
-            "necMethod": nec_method if code_type == 'nec' else None
-        }
-        
-        # Call Node.js wrapper via subprocess
+        # Call Node.js wrapper via subprocess (non-blocking: the event loop keeps serving requests)
+        process = None
+        engine_start = time.perf_counter()
         try:
-            process = subprocess.Popen(
-                ['node', str(wrapper_script)],
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
+            process = await asyncio.create_subprocess_exec(
+                'node', str(wrapper_script),
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
                 cwd=str(Path(__file__).parent)
             )
             
-            stdout, stderr = process.communicate(
-                input=json.dumps(engine_input),
+            stdout_bytes, stderr_bytes = await asyncio.wait_for(
+                process.communicate(input=json.dumps(engine_input).encode('utf-8')),
                 timeout=30  # 30 second timeout
             )
+            stdout = stdout_bytes.decode('utf-8')
+            stderr = stderr_bytes.decode('utf-8')
             
-            # Log for debugging
+            # Debug output only (sampled/rate limited, see app/log_config.py); failures
+            # carry stdout/stderr in the raised error below
             if stderr:
-                print(f"Calculation engine stderr: {stderr}")
+                logger.debug("Calculation engine stderr: %s", stderr[:2000])
             if stdout:
-                print(f"Calculation engine stdout: {stdout[:200]}...")  # Log first 200 chars
+                logger.debug("Calculation engine stdout (%d bytes): %.200s", len(stdout), stdout)
             
             # Check if stdout is empty first
             if not stdout or not stdout.strip():
@@ -178,19 +122,103 @@ class CalculationCoordinator:
                 raise Exception(f"Calculation engine error (exit code {process.returncode}): {error_msg}")
             
             result_bundle = engine_result['bundle']
+            ENGINE_DURATION.observe(time.perf_counter() - engine_start, "success")
             
-        except subprocess.TimeoutExpired:
-            process.kill()
+        except asyncio.TimeoutError:
+            ENGINE_DURATION.observe(time.perf_counter() - engine_start, "timeout")
+            ENGINE_FAILURES.inc("timeout")
+            if process is not None:
+                process.kill()
+                await process.wait()
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Calculation timeout"
             )
         except Exception as e:
+            ENGINE_DURATION.observe(time.perf_counter() - engine_start, "error")
+            ENGINE_FAILURES.inc("error")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Calculation engine error: {str(e)}"
             )
         
+        return result_bundle
+    
+
+    @staticmethod
+    async def execute_calculation(
+        db: AsyncSession,
+        inputs: Dict[str, Any],
+        user_id: int,
+        project_id: int,
+        jurisdiction_config: Optional[Dict[str, Any]] = None
+    ) -> Calculation:
+        """
+        Execute a calculation with trusted audit trail generation.
+        
+        This is the ONLY way to generate official, trusted calculation results.
+        Frontend calculations are for preview only and cannot be trusted.
+        
+        Args:
+            db: Database session
+            inputs: Calculation inputs (matches CecInputsSingle from engine)
+            user_id: User ID executing the calculation
+            project_id: Project ID to associate with
+            
+        Returns:
+            Calculation object with complete audit trail
+            
+        Raises:
+            HTTPException: If project not found or access denied
+        """
+        # Verify project ownership (request/owner cache, else owner_id only)
+        await ProjectService.verify_owner(db, project_id, user_id)
+        
+        # Generate engine metadata
+        # V4.1 Architecture: engine.commit MUST be injected by CI/CD pipeline
+        # This links each calculation to the exact code version that produced it
+        engine_meta = {
+            "name": "tradespro-backend-engine",
+            "version": settings.APP_VERSION,
+            "commit": settings.GIT_COMMIT,  # Injected by CI/CD pipeline
+            "executed_at": datetime.utcnow().isoformat(),
+            "executed_by": user_id
+        }
+        
+        # Call shared calculation engine via Node.js subprocess
+        # The engine executes calculations and returns a bundle with steps
+        # However, in V4.1 architecture, we consider this the "preliminary" calculation
+        # The coordinator validates and re-signs the audit trail to ensure trust
+        
+        calculation_start = datetime.utcnow()
+        
+        # Extract code type and method from inputs
+        code_type = inputs.get('codeType', inputs.get('code_type', 'cec'))
+        nec_method = inputs.get('necMethod', inputs.get('nec_method', 'standard'))
+        
+        # Determine code edition based on code type
+        code_edition = inputs.get('codeEdition', inputs.get('code_edition'))
+        if not code_edition:
+            code_edition = '2023' if code_type == 'nec' else '2024'
+        
+        # Prepare input for calculation engine
+        # Include jurisdiction configuration if provided
+        # Note: jurisdiction_config can come from user settings or request body
+        engine_input = {
+            "inputs": {
+                **inputs,
+                # Add jurisdiction config to inputs so wrapper can extract it
+                "jurisdictionConfig": jurisdiction_config
+            },
+            "engineMeta": engine_meta,
+            "codeEdition": code_edition,
+            "codeType": code_type,
+            "necMethod": nec_method if code_type == 'nec' else None
+        }
+        
+        with span("calculation.engine", **{"calculation.code_type": code_type}):
+            result_bundle = await CalculationCoordinator._run_engine(engine_input)
+        
         calculation_time_ms = int((datetime.utcnow() - calculation_start).total_seconds() * 1000)
         
         # Extract results from bundle
@@ -250,8 +278,6 @@ class CalculationCoordinator:
         
         # Generate bundle hash for integrity verification
         # V4.1 Architecture: Calculate rootHash using RFC 8785 canonicalization
-        from ..utils.signing import BundleSigner
-        
         # Convert calculation to dict for rootHash calculation
         bundle_dict = {
             'id': calculation.id,
@@ -276,8 +302,8 @@ class CalculationCoordinator:
         calculation.signed_by = None
         
         db.add(calculation)
-        db.commit()
-        db.refresh(calculation)
+        await db.commit()
+        await db.refresh(calculation)
         
         return calculation
     
@@ -326,8 +352,8 @@ class CalculationCoordinator:
         }
     
     @staticmethod
-    def sign_calculation(
-        db: Session,
+    async def sign_calculation(
+        db: AsyncSession,
         calculation_id: str,
         user_id: int
     ) -> Calculation:
@@ -352,12 +378,8 @@ class CalculationCoordinator:
         Raises:
             HTTPException: If calculation not found or already signed
         """
-        from fastapi import HTTPException, status
-        from ..utils.signing import BundleSigner
-        from ..models import User
-        
         # Get calculation
-        calculation = db.query(Calculation).filter(Calculation.id == calculation_id).first()
+        calculation = await db.scalar(select(Calculation).where(Calculation.by_id(calculation_id)))
         if not calculation:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -372,7 +394,7 @@ class CalculationCoordinator:
             )
         
         # Get user email for signature
-        user = db.query(User).filter(User.id == user_id).first()
+        user = await db.get(User, user_id)
         user_email = user.email if user else None
         
         # Convert calculation to dict for signing
@@ -405,8 +427,8 @@ class CalculationCoordinator:
                 calculation.signed_at = datetime.utcnow()
         calculation.signed_by = signed_bundle.get('signed_by')
         
-        db.commit()
-        db.refresh(calculation)
+        await db.commit()
+        await db.refresh(calculation)
         
         return calculation
     
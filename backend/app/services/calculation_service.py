@@ -1,21 +1,30 @@
 # backend/app/services/calculation_service.py
 # Calculation Service - Business logic for calculation record management
 
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from typing import List, Optional
+import uuid
+
+from sqlalchemy import select, desc, case, cast, func
+from sqlalchemy.dialects.postgresql import JSONPATH, insert as pg_insert
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer, load_only
+from typing import List, Optional, Dict, Any, Sequence, Tuple
 from fastapi import HTTPException, status
-from datetime import datetime
+from datetime import datetime, timezone
 
 from ..models import Calculation, Project
 from ..schemas import CalculationCreate
+from ..utils.config import settings
+from ..utils.auth_cache import owned_project_ids, project_owner_cache
+from .cold_storage import BUNDLE_FIELDS, ColdStorage
+from .project_service import ProjectService
 
 
 class CalculationService:
     """Calculation business logic service"""
     
     @staticmethod
-    def create_calculation(db: Session, calc_data: CalculationCreate, user_id: int) -> Calculation:
+    async def create_calculation(db: AsyncSession, calc_data: CalculationCreate, user_id: int) -> Calculation:
         """
         Create a calculation record.
         
@@ -32,21 +41,11 @@ class CalculationService:
             Created Calculation object
             
         Raises:
-            HTTPException: If project not found or access denied
+            HTTPException: If project not found or access denied (including an
+                existing bundle of another user), or the existing bundle is signed (409)
         """
-        # Verify project ownership
-        project = db.query(Project).filter(Project.id == calc_data.project_id).first()
-        if not project:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Project not found"
-            )
-        
-        if project.owner_id != user_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not enough permissions"
-            )
+        # Verify project ownership (request/owner cache, else owner_id only)
+        await ProjectService.verify_owner(db, calc_data.project_id, user_id)
         
         # Legacy endpoint: Extract data from bundle_data if provided
         # For backward compatibility with old frontend that sends complete bundle
@@ -54,16 +53,32 @@ class CalculationService:
         bundle_id = calc_data.bundle_id if hasattr(calc_data, 'bundle_id') else None
         
         # Extract separated fields from bundle_data (if legacy format)
-        inputs = bundle_data.get('inputs', {}) if isinstance(bundle_data, dict) else {}
-        results = bundle_data.get('results', {}) if isinstance(bundle_data, dict) else {}
-        steps = bundle_data.get('steps', []) if isinstance(bundle_data, dict) else []
-        warnings = bundle_data.get('warnings', []) if isinstance(bundle_data, dict) else []
-        building_type = bundle_data.get('building_type', 'single-dwelling') if isinstance(bundle_data, dict) else 'single-dwelling'
+        fields = CalculationService._legacy_bundle_fields(bundle_data)
+        inputs = fields['inputs']
+        results = fields['results']
+        steps = fields['steps']
+        warnings = fields['warnings']
+        building_type = fields['building_type']
         
         # Check if bundle_id already exists
         if bundle_id:
-            existing = db.query(Calculation).filter(Calculation.id == bundle_id).first()
-            if existing:
+            row = (await db.execute(
+                select(Calculation, Project.owner_id)
+                .join(Project, Project.id == Calculation.project_id)
+                .where(Calculation.by_id(bundle_id))
+            )).first()
+            if row:
+                existing, owner_id = row
+                CalculationService._check_owner(db, existing.project_id, owner_id, user_id)
+                
+                # Signed bundles (including offloaded ones) must keep matching their bundle_hash,
+                # which is also their ETag (served as immutable)
+                if existing.is_signed:
+                    raise HTTPException(
+                        status_code=status.HTTP_409_CONFLICT,
+                        detail="Calculation is signed and cannot be modified"
+                    )
+                
                 # Update existing record
                 existing.inputs = inputs
                 existing.results = results
@@ -72,15 +87,14 @@ class CalculationService:
                 existing.notes = calc_data.notes
                 existing.tags = calc_data.tags
                 existing.calculation_type = calc_data.calculation_type
-                existing.code_edition = calc_data.code_edition
-                existing.code_type = calc_data.code_type
+                existing.code_edition = calc_data.code_edition or '2024'
+                existing.code_type = calc_data.code_type or 'cec'
                 existing.building_type = building_type
-                db.commit()
-                db.refresh(existing)
+                await db.commit()
+                await db.refresh(existing)
                 return existing
         
         # Generate new bundle ID if not provided
-        import uuid
         if not bundle_id:
             bundle_id = str(uuid.uuid4())
         
@@ -99,47 +113,296 @@ class CalculationService:
         )
         
         db.add(calculation)
-        db.commit()
-        db.refresh(calculation)
+        try:
+            await db.commit()
+        except IntegrityError:
+            # Same bundle_id created concurrently (calculation_ids_pkey)
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Calculation with this bundle_id already exists"
+            )
+        await db.refresh(calculation)
         
         return calculation
     
     @staticmethod
-    def get_calculation_by_id(db: Session, calc_id: str, user_id: int) -> Calculation:
+    def _legacy_bundle_fields(bundle_data: Any) -> Dict[str, Any]:
+        """Separated JSONB fields and building type of a legacy bundle_data payload"""
+        if not isinstance(bundle_data, dict):
+            bundle_data = {}
+        return {
+            'inputs': bundle_data.get('inputs', {}),
+            'results': bundle_data.get('results', {}),
+            'steps': bundle_data.get('steps', []),
+            'warnings': bundle_data.get('warnings', []),
+            'building_type': bundle_data.get('building_type', 'single-dwelling'),
+        }
+    
+    @staticmethod
+    async def bulk_sync_calculations(
+        db: AsyncSession,
+        items: List[CalculationCreate],
+        user_id: int
+    ) -> List[Dict[str, Any]]:
         """
-        Get calculation by ID (bundle ID).
+        Create or update many legacy calculation bundles at once.
+        
+        Round-trips scale with the number of batches, not items:
+        - one query checks ownership of every referenced project
+        - one query finds which bundle IDs already exist (and who owns them)
+        - one INSERT ... ON CONFLICT DO UPDATE per batch of BULK_SYNC_BATCH_SIZE rows,
+          each in a savepoint so a failing batch does not discard the others
+        - one commit
+        
+        calculations is partitioned by created_at, so the conflict target is
+        (id, created_at): existing bundles are upserted with their stored
+        created_at, new ones with a single timestamp for the whole request.
+        A new bundle inserted concurrently by another request fails its batch
+        on calculation_ids_pkey (reported as an error, never a duplicate row).
+        Signed calculations are never overwritten, and soft-deleted ones are
+        skipped rather than upserted (they would stay deleted).
         
         Args:
             db: Database session
-            calc_id: Calculation bundle ID (VARCHAR(36))
+            items: Calculation bundles, in client order
             user_id: User ID for ownership verification
             
         Returns:
-            Calculation object
+            Per-item outcomes: {index, bundle_id, status, detail}, with status
+            created, updated, skipped (signed / deleted / superseded) or error
+        """
+        outcomes: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        
+        def outcome(index: int, status_: str, detail: Optional[str] = None):
+            outcomes[index] = {
+                'index': index,
+                'bundle_id': items[index].bundle_id,
+                'status': status_,
+                'detail': detail,
+            }
+        
+        # Ownership of all referenced projects in one query
+        project_ids = {item.project_id for item in items}
+        verified = owned_project_ids(db)
+        owned = project_ids & verified
+        if owned != project_ids:
+            owned |= set(await db.scalars(
+                select(Project.id).where(Project.id.in_(project_ids - owned), Project.owner_id == user_id)
+            ))
+            verified |= owned
+        
+        # The same bundle sent twice: the last occurrence wins
+        latest: Dict[str, int] = {}
+        for index, item in enumerate(items):
+            if item.project_id not in owned:
+                outcome(index, 'error', 'Project not found or not enough permissions')
+                continue
+            if item.bundle_id in latest:
+                outcome(latest[item.bundle_id], 'skipped', 'Superseded by a later item with the same bundle_id')
+            latest[item.bundle_id] = index
+        
+        # Existing bundles (any owner) in one query
+        existing = {}
+        if latest:
+            rows = await db.execute(
+                select(
+                    Calculation.id, Calculation.created_at, Calculation.is_signed,
+                    Calculation.deleted_at, Project.owner_id
+                )
+                .join(Project, Project.id == Calculation.project_id)
+                .where(Calculation.id.in_(list(latest)))
+            )
+            existing = {row.id: row for row in rows}
+        
+        now = datetime.now(timezone.utc)
+        rows = []
+        for bundle_id, index in latest.items():
+            item = items[index]
+            current = existing.get(bundle_id)
+            if current is not None and current.owner_id != user_id:
+                outcome(index, 'error', 'Not enough permissions')
+                continue
+            if current is not None and current.is_signed:
+                outcome(index, 'skipped', 'Calculation is signed and cannot be modified')
+                continue
+            if current is not None and current.deleted_at is not None:
+                outcome(index, 'skipped', 'Calculation was deleted')
+                continue
+            rows.append((index, {
+                'id': bundle_id,
+                'created_at': current.created_at if current is not None else now,
+                'project_id': item.project_id,
+                'calculation_type': item.calculation_type,
+                'code_edition': item.code_edition or '2024',
+                'code_type': item.code_type or 'cec',
+                'is_signed': False,
+                **CalculationService._legacy_bundle_fields(item.bundle_data),
+            }))
+        
+        table = Calculation.__table__
+        for start in range(0, len(rows), settings.BULK_SYNC_BATCH_SIZE):
+            batch = rows[start:start + settings.BULK_SYNC_BATCH_SIZE]
+            stmt = pg_insert(table).values([values for _, values in batch])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.id, table.c.created_at],
+                set_={
+                    'project_id': stmt.excluded.project_id,
+                    'building_type': stmt.excluded.building_type,
+                    'calculation_type': stmt.excluded.calculation_type,
+                    'code_edition': stmt.excluded.code_edition,
+                    'code_type': stmt.excluded.code_type,
+                    'inputs': stmt.excluded.inputs,
+                    'results': stmt.excluded.results,
+                    'steps': stmt.excluded.steps,
+                    'warnings': stmt.excluded.warnings,
+                },
+                # Signed or deleted concurrently since the lookup
+                where=table.c.is_signed.is_(False) & table.c.deleted_at.is_(None)
+            ).returning(table.c.id)
             
+            try:
+                async with db.begin_nested():
+                    written = set(await db.scalars(stmt))
+            except SQLAlchemyError as e:
+                for index, _ in batch:
+                    outcome(index, 'error', f'Database error: {e.__class__.__name__}')
+                continue
+            
+            for index, values in batch:
+                if values['id'] not in written:
+                    outcome(index, 'skipped', 'Calculation was signed or deleted meanwhile')
+                elif values['id'] in existing:
+                    outcome(index, 'updated')
+                else:
+                    outcome(index, 'created')
+        
+        await db.commit()
+        return outcomes
+    
+    @staticmethod
+    async def _get_owned_calculation(db: AsyncSession, calc_id: str, user_id: int) -> Calculation:
+        """
+        Load a calculation and verify ownership through its project.
+        
+        The owner comes from the same query (join on projects), so ownership
+        costs no extra round-trip; it is also recorded in the owner caches.
+        
         Raises:
             HTTPException: If not found or access denied
         """
-        calculation = db.query(Calculation).filter(Calculation.id == calc_id).first()
+        row = (await db.execute(
+            select(Calculation, Project.owner_id)
+            .join(Project, Project.id == Calculation.project_id)
+            .where(Calculation.by_id(calc_id))
+        )).first()
         
-        if not calculation:
+        if row is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Calculation not found"
             )
         
-        # Verify ownership through project
-        project = db.query(Project).filter(Project.id == calculation.project_id).first()
-        if project.owner_id != user_id:
+        calculation, owner_id = row
+        CalculationService._check_owner(db, calculation.project_id, owner_id, user_id)
+        
+        return calculation
+    
+    @staticmethod
+    def _check_owner(db: AsyncSession, project_id: int, owner_id: int, user_id: int) -> None:
+        """
+        Record a calculation's project owner and verify it is the user.
+        
+        Raises:
+            HTTPException: If the user does not own the project
+        """
+        project_owner_cache.set(project_id, owner_id)
+        if owner_id != user_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not enough permissions"
             )
+        owned_project_ids(db).add(project_id)
+    
+    @staticmethod
+    def bundle_etag(calculation: Calculation) -> Optional[str]:
+        """
+        Strong ETag of a calculation response, derived from its bundle hash.
         
-        return calculation
+        Only signed, live calculations get one: their bundle can no longer change
+        (/sync answers 409 and /sync/bulk skips signed rows, signing happens once).
+        Unsigned ones can still be re-synced and deleted ones change deleted_at.
+        
+        Returns:
+            Quoted ETag, or None if the response is not cacheable
+        """
+        if calculation.is_signed and calculation.bundle_hash and calculation.deleted_at is None:
+            return f'"{calculation.bundle_hash}"'
+        return None
     
     @staticmethod
-    def get_calculation_by_bundle_id(db: Session, bundle_id: str, user_id: int) -> Calculation:
+    async def get_calculation_etag(db: AsyncSession, calc_id: str, user_id: int) -> Optional[str]:
+        """
+        ETag of a calculation without loading its bundle (for If-None-Match).
+        
+        Reads only the metadata columns; the JSONB columns (inputs, results,
+        steps, warnings, signature) stay deferred, so a 304 costs one index lookup.
+        
+        Args:
+            db: Database session
+            calc_id: Calculation bundle ID
+            user_id: User ID for ownership verification
+            
+        Returns:
+            ETag as bundle_etag() computes it, or None if not cacheable
+            
+        Raises:
+            HTTPException: If not found or access denied
+        """
+        row = (await db.execute(
+            select(Calculation, Project.owner_id)
+            .join(Project, Project.id == Calculation.project_id)
+            .options(load_only(
+                Calculation.project_id, Calculation.is_signed,
+                Calculation.bundle_hash, Calculation.deleted_at
+            ))
+            .where(Calculation.by_id(calc_id))
+        )).first()
+        
+        if row is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Calculation not found"
+            )
+        
+        calculation, owner_id = row
+        CalculationService._check_owner(db, calculation.project_id, owner_id, user_id)
+        
+        return CalculationService.bundle_etag(calculation)
+    
+    @staticmethod
+    async def get_calculation_by_id(db: AsyncSession, calc_id: str, user_id: int) -> Calculation:
+        """
+        Get calculation by ID (bundle ID).
+        
+        Args:
+            db: Database session
+            calc_id: Calculation bundle ID (VARCHAR(36))
+            user_id: User ID for ownership verification
+            
+        Returns:
+            Calculation object
+            
+        Raises:
+            HTTPException: If not found or access denied
+        """
+        calculation = await CalculationService._get_owned_calculation(db, calc_id, user_id)
+        
+        # Offloaded bundles are loaded back from cold storage and verified
+        return await ColdStorage.rehydrate(calculation)
+    
+    @staticmethod
+    async def get_calculation_by_bundle_id(db: AsyncSession, bundle_id: str, user_id: int) -> Calculation:
         """
         Get calculation by bundle_id.
         
@@ -154,31 +417,127 @@ class CalculationService:
         Raises:
             HTTPException: If not found or access denied
         """
-        calculation = db.query(Calculation).filter(Calculation.id == bundle_id).first()
+        calculation = await CalculationService._get_owned_calculation(db, bundle_id, user_id)
+        
+        # Offloaded bundles are loaded back from cold storage and verified
+        return await ColdStorage.rehydrate(calculation)
+    
+    @staticmethod
+    async def get_calculation_projection(
+        db: AsyncSession,
+        calc_id: str,
+        user_id: int,
+        fields: Sequence[str] = BUNDLE_FIELDS,
+        steps_offset: int = 0,
+        steps_limit: Optional[int] = None
+    ) -> Tuple[Calculation, Dict[str, Any]]:
+        """
+        Get a calculation with only some bundle fields, paging steps in SQL.
+        
+        Bundle columns that were not requested stay deferred. When steps are
+        paged, PostgreSQL slices the array (jsonb_path_query_array) and counts it
+        (jsonb_array_length), so only the requested steps are transferred and
+        decoded. Offloaded bundles come back whole from cold storage and are
+        sliced in Python.
         
-        if not calculation:
+        Args:
+            db: Database session
+            calc_id: Calculation bundle ID
+            user_id: User ID for ownership verification
+            fields: Bundle fields to include (subset of inputs, results, steps, warnings)
+            steps_offset: First step to return
+            steps_limit: Maximum number of steps (None: to the end)
+            
+        Returns:
+            (calculation, to_dict()-style dictionary with the requested bundle
+            fields, plus steps_offset/steps_total when steps are paged)
+            
+        Raises:
+            HTTPException: If not found or access denied
+        """
+        page_steps = 'steps' in fields and (steps_offset > 0 or steps_limit is not None)
+        loaded = [field for field in fields if not (field == 'steps' and page_steps)]
+        columns = [Calculation, Project.owner_id]
+        if page_steps:
+            last = "last" if steps_limit is None else str(steps_offset + steps_limit - 1)
+            is_array = func.jsonb_typeof(Calculation.steps) == 'array'
+            columns += [
+                case((is_array, func.jsonb_path_query_array(
+                    Calculation.steps, cast(f"lax $[{steps_offset} to {last}]", JSONPATH)
+                ))),
+                case((is_array, func.jsonb_array_length(Calculation.steps)), else_=0),
+            ]
+        
+        row = (await db.execute(
+            select(*columns)
+            .join(Project, Project.id == Calculation.project_id)
+            .options(*[defer(getattr(Calculation, field)) for field in BUNDLE_FIELDS if field not in loaded])
+            .where(Calculation.by_id(calc_id))
+        )).first()
+        
+        if row is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Calculation not found"
             )
         
-        # Verify ownership through project
-        project = db.query(Project).filter(Project.id == calculation.project_id).first()
-        if project.owner_id != user_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not enough permissions"
-            )
+        calculation, owner_id = row[0], row[1]
+        CalculationService._check_owner(db, calculation.project_id, owner_id, user_id)
         
-        return calculation
+        if calculation.cold_storage_key:
+            # The blob holds the whole bundle; page the steps here
+            await ColdStorage.rehydrate(calculation)
+            if page_steps:
+                steps = calculation.steps if isinstance(calculation.steps, list) else []
+                end = None if steps_limit is None else steps_offset + steps_limit
+                steps_page, steps_total = steps[steps_offset:end], len(steps)
+        elif page_steps:
+            steps_page, steps_total = row[2] or [], row[3]
+        
+        data = calculation.to_dict(include_bundle=True, fields=loaded)
+        if 'results' not in fields:
+            # Rehydrated bundles have results loaded anyway; keep the response the same
+            data.pop('calculated_load_w', None)
+            data.pop('service_amperage', None)
+        if page_steps:
+            data['steps'] = steps_page
+            data['steps_offset'] = steps_offset
+            data['steps_total'] = steps_total
+        return calculation, data
     
     @staticmethod
-    def list_project_calculations(
-        db: Session,
+    def created_range_filters(
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None
+    ) -> list:
+        """
+        Filters on created_at, the partition key of calculations.
+        
+        Bounding created_at lets PostgreSQL prune monthly partitions outside the range.
+        
+        Args:
+            created_after: Inclusive lower bound
+            created_before: Exclusive upper bound
+            
+        Returns:
+            List of SQL conditions (empty if no bound given)
+        """
+        filters = []
+        if created_after is not None:
+            filters.append(Calculation.created_at >= created_after)
+        if created_before is not None:
+            filters.append(Calculation.created_at < created_before)
+        return filters
+    
+    @staticmethod
+    async def list_project_calculations(
+        db: AsyncSession,
         project_id: int,
         user_id: int,
         skip: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None
     ) -> List[Calculation]:
         """
         List calculations for a project.
@@ -189,37 +548,32 @@ class CalculationService:
             user_id: User ID for ownership verification
             skip: Number of records to skip
             limit: Maximum number of records to return
+            created_after: Optional inclusive lower bound on created_at
+            created_before: Optional exclusive upper bound on created_at
             
         Returns:
             List of Calculation objects (without full bundle_data)
             
         Raises:
-            HTTPException: If project not found or access denied
+            HTTPException: If project not found or access denied (including an
+                existing bundle of another user), or the existing bundle is signed (409)
         """
-        # Verify project ownership
-        project = db.query(Project).filter(Project.id == project_id).first()
-        if not project:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Project not found"
-            )
-        
-        if project.owner_id != user_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not enough permissions"
-            )
+        # Verify project ownership (request/owner cache, else owner_id only)
+        await ProjectService.verify_owner(db, project_id, user_id)
         
         # Get calculations (exclude soft-deleted)
-        calculations = db.query(Calculation).filter(
-            Calculation.project_id == project_id,
-            Calculation.deleted_at.is_(None)  # Exclude soft-deleted
-        ).order_by(desc(Calculation.created_at)).offset(skip).limit(limit).all()
+        result = await db.scalars(
+            select(Calculation).where(
+                Calculation.project_id == project_id,
+                Calculation.deleted_at.is_(None),  # Exclude soft-deleted
+                *CalculationService.created_range_filters(created_after, created_before)
+            ).order_by(desc(Calculation.created_at)).offset(skip).limit(limit)
+        )
         
-        return calculations
+        return list(result)
     
     @staticmethod
-    def delete_calculation(db: Session, calc_id: str, user_id: int) -> bool:
+    async def delete_calculation(db: AsyncSession, calc_id: str, user_id: int) -> bool:
         """
         Delete a calculation (soft delete).
         
@@ -234,11 +588,11 @@ class CalculationService:
         Raises:
             HTTPException: If not found or access denied
         """
-        calculation = CalculationService.get_calculation_by_id(db, calc_id, user_id)
+        calculation = await CalculationService.get_calculation_by_id(db, calc_id, user_id)
         
         # Soft delete (update deleted_at timestamp)
         calculation.deleted_at = datetime.utcnow()
-        db.commit()
+        await db.commit()
         
         return True
 
@@ -0,0 +1,249 @@
+# backend/app/services/cold_storage.py
+# Cold Storage - Tiering of old signed calculations' JSONB to compressed blobs
+#
+# Signed calculations older than COLD_STORAGE_MIN_AGE_DAYS have inputs, results,
+# steps and warnings moved to a gzip-compressed JSON blob (local directory or S3).
+# The row keeps bundle_hash and a pointer (cold_storage_key); reads rehydrate the
+# row transparently and verify the payload against bundle_hash.
+
+import asyncio
+import gzip
+import json
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import select, update, tuple_, null
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+from ..database import AsyncSessionLocal
+from ..models import Calculation
+from ..utils.blob_store import LocalBlobStore, S3BlobStore
+from ..utils.config import settings
+from ..utils.signing import BundleSigner
+
+logger = logging.getLogger(__name__)
+
+# Columns moved to cold storage
+BUNDLE_FIELDS = ("inputs", "results", "steps", "warnings")
+
+
+class BundleLRU:
+    """Small thread-safe LRU of rehydrated bundle payloads, keyed by (id, bundle_hash)"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._items: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            payload = self._items.get(key)
+            if payload is not None:
+                self._items.move_to_end(key)
+            return payload
+
+    def put(self, key: Tuple[str, str], payload: Dict[str, Any]) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._items[key] = payload
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+
+class ColdStorage:
+    """Offload and rehydration of calculation bundles"""
+
+    _store = None
+    cache = BundleLRU(settings.COLD_STORAGE_CACHE_SIZE)
+
+    @staticmethod
+    def enabled() -> bool:
+        return bool(settings.COLD_STORAGE_BACKEND)
+
+    @classmethod
+    def store(cls):
+        """Configured blob store (created on first use)"""
+        if cls._store is None:
+            backend = settings.COLD_STORAGE_BACKEND
+            if backend == "local":
+                cls._store = LocalBlobStore(settings.COLD_STORAGE_LOCAL_DIR)
+            elif backend == "s3":
+                cls._store = S3BlobStore(
+                    settings.COLD_STORAGE_S3_BUCKET,
+                    prefix=settings.COLD_STORAGE_S3_PREFIX,
+                    endpoint_url=settings.COLD_STORAGE_S3_ENDPOINT_URL
+                )
+            else:
+                raise RuntimeError(f"Unknown COLD_STORAGE_BACKEND '{backend}'")
+        return cls._store
+
+    @staticmethod
+    def blob_key(calculation: Calculation) -> str:
+        return f"calculations/{calculation.created_at:%Y/%m}/{calculation.id}.json.gz"
+
+    @staticmethod
+    def compute_bundle_hash(calc_id: str, payload: Dict[str, Any], engine_version, engine_commit) -> str:
+        """
+        Root hash of a bundle, computed the same way as at creation
+        (CalculationCoordinator.execute_calculation hashes before created_at is set).
+        """
+        return BundleSigner.calculate_root_hash({
+            'id': calc_id,
+            'inputs': payload.get('inputs'),
+            'results': payload.get('results'),
+            'steps': payload.get('steps'),
+            'warnings': payload.get('warnings'),
+            'engine_version': engine_version,
+            'engine_commit': engine_commit,
+            'created_at': None,
+        })
+
+    @staticmethod
+    def encode(payload: Dict[str, Any]) -> bytes:
+        return gzip.compress(json.dumps(payload, separators=(',', ':')).encode('utf-8'), compresslevel=6)
+
+    @staticmethod
+    def decode(blob: bytes) -> Dict[str, Any]:
+        return json.loads(gzip.decompress(blob))
+
+    @staticmethod
+    async def offload_batch(
+        db: AsyncSession,
+        min_age_days: Optional[int] = None,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[datetime, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Move one batch of eligible calculations to cold storage.
+
+        Eligible: signed, not yet offloaded, created more than min_age_days ago,
+        and whose stored bundle_hash matches their payload (so rehydration can be
+        verified). Blobs are written before the row is updated, so a failure never
+        leaves a row without its data.
+
+        Args:
+            db: Database session (primary)
+            min_age_days: Minimum age (default COLD_STORAGE_MIN_AGE_DAYS)
+            limit: Batch size (default COLD_STORAGE_BATCH_SIZE)
+            after: Keyset cursor (created_at, id) returned by the previous batch
+
+        Returns:
+            {"offloaded": n, "skipped": n, "cursor": (created_at, id) or None}
+            (skipped: hash mismatch, left hot; cursor is None when nothing is left)
+        """
+        min_age_days = settings.COLD_STORAGE_MIN_AGE_DAYS if min_age_days is None else min_age_days
+        limit = limit or settings.COLD_STORAGE_BATCH_SIZE
+        cutoff = datetime.now(timezone.utc) - timedelta(days=min_age_days)
+
+        query = select(Calculation).where(
+            Calculation.is_signed.is_(True),
+            Calculation.cold_storage_key.is_(None),
+            Calculation.bundle_hash.isnot(None),
+            Calculation.created_at < cutoff  # Partition pruning: only old months are scanned
+        )
+        if after is not None:
+            query = query.where(tuple_(Calculation.created_at, Calculation.id) > tuple_(*after))
+        result = await db.scalars(query.order_by(Calculation.created_at, Calculation.id).limit(limit))
+        calculations = list(result)
+
+        store = ColdStorage.store()
+        offloaded = skipped = 0
+        for calculation in calculations:
+            payload = {field: getattr(calculation, field) for field in BUNDLE_FIELDS}
+            expected = ColdStorage.compute_bundle_hash(
+                calculation.id, payload, calculation.engine_version, calculation.engine_commit
+            )
+            if expected != calculation.bundle_hash:
+                skipped += 1
+                continue
+
+            key = ColdStorage.blob_key(calculation)
+            await asyncio.to_thread(store.put, key, ColdStorage.encode(payload))
+            await db.execute(
+                update(Calculation)
+                .where(
+                    Calculation.id == calculation.id,
+                    Calculation.created_at == calculation.created_at,
+                    Calculation.cold_storage_key.is_(None)
+                )
+                .values(
+                    inputs=null(), results=null(), steps=null(), warnings=null(),  # SQL NULL, not JSON null
+                    cold_storage_key=key,
+                    offloaded_at=datetime.now(timezone.utc)
+                )
+                .execution_options(synchronize_session=False)
+            )
+            offloaded += 1
+
+        await db.commit()
+        if skipped:
+            logger.warning("Cold storage skipped %d calculation(s) whose bundle_hash does not match their payload", skipped)
+        cursor = (calculations[-1].created_at, calculations[-1].id) if len(calculations) == limit else None
+        return {"offloaded": offloaded, "skipped": skipped, "cursor": cursor}
+
+    @staticmethod
+    async def rehydrate(calculation: Calculation) -> Calculation:
+        """
+        Load an offloaded calculation's bundle fields back onto the instance.
+
+        The values are set as committed state, so nothing is written back.
+        No-op for calculations that are not offloaded.
+
+        Raises:
+            HTTPException: If the blob is missing or fails bundle_hash verification
+        """
+        if not calculation.cold_storage_key:
+            return calculation
+
+        cache_key = (calculation.id, calculation.bundle_hash)
+        payload = ColdStorage.cache.get(cache_key)
+        if payload is None:
+            try:
+                blob = await asyncio.to_thread(ColdStorage.store().get, calculation.cold_storage_key)
+                payload = ColdStorage.decode(blob)
+            except Exception as e:
+                logger.error("Cold storage read failed for calculation %s: %s", calculation.id, e)
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Calculation bundle is temporarily unavailable"
+                )
+
+            actual = ColdStorage.compute_bundle_hash(
+                calculation.id, payload, calculation.engine_version, calculation.engine_commit
+            )
+            if actual != calculation.bundle_hash:
+                logger.error("Cold storage bundle for calculation %s failed hash verification", calculation.id)
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Calculation bundle failed integrity verification"
+                )
+            ColdStorage.cache.put(cache_key, payload)
+
+        for field in BUNDLE_FIELDS:
+            set_committed_value(calculation, field, payload.get(field))
+        return calculation
+
+    @staticmethod
+    async def run() -> None:
+        """Periodically offload eligible calculations until cancelled"""
+        while True:
+            try:
+                async with AsyncSessionLocal() as db:
+                    cursor = None
+                    while True:
+                        counts = await ColdStorage.offload_batch(db, after=cursor)
+                        if counts["offloaded"]:
+                            logger.info("Offloaded %d calculation(s) to cold storage", counts['offloaded'])
+                        cursor = counts["cursor"]
+                        if cursor is None:
+                            break
+            except Exception as e:
+                logger.warning("Cold storage offload failed, will retry: %s", e)
+            await asyncio.sleep(settings.COLD_STORAGE_OFFLOAD_INTERVAL_SECONDS)
@@ -0,0 +1,214 @@
+# backend/app/services/feedback_service.py
+# Feedback Service - Query helpers for feedback posts and reply threads
+
+from sqlalchemy.orm import joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, literal, and_, delete, update, exists, func, Integer
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from typing import List, Optional, Dict, Any, Tuple
+
+from ..models import FeedbackReply, FeedbackReplyLike
+
+
+class FeedbackService:
+    """Feedback business logic service"""
+
+    @staticmethod
+    async def toggle_like(
+        db: AsyncSession,
+        like_model,
+        target_model,
+        target_fk: str,
+        target_id: int,
+        user_id: int
+    ) -> Optional[Tuple[bool, int]]:
+        """
+        Atomically toggle a user's like on a post or reply in one round-trip.
+
+        Runs a single statement of the form:
+
+            WITH removed AS (DELETE FROM <likes> WHERE ... RETURNING ...),
+                 added AS (INSERT INTO <likes> SELECT ... WHERE NOT EXISTS (removed)
+                           ON CONFLICT DO NOTHING RETURNING ...)
+            UPDATE <target> SET like_count = like_count + |added| - |removed| ...
+
+        The unique (target, user) constraint makes concurrent toggles safe: a racing
+        insert hits ON CONFLICT DO NOTHING and the counter is never double-incremented.
+
+        Args:
+            db: Database session
+            like_model: FeedbackPostLike or FeedbackReplyLike
+            target_model: FeedbackPost or FeedbackReply
+            target_fk: Name of the like table's foreign key column ('post_id' or 'reply_id')
+            target_id: ID of the liked post/reply
+            user_id: User toggling the like
+
+        Returns:
+            (liked, like_count) after the toggle, or None if the target does not exist
+        """
+        stmt = FeedbackService.toggle_like_statement(like_model, target_model, target_fk, target_id, user_id)
+
+        try:
+            row = (await db.execute(stmt)).first()
+            await db.commit()
+        except IntegrityError:
+            # Foreign key violation on insert: the post/reply does not exist
+            await db.rollback()
+            return None
+
+        if row is None:
+            return None
+
+        like_count, liked = row
+        return bool(liked), like_count
+
+    @staticmethod
+    def toggle_like_statement(like_model, target_model, target_fk: str, target_id: int, user_id: int):
+        """
+        The single UPDATE ... RETURNING (like_count, liked) statement run by toggle_like().
+
+        Args:
+            like_model: FeedbackPostLike or FeedbackReplyLike
+            target_model: FeedbackPost or FeedbackReply
+            target_fk: Name of the like table's foreign key column ('post_id' or 'reply_id')
+            target_id: ID of the liked post/reply
+            user_id: User toggling the like
+
+        Returns:
+            PostgreSQL statement (data-modifying CTEs, not supported by SQLite)
+        """
+        likes = like_model.__table__
+        target = target_model.__table__
+        fk = likes.c[target_fk]
+
+        removed = (
+            delete(likes)
+            .where(fk == target_id, likes.c.user_id == user_id)
+            .returning(fk)
+            .cte("removed")
+        )
+        added = (
+            pg_insert(likes)
+            .from_select(
+                [target_fk, 'user_id'],
+                select(literal(target_id, Integer), literal(user_id, Integer))
+                .where(~exists(select(removed.c[target_fk])))
+            )
+            .on_conflict_do_nothing(index_elements=[target_fk, 'user_id'])
+            .returning(fk)
+            .cte("added")
+        )
+        added_count = select(func.count()).select_from(added).scalar_subquery()
+        removed_count = select(func.count()).select_from(removed).scalar_subquery()
+
+        return (
+            update(target)
+            .where(target.c.id == target_id)
+            .values(
+                like_count=func.greatest(target.c.like_count + added_count - removed_count, 0),
+                updated_at=target.c.updated_at  # Likes are not edits
+            )
+            .returning(target.c.like_count, added_count)
+        )
+
+    @staticmethod
+    async def load_reply_tree(
+        db: AsyncSession,
+        post_id: int,
+        user_id: Optional[int] = None,
+        max_depth: Optional[int] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        threaded: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Load the reply tree of a post with a single recursive query.
+
+        Replies, their authors and the current user's reply likes are fetched
+        in one statement (recursive CTE + joined author + outer-joined like),
+        then assembled into a tree in memory in O(n), or returned as a flat list
+        in (created_at, id) order across all nesting levels.
+
+        Args:
+            db: Database session
+            post_id: Post ID
+            user_id: Optional current user ID, used to fill user_has_liked
+            max_depth: Optional maximum nesting depth (0 = top-level replies only)
+            limit: Optional maximum number of top-level replies (page size)
+            offset: Number of top-level replies to skip
+            threaded: Nest replies under their parents (False: flat list, clients
+                rebuild the thread from parent_reply_id)
+
+        Returns:
+            List of top-level reply dictionaries, each with nested 'replies',
+            or the flat list of all loaded replies without 'replies'
+        """
+        # Anchor: the requested page of top-level replies
+        roots = (
+            select(FeedbackReply.id)
+            .where(
+                FeedbackReply.post_id == post_id,
+                FeedbackReply.parent_reply_id.is_(None)
+            )
+            .order_by(FeedbackReply.created_at, FeedbackReply.id)
+            .offset(offset)
+        )
+        if limit is not None:
+            roots = roots.limit(limit)
+        roots = roots.subquery()
+
+        tree = select(roots.c.id, literal(0).label("depth")).cte("reply_tree", recursive=True)
+
+        # Recursive step: children of already selected replies
+        children = select(FeedbackReply.id, (tree.c.depth + 1).label("depth")).join(
+            tree, FeedbackReply.parent_reply_id == tree.c.id
+        )
+        if max_depth is not None:
+            children = children.where(tree.c.depth < max_depth)
+        tree = tree.union_all(children)
+
+        if user_id is not None:
+            user_has_liked = FeedbackReplyLike.id.isnot(None).label("user_has_liked")
+        else:
+            user_has_liked = literal(False).label("user_has_liked")
+
+        query = (
+            select(FeedbackReply, user_has_liked)
+            .join(tree, FeedbackReply.id == tree.c.id)
+            .options(joinedload(FeedbackReply.author))
+        )
+        if user_id is not None:
+            query = query.outerjoin(
+                FeedbackReplyLike,
+                and_(
+                    FeedbackReplyLike.reply_id == FeedbackReply.id,
+                    FeedbackReplyLike.user_id == user_id
+                )
+            )
+
+        result = await db.execute(query.order_by(FeedbackReply.created_at, FeedbackReply.id))
+        rows = result.all()
+
+        nodes: Dict[int, Dict[str, Any]] = {}
+        for reply, liked in rows:
+            node = reply.to_dict()
+            node['user_has_liked'] = bool(liked)
+            nodes[reply.id] = node
+
+        if not threaded:
+            return list(nodes.values())
+
+        # Assemble the tree in memory: link every node to its parent in one pass
+        for node in nodes.values():
+            node['replies'] = []
+
+        top_level = []
+        for node in nodes.values():
+            parent = nodes.get(node['parent_reply_id'])
+            if parent is not None:
+                parent['replies'].append(node)
+            else:
+                top_level.append(node)
+
+        return top_level
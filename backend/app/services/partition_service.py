@@ -0,0 +1,157 @@
+# backend/app/services/partition_service.py
+# Partition Service - Maintenance of the monthly calculations partitions
+#
+# The partitioning functions live in the database (migrate_calculations_partitioning.sql);
+# this service calls them on a schedule and implements detach/archive of old months.
+
+import asyncio
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+
+from ..database import async_engine
+from ..utils.config import settings
+
+logger = logging.getLogger(__name__)
+
+MONTH_PATTERN = re.compile(r"^(\d{4})-(\d{2})$")
+IDENTIFIER_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]{0,62}$")
+
+
+class PartitionService:
+    """Calculations partition maintenance"""
+
+    @staticmethod
+    def partition_name(month: str) -> str:
+        """
+        Partition table name for a month.
+
+        Args:
+            month: Month as 'YYYY-MM'
+
+        Returns:
+            Partition name, e.g. 'calculations_p2024_01'
+
+        Raises:
+            ValueError: If month is not 'YYYY-MM'
+        """
+        match = MONTH_PATTERN.match(month)
+        if not match or not 1 <= int(match.group(2)) <= 12:
+            raise ValueError(f"Invalid month '{month}', expected YYYY-MM")
+        return f"calculations_p{match.group(1)}_{match.group(2)}"
+
+    @staticmethod
+    async def ensure_partitions(months_ahead: Optional[int] = None) -> int:
+        """
+        Create missing partitions for the current month and the months ahead.
+
+        Args:
+            months_ahead: Months to pre-create (default CALCULATIONS_PARTITION_MONTHS_AHEAD)
+
+        Returns:
+            Number of partitions created
+        """
+        if months_ahead is None:
+            months_ahead = settings.CALCULATIONS_PARTITION_MONTHS_AHEAD
+        async with async_engine.begin() as conn:
+            created = await conn.scalar(
+                text("SELECT calculations_ensure_partitions(now(), :months_ahead)"),
+                {"months_ahead": months_ahead}
+            )
+        return int(created or 0)
+
+    @staticmethod
+    async def list_partitions() -> List[Dict[str, Any]]:
+        """
+        Attached partitions of calculations with bounds and size.
+
+        Returns:
+            List of {name, bounds, estimated_rows, total_bytes}, oldest first
+        """
+        async with async_engine.connect() as conn:
+            result = await conn.execute(text("""
+                SELECT c.relname AS name,
+                       pg_get_expr(c.relpartbound, c.oid) AS bounds,
+                       c.reltuples::bigint AS estimated_rows,
+                       pg_total_relation_size(c.oid) AS total_bytes
+                FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = 'calculations'::regclass
+                ORDER BY c.relname
+            """))
+            return [dict(row._mapping) for row in result]
+
+    @staticmethod
+    async def detach_partition(
+        month: str,
+        archive_schema: Optional[str] = "archive",
+        tablespace: Optional[str] = None,
+        drop: bool = False
+    ) -> str:
+        """
+        Detach a month from calculations and archive or drop it.
+
+        Detached rows are no longer visible to the application and their ids
+        are removed from calculation_ids (job result_id references become NULL).
+        Stat counters keep counting them (totals are historical).
+
+        Args:
+            month: Month as 'YYYY-MM'
+            archive_schema: Schema the detached table is moved to (None keeps it in place)
+            tablespace: Optional tablespace (e.g. on cheaper storage) to move it to
+            drop: Drop the detached table instead of archiving it
+
+        Returns:
+            Qualified name of the archived table, or the dropped table's name
+
+        Raises:
+            ValueError: If month/identifiers are invalid or the partition is not attached
+        """
+        name = PartitionService.partition_name(month)
+        for identifier in (archive_schema, tablespace):
+            if identifier and not IDENTIFIER_PATTERN.match(identifier):
+                raise ValueError(f"Invalid identifier '{identifier}'")
+
+        async with async_engine.begin() as conn:
+            attached = await conn.scalar(
+                text("""
+                    SELECT 1 FROM pg_inherits
+                    WHERE inhparent = 'calculations'::regclass AND inhrelid = to_regclass(:name)
+                """),
+                {"name": name}
+            )
+            if not attached:
+                raise ValueError(f"Partition {name} is not attached to calculations")
+
+            await conn.exec_driver_sql(f'ALTER TABLE calculations DETACH PARTITION "{name}"')
+            # Detaching fires no delete triggers: release the month's ids by hand
+            await conn.exec_driver_sql(
+                f'DELETE FROM calculation_ids c USING "{name}" p WHERE c.id = p.id AND c.created_at = p.created_at'
+            )
+
+            if drop:
+                await conn.exec_driver_sql(f'DROP TABLE "{name}"')
+                return name
+
+            qualified = f'"{name}"'
+            if archive_schema:
+                await conn.exec_driver_sql(f'CREATE SCHEMA IF NOT EXISTS "{archive_schema}"')
+                await conn.exec_driver_sql(f'ALTER TABLE "{name}" SET SCHEMA "{archive_schema}"')
+                qualified = f'"{archive_schema}"."{name}"'
+            if tablespace:
+                await conn.exec_driver_sql(f'ALTER TABLE {qualified} SET TABLESPACE "{tablespace}"')
+            return qualified
+
+    @staticmethod
+    async def run() -> None:
+        """Periodically create future partitions until cancelled"""
+        while True:
+            try:
+                created = await PartitionService.ensure_partitions()
+                if created:
+                    logger.info("Created %d calculations partition(s)", created)
+            except Exception as e:
+                logger.warning("Partition maintenance failed, will retry: %s", e)
+            await asyncio.sleep(settings.CALCULATIONS_PARTITION_CHECK_INTERVAL_SECONDS)
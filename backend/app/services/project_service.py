@@ -1,21 +1,23 @@
 # backend/app/services/project_service.py
 # Project Service - Business logic for project management
 
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, desc
-from typing import List, Optional
+from sqlalchemy import select, or_, desc, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Dict
 from fastapi import HTTPException, status
 from datetime import datetime, timezone
 
-from ..models import Project
+from ..models import Project, Calculation
 from ..schemas import ProjectCreate, ProjectUpdate
+from ..utils.search import prefix_tsquery, tsquery_expression
+from ..utils.auth_cache import owned_project_ids, project_owner_cache, invalidate_project
 
 
 class ProjectService:
     """Project business logic service"""
     
     @staticmethod
-    def create_project(db: Session, project_data: ProjectCreate, user_id: int) -> Project:
+    async def create_project(db: AsyncSession, project_data: ProjectCreate, user_id: int) -> Project:
         """
         Create a new project.
         
@@ -40,13 +42,14 @@ class ProjectService:
         )
         
         db.add(project)
-        db.commit()
-        db.refresh(project)
+        await db.commit()
+        await db.refresh(project)
+        owned_project_ids(db).add(project.id)
         
         return project
     
     @staticmethod
-    def get_project_by_id(db: Session, project_id: int, user_id: Optional[int] = None) -> Optional[Project]:
+    async def get_project_by_id(db: AsyncSession, project_id: int, user_id: Optional[int] = None) -> Optional[Project]:
         """
         Get project by ID.
         
@@ -61,7 +64,7 @@ class ProjectService:
         Raises:
             HTTPException: If project not found or access denied
         """
-        project = db.query(Project).filter(Project.id == project_id).first()
+        project = await db.get(Project, project_id)
         
         if not project:
             raise HTTPException(
@@ -69,6 +72,8 @@ class ProjectService:
                 detail="Project not found"
             )
         
+        project_owner_cache.set(project.id, project.owner_id)
+        
         # Verify ownership if user_id provided
         if user_id and project.owner_id != user_id:
             raise HTTPException(
@@ -79,8 +84,84 @@ class ProjectService:
         return project
     
     @staticmethod
-    def list_user_projects(
-        db: Session,
+    async def verify_owner(db: AsyncSession, project_id: int, user_id: int) -> None:
+        """
+        Verify that a user owns a project without loading the project.
+        
+        Checked in order: projects already verified in this request, the
+        cross-request owner cache, then a single-column owner_id lookup.
+        
+        Args:
+            db: Database session
+            project_id: Project ID
+            user_id: User ID expected to own the project
+            
+        Raises:
+            HTTPException: If project not found or access denied
+        """
+        verified = owned_project_ids(db)
+        if project_id in verified:
+            return
+        
+        owner_id = project_owner_cache.get(project_id)
+        if owner_id is None:
+            owner_id = await db.scalar(select(Project.owner_id).where(Project.id == project_id))
+            if owner_id is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Project not found"
+                )
+            project_owner_cache.set(project_id, owner_id)
+        
+        if owner_id != user_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not enough permissions"
+            )
+        verified.add(project_id)
+    
+    @staticmethod
+    def _user_projects_query(
+        user_id: int,
+        search: Optional[str] = None,
+        archived_filter: Optional[bool] = None
+    ):
+        """
+        Build the filtered project query for a user.
+        
+        Returns:
+            (select statement, relevance rank expression or None)
+        """
+        query = select(Project).where(Project.owner_id == user_id)
+        
+        # Apply search filter: full-text match, or fuzzy (pg_trgm) match on name/client
+        rank = None
+        if search:
+            # `%` is the index-assisted pg_trgm similarity operator (pg_trgm.similarity_threshold)
+            conditions = [
+                Project.name.op('%')(search),
+                Project.client_name.op('%')(search),
+            ]
+            rank = func.greatest(
+                func.similarity(Project.name, search),
+                func.similarity(Project.client_name, search),
+            )
+            query_text = prefix_tsquery(search)
+            if query_text:
+                ts_query = tsquery_expression(query_text)
+                conditions.insert(0, Project.search_vector.op('@@')(ts_query))
+                rank = rank + func.ts_rank(Project.search_vector, ts_query)
+            query = query.where(or_(*conditions))
+        
+        # Apply archived filter
+        if archived_filter is not None:
+            query = query.where(Project.is_archived == archived_filter)
+        
+        return query, rank
+    
+    @staticmethod
+    async def list_user_projects(
+        db: AsyncSession,
         user_id: int,
         skip: int = 0,
         limit: int = 100,
@@ -101,34 +182,60 @@ class ProjectService:
         Returns:
             List of Project objects
         """
-        query = db.query(Project).filter(Project.owner_id == user_id)
+        query, rank = ProjectService._user_projects_query(user_id, search, archived_filter)
         
-        # Apply search filter
-        if search:
-            search_pattern = f"%{search}%"
-            query = query.filter(
-                or_(
-                    Project.name.ilike(search_pattern),
-                    Project.description.ilike(search_pattern),
-                    Project.location.ilike(search_pattern),
-                    Project.client_name.ilike(search_pattern),
-                )
-            )
+        # Order by relevance when searching, then most recent
+        if rank is not None:
+            query = query.order_by(desc(rank), desc(Project.created_at))
+        else:
+            query = query.order_by(desc(Project.created_at))
         
-        # Apply archived filter
-        if archived_filter is not None:
-            query = query.filter(Project.is_archived == archived_filter)
+        # Apply pagination
+        result = await db.scalars(query.offset(skip).limit(limit))
+        
+        return list(result)
+    
+    @staticmethod
+    async def count_user_projects(
+        db: AsyncSession,
+        user_id: int,
+        search: Optional[str] = None,
+        archived_filter: Optional[bool] = None
+    ) -> int:
+        """
+        Count projects for a user with the same filters as list_user_projects.
         
-        # Order by most recent
-        query = query.order_by(desc(Project.created_at))
+        Returns:
+            Number of matching projects
+        """
+        query, _ = ProjectService._user_projects_query(user_id, search, archived_filter)
+        total = await db.scalar(select(func.count()).select_from(query.subquery()))
+        return total or 0
+    
+    @staticmethod
+    async def count_calculations(db: AsyncSession, project_ids: List[int]) -> Dict[int, int]:
+        """
+        Count calculations per project in one grouped query.
         
-        # Apply pagination
-        projects = query.offset(skip).limit(limit).all()
+        Args:
+            db: Database session
+            project_ids: Project IDs
+            
+        Returns:
+            Mapping of project ID to calculation count
+        """
+        if not project_ids:
+            return {}
         
-        return projects
+        result = await db.execute(
+            select(Calculation.project_id, func.count(Calculation.id))
+            .where(Calculation.project_id.in_(project_ids))
+            .group_by(Calculation.project_id)
+        )
+        return {project_id: count for project_id, count in result.all()}
     
     @staticmethod
-    def update_project(db: Session, project_id: int, project_data: ProjectUpdate, user_id: int) -> Project:
+    async def update_project(db: AsyncSession, project_id: int, project_data: ProjectUpdate, user_id: int) -> Project:
         """
         Update a project.
         
@@ -144,7 +251,7 @@ class ProjectService:
         Raises:
             HTTPException: If project not found or access denied
         """
-        project = ProjectService.get_project_by_id(db, project_id, user_id)
+        project = await ProjectService.get_project_by_id(db, project_id, user_id)
         
         # Update fields
         update_data = project_data.model_dump(exclude_unset=True)
@@ -153,13 +260,13 @@ class ProjectService:
         for field, value in update_data.items():
             setattr(project, field, value)
         
-        db.commit()
-        db.refresh(project)
+        await db.commit()
+        await db.refresh(project)
         
         return project
     
     @staticmethod
-    def delete_project(db: Session, project_id: int, user_id: int) -> bool:
+    async def delete_project(db: AsyncSession, project_id: int, user_id: int) -> bool:
         """
         Delete a project.
         
@@ -174,10 +281,12 @@ class ProjectService:
         Raises:
             HTTPException: If project not found or access denied
         """
-        project = ProjectService.get_project_by_id(db, project_id, user_id)
+        project = await ProjectService.get_project_by_id(db, project_id, user_id)
         
-        db.delete(project)
-        db.commit()
+        await db.delete(project)
+        await db.commit()
+        invalidate_project(project_id)
+        owned_project_ids(db).discard(project_id)
         
         return True
 
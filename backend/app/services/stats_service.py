@@ -0,0 +1,52 @@
+# backend/app/services/stats_service.py
+# Stats Service - Public statistics from incrementally maintained counters
+#
+# Counts come from the stat_counters table (kept up to date by triggers, see
+# migrate_stat_counters.sql) instead of COUNT(*) over projects/calculations,
+# and are served from an in-memory stale-while-revalidate cache.
+
+from datetime import datetime, timezone
+from typing import Dict
+
+from sqlalchemy import select, func, table, column
+
+from ..database import replica_session
+from ..utils.cache import StaleWhileRevalidateCache
+from ..utils.config import settings
+
+stat_counters = table("stat_counters", column("name"), column("shard"), column("value"))
+
+
+class StatsService:
+    """Statistics service"""
+
+    @staticmethod
+    async def load_statistics() -> Dict[str, int]:
+        """
+        Read the public statistics from stat_counters (summing the shards).
+
+        Returns:
+            total_projects, total_calculations and calculations_this_month
+        """
+        month_key = "calculations:" + datetime.now(timezone.utc).strftime("%Y-%m")
+        async with await replica_session() as db:
+            result = await db.execute(
+                select(stat_counters.c.name, func.sum(stat_counters.c.value))
+                .where(stat_counters.c.name.in_(["projects", "calculations", month_key]))
+                .group_by(stat_counters.c.name)
+            )
+            counters = {name: int(value or 0) for name, value in result.all()}
+
+        return {
+            "total_projects": counters.get("projects", 0),
+            "total_calculations": counters.get("calculations", 0),
+            "calculations_this_month": counters.get(month_key, 0),
+        }
+
+
+# Process-wide cache of the statistics
+stats_cache = StaleWhileRevalidateCache(
+    StatsService.load_statistics,
+    ttl=settings.STATS_CACHE_TTL_SECONDS,
+    stale_ttl=settings.STATS_CACHE_STALE_SECONDS
+)
@@ -1,22 +1,24 @@
 # backend/app/services/user_service.py
 # User Service - Business logic for user management
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from fastapi import HTTPException, status
 from datetime import datetime
 
 from ..models import User, UserSettings
 from ..schemas import UserCreate, UserUpdate
-from ..utils.security import get_password_hash, verify_password, create_access_token
-from ..database import get_db
+from ..utils.security import get_password_hash_async, verify_password_async, create_access_token, access_token_claims
+from ..utils.token_versions import token_versions
+from ..utils.auth_cache import invalidate_user
 
 
 class UserService:
     """User business logic service"""
     
     @staticmethod
-    def create_user(db: Session, user_data: UserCreate) -> User:
+    async def create_user(db: AsyncSession, user_data: UserCreate) -> User:
         """
         Create a new user with hashed password.
         
@@ -31,15 +33,15 @@ class UserService:
             HTTPException: If email already exists
         """
         # Check if user already exists
-        existing_user = db.query(User).filter(User.email == user_data.email).first()
+        existing_user = await db.scalar(select(User).where(User.email == user_data.email))
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered"
             )
         
-        # Create user with hashed password
-        hashed_password = get_password_hash(user_data.password)
+        # Create user with hashed password (off the event loop)
+        hashed_password = await get_password_hash_async(user_data.password)
         # Let SQLAlchemy handle created_at via server_default
         # But explicitly set updated_at to ensure it's never None
         now = datetime.utcnow()
@@ -56,7 +58,7 @@ class UserService:
         )
         
         db.add(user)
-        db.flush()  # Flush to get user.id
+        await db.flush()  # Flush to get user.id
         
         # Create default user settings
         settings = UserSettings(
@@ -70,13 +72,13 @@ class UserService:
             default_phase=1,
         )
         db.add(settings)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
         
         return user
     
     @staticmethod
-    def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
+    async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[User]:
         """
         Authenticate a user with email and password.
         
@@ -88,12 +90,13 @@ class UserService:
         Returns:
             User object if authentication successful, None otherwise
         """
-        user = db.query(User).filter(User.email == email).first()
+        user = await db.scalar(select(User).where(User.email == email))
         
         if not user:
             return None
         
-        if not verify_password(password, user.hashed_password):
+        verified, new_hash = await verify_password_async(password, user.hashed_password)
+        if not verified:
             return None
         
         if not user.is_active:
@@ -102,24 +105,28 @@ class UserService:
                 detail="User account is disabled"
             )
         
+        # Stored hash uses outdated parameters (e.g. BCRYPT_ROUNDS raised): upgrade it
+        if new_hash:
+            user.hashed_password = new_hash
+        
         # Update last login
         user.last_login_at = datetime.utcnow()  # Fix: should be last_login_at, not last_login
-        db.commit()
+        await db.commit()
         
         return user
     
     @staticmethod
-    def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
+    async def get_user_by_id(db: AsyncSession, user_id: int) -> Optional[User]:
         """Get user by ID"""
-        return db.query(User).filter(User.id == user_id).first()
+        return await db.get(User, user_id)
     
     @staticmethod
-    def get_user_by_email(db: Session, email: str) -> Optional[User]:
+    async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
         """Get user by email"""
-        return db.query(User).filter(User.email == email).first()
+        return await db.scalar(select(User).where(User.email == email))
     
     @staticmethod
-    def update_user(db: Session, user: User, user_data: UserUpdate) -> User:
+    async def update_user(db: AsyncSession, user: User, user_data: UserUpdate) -> User:
         """
         Update user profile.
         
@@ -136,13 +143,14 @@ class UserService:
         for field, value in update_data.items():
             setattr(user, field, value)
         
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        invalidate_user(user.id)
+        await db.refresh(user)
         
         return user
     
     @staticmethod
-    def change_password(db: Session, user: User, old_password: str, new_password: str) -> bool:
+    async def change_password(db: AsyncSession, user: User, old_password: str, new_password: str) -> bool:
         """
         Change user password.
         
@@ -158,19 +166,47 @@ class UserService:
         Raises:
             HTTPException: If old password is incorrect
         """
-        if not verify_password(old_password, user.hashed_password):
+        verified, _ = await verify_password_async(old_password, user.hashed_password)
+        if not verified:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Incorrect password"
             )
         
-        user.hashed_password = get_password_hash(new_password)
-        db.commit()
+        user.hashed_password = await get_password_hash_async(new_password)
+        # Commits the new hash and revokes previously issued access tokens
+        await token_versions.bump(db, user.id)
+        invalidate_user(user.id)
         
         return True
     
     @staticmethod
-    def login_for_access_token(db: Session, email: str, password: str) -> dict:
+    async def set_user_active(db: AsyncSession, user: User, is_active: bool) -> User:
+        """
+        Activate or deactivate a user account.
+        
+        Deactivation revokes the user's access tokens immediately (token_version bump).
+        
+        Args:
+            db: Database session
+            user: User object
+            is_active: New account state
+            
+        Returns:
+            Updated User object
+        """
+        user.is_active = is_active
+        if is_active:
+            await db.commit()
+        else:
+            await token_versions.bump(db, user.id)
+        invalidate_user(user.id)
+        await db.refresh(user)
+        
+        return user
+    
+    @staticmethod
+    async def login_for_access_token(db: AsyncSession, email: str, password: str) -> dict:
         """
         Login user and return access token.
         
@@ -185,7 +221,7 @@ class UserService:
         Raises:
             HTTPException: If credentials invalid
         """
-        user = UserService.authenticate_user(db, email, password)
+        user = await UserService.authenticate_user(db, email, password)
         
         if not user:
             raise HTTPException(
@@ -195,9 +231,7 @@ class UserService:
             )
         
         # Create access token
-        access_token = create_access_token(
-            data={"sub": str(user.id), "email": user.email}
-        )
+        access_token = create_access_token(data=access_token_claims(user))
         
         return {
             "access_token": access_token,
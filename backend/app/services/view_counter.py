@@ -0,0 +1,131 @@
+# backend/app/services/view_counter.py
+# View Counter - Buffered, write-behind view counts for feedback posts
+#
+# Incrementing view_count with an UPDATE + COMMIT on every read row-locks hot posts.
+# Instead, views are aggregated in process and flushed periodically as one batched
+# "UPDATE ... SET view_count = view_count + n" statement per flush.
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Dict, Tuple
+
+from sqlalchemy import update, bindparam
+
+from ..database import async_engine
+from ..models import FeedbackPost
+from ..utils.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCounterBuffer:
+    """
+    In-process view counter buffer.
+
+    - record() counts a view unless the same viewer (user or session) already
+      viewed the post within the dedupe window
+    - flush() writes all pending increments in one batched UPDATE
+    - run() is the periodic flush loop started by the application lifespan
+    """
+
+    def __init__(self, flush_interval: float, dedupe_window: float):
+        self.flush_interval = flush_interval
+        self.dedupe_window = dedupe_window
+        self._pending: Dict[int, int] = {}
+        self._seen: Dict[Tuple[int, str], float] = {}
+        self._lock = threading.Lock()
+
+    def record(self, post_id: int, viewer_key: str) -> bool:
+        """
+        Record a view of a post.
+
+        Args:
+            post_id: Post ID
+            viewer_key: Identifies the viewer, e.g. "user:42" or "anon:<ip>"
+
+        Returns:
+            True if the view was counted, False if it was a duplicate within the window
+        """
+        now = time.monotonic()
+        key = (post_id, viewer_key)
+        with self._lock:
+            expires_at = self._seen.get(key)
+            if expires_at is not None and expires_at > now:
+                return False
+            self._seen[key] = now + self.dedupe_window
+            self._pending[post_id] = self._pending.get(post_id, 0) + 1
+            return True
+
+    def pending(self, post_id: int) -> int:
+        """Number of buffered (not yet flushed) views for a post"""
+        with self._lock:
+            return self._pending.get(post_id, 0)
+
+    def _swap(self) -> Dict[int, int]:
+        """Take pending increments and prune expired dedupe entries"""
+        now = time.monotonic()
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._seen = {k: v for k, v in self._seen.items() if v > now}
+        return pending
+
+    def _restore(self, pending: Dict[int, int]) -> None:
+        """Put increments back after a failed flush so no views are lost"""
+        with self._lock:
+            for post_id, count in pending.items():
+                self._pending[post_id] = self._pending.get(post_id, 0) + count
+
+    async def flush(self) -> int:
+        """
+        Write pending view counts to the database in one batched UPDATE.
+
+        Returns:
+            Number of posts updated
+        """
+        pending = self._swap()
+        if not pending:
+            return 0
+
+        table = FeedbackPost.__table__
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam('b_post_id'))
+            .values(
+                view_count=table.c.view_count + bindparam('b_views'),
+                updated_at=table.c.updated_at  # Views are not edits
+            )
+        )
+        params = [{'b_post_id': post_id, 'b_views': count} for post_id, count in pending.items()]
+
+        try:
+            async with async_engine.begin() as conn:
+                await conn.execute(stmt, params)
+        except Exception:
+            self._restore(pending)
+            raise
+
+        return len(params)
+
+    async def run(self) -> None:
+        """Periodically flush buffered views until cancelled"""
+        try:
+            while True:
+                await asyncio.sleep(self.flush_interval)
+                try:
+                    await self.flush()
+                except Exception as e:
+                    logger.warning("View count flush failed, will retry: %s", e)
+        finally:
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning("Final view count flush failed: %s", e)
+
+
+# Process-wide buffer
+view_counter = ViewCounterBuffer(
+    flush_interval=settings.VIEW_COUNT_FLUSH_INTERVAL_SECONDS,
+    dedupe_window=settings.VIEW_COUNT_DEDUPE_WINDOW_SECONDS
+)
@@ -0,0 +1,443 @@
+# backend/app/tracing.py
+# Request tracing: span trees, OTLP/JSON export, slow request and N+1 query logging
+#
+# Each traced request gets a root span (TracingMiddleware) with children for the
+# route handler and response serialization (instrument_routes), every SQL
+# statement (instrument_engine, normalized text) and explicit span() blocks
+# (calculation engine, signing, password hashing).
+#
+# Ids, span fields and the export format follow OpenTelemetry: an incoming W3C
+# traceparent header continues the caller's trace, and exported lines are OTLP/JSON
+# ExportTraceServiceRequest documents, readable by the collector's otlpjsonfile
+# receiver. Outside a traced request span() is a no-op (one context variable
+# lookup), so the instrumented code costs nothing when tracing is disabled.
+#
+# Lives outside app.utils (like metrics) so database.py can import it.
+
+import asyncio
+import json
+import logging
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache, wraps
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+# OTLP SpanKind / StatusCode values
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+STATUS_ERROR = 2
+
+
+class Span:
+    """One timed operation; attributes are flat str/int/float/bool values"""
+
+    __slots__ = ("name", "span_id", "parent_id", "kind", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, span_id: str, parent_id: Optional[str], kind: int,
+                 attributes: Dict[str, Any], start_ns: Optional[int] = None):
+        self.name = name
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.kind = kind
+        self.start_ns = start_ns or time.time_ns()
+        self.end_ns = 0
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    def end(self, end_ns: Optional[int] = None) -> None:
+        self.end_ns = end_ns or time.time_ns()
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+
+class Trace:
+    """Spans and SQL statement counts of one request"""
+
+    def __init__(self, trace_id: str, sampled: bool, max_spans: int):
+        self.trace_id = trace_id
+        self.sampled = sampled
+        self.max_spans = max_spans
+        self.spans: List[Span] = []
+        self.dropped_spans = 0
+        self.statements: Counter = Counter()
+
+    def start_span(self, name: str, parent: Optional[Span], attributes: Dict[str, Any],
+                   kind: int = SPAN_KIND_INTERNAL, start_ns: Optional[int] = None,
+                   parent_id: Optional[str] = None) -> Span:
+        span = Span(name, f"{random.getrandbits(64):016x}", parent.span_id if parent else parent_id,
+                    kind, attributes, start_ns)
+        if len(self.spans) < self.max_spans:
+            self.spans.append(span)
+        else:
+            self.dropped_spans += 1
+        return span
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Time a block as a child of the current span.
+
+    Yields:
+        The span, or None outside a traced request
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+    current = trace.start_span(name, _current_span.get(), attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as exc:
+        current.error = type(exc).__name__
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end()
+
+
+def current_ids() -> Tuple[Optional[str], Optional[str]]:
+    """(trace id, span id) of the current traced request, for log correlation"""
+    trace = _current_trace.get()
+    if trace is None:
+        return None, None
+    current = _current_span.get()
+    return trace.trace_id, current.span_id if current else None
+
+
+# SQL normalization: literals and bind parameters become ?, IN lists collapse
+_SQL_WHITESPACE = re.compile(r"\s+")
+_SQL_LITERALS = re.compile(r"'(?:[^']|'')*'|%\(\w+\)s|%s|\$\d+|(?<![\w.])\d+(?:\.\d+)?\b")
+_SQL_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SQL_MAX_LENGTH = 2000
+
+
+@lru_cache(maxsize=2048)
+def normalize_sql(statement: str) -> str:
+    """Statement text with literals/parameters replaced, for grouping and display"""
+    normalized = _SQL_WHITESPACE.sub(" ", statement).strip()
+    normalized = _SQL_LITERALS.sub("?", normalized)
+    normalized = _SQL_IN_LIST.sub("(?, ...)", normalized)
+    return normalized[:_SQL_MAX_LENGTH]
+
+
+_QUERY_START_KEY = "tracing_query_start"
+
+
+def _record_statement(conn, statement: str, executemany: bool, error: Optional[str] = None) -> None:
+    starts = conn.info.get(_QUERY_START_KEY)
+    trace = _current_trace.get()
+    if not starts or trace is None:
+        return
+    start_ns = starts.pop()
+    normalized = normalize_sql(statement or "")
+    trace.statements[normalized] += 1
+    attributes = {"db.system": "postgresql", "db.statement": normalized}
+    if executemany:
+        attributes["db.executemany"] = True
+    query = trace.start_span("db.query", _current_span.get(), attributes, SPAN_KIND_CLIENT, start_ns)
+    query.error = error
+    query.end()
+
+
+def instrument_engine(sync_engine) -> None:
+    """
+    Record a db.query span for each SQL statement run inside a traced request.
+
+    Args:
+        sync_engine: Engine (for async engines, engine.sync_engine)
+    """
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _current_trace.get() is not None:
+            conn.info.setdefault(_QUERY_START_KEY, []).append(time.time_ns())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        _record_statement(conn, statement, executemany)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(context):
+        if context.connection is not None:
+            _record_statement(context.connection, context.statement, False,
+                              type(context.original_exception).__name__)
+
+
+class SpanExporter:
+    """Writes finished traces as OTLP/JSON lines to a text stream"""
+
+    def __init__(self, stream: TextIO, service_name: str):
+        self.stream = stream
+        self.service_name = service_name
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _attribute(key: str, value: Any) -> Dict[str, Any]:
+        if isinstance(value, bool):
+            return {"key": key, "value": {"boolValue": value}}
+        if isinstance(value, int):
+            return {"key": key, "value": {"intValue": str(value)}}
+        if isinstance(value, float):
+            return {"key": key, "value": {"doubleValue": value}}
+        return {"key": key, "value": {"stringValue": str(value)}}
+
+    def encode(self, trace: Trace) -> Dict[str, Any]:
+        spans = []
+        for item in trace.spans:
+            encoded = {
+                "traceId": trace.trace_id,
+                "spanId": item.span_id,
+                "name": item.name,
+                "kind": item.kind,
+                "startTimeUnixNano": str(item.start_ns),
+                "endTimeUnixNano": str(item.end_ns or item.start_ns),
+                "attributes": [self._attribute(key, value) for key, value in item.attributes.items()],
+            }
+            if item.parent_id:
+                encoded["parentSpanId"] = item.parent_id
+            if item.error:
+                encoded["status"] = {"code": STATUS_ERROR, "message": item.error}
+            spans.append(encoded)
+        return {"resourceSpans": [{
+            "resource": {"attributes": [self._attribute("service.name", self.service_name)]},
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": spans}],
+        }]}
+
+    def export(self, trace: Trace) -> None:
+        line = json.dumps(self.encode(trace), separators=(",", ":"))
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+    def close(self) -> None:
+        if self.stream is not sys.stdout:
+            self.stream.close()
+
+
+def format_tree(trace: Trace) -> str:
+    """Indented span tree: offset from the request start, duration, name, details"""
+    children: Dict[Optional[str], List[Span]] = defaultdict(list)
+    ids = {item.span_id for item in trace.spans}
+    for item in trace.spans:
+        children[item.parent_id if item.parent_id in ids else None].append(item)
+    origin = min((item.start_ns for item in trace.spans), default=0)
+    lines: List[str] = []
+
+    def walk(parent_id: Optional[str], depth: int) -> None:
+        for item in sorted(children.get(parent_id, ()), key=lambda s: s.start_ns):
+            detail = item.attributes.get("db.statement") or item.attributes.get("code.function") or ""
+            flag = f" [{item.error}]" if item.error else ""
+            lines.append(
+                f"{(item.start_ns - origin) / 1e6:>9.1f} ms {item.duration_ms:>9.1f} ms  "
+                f"{'  ' * depth}{item.name}{flag} {detail[:160]}".rstrip()
+            )
+            walk(item.span_id, depth + 1)
+
+    walk(None, 0)
+    if trace.dropped_spans:
+        lines.append(f"... {trace.dropped_spans} more span(s) not recorded")
+    return "\n".join(lines)
+
+
+class Tracer:
+    """Tracing configuration and end-of-request reporting (module singleton `tracer`)"""
+
+    def __init__(self):
+        self.service_name = "tradespro-backend"
+        self.exporter: Optional[SpanExporter] = None
+        self.sample_ratio = 1.0
+        self.slow_request_ms = 1000.0
+        self.n_plus_one_threshold = 10
+        self.max_spans = 2000
+
+    def configure(self, exporter: str = "none", file_path: str = "traces.jsonl", sample_ratio: float = 1.0,
+                  slow_request_ms: float = 1000.0, n_plus_one_threshold: int = 10,
+                  max_spans: int = 2000) -> None:
+        """
+        Args:
+            exporter: 'none', 'stdout' or 'file'
+            file_path: Output of the 'file' exporter (appended)
+            sample_ratio: Share of requests exported (a sampled traceparent is always exported)
+            slow_request_ms: Requests at least this slow log their span tree
+            n_plus_one_threshold: Log statements executed more often than this in one request
+            max_spans: Spans kept per request (statements are still counted beyond it)
+
+        Raises:
+            ValueError: If exporter is unknown
+        """
+        if exporter == "stdout":
+            self.exporter = SpanExporter(sys.stdout, self.service_name)
+        elif exporter == "file":
+            self.exporter = SpanExporter(open(file_path, "a", encoding="utf-8"), self.service_name)
+        elif exporter == "none":
+            self.exporter = None
+        else:
+            raise ValueError(f"Unknown tracing exporter '{exporter}' (none, stdout, file)")
+        self.sample_ratio = sample_ratio
+        self.slow_request_ms = slow_request_ms
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.max_spans = max_spans
+
+    def start_trace(self, traceparent: Optional[str]) -> Tuple[Trace, Optional[str]]:
+        """New trace, continuing a valid W3C traceparent; returns (trace, remote parent span id)"""
+        match = _TRACEPARENT.match(traceparent or "")
+        if match and match.group(1) != "0" * 32:
+            sampled = bool(int(match.group(3), 16) & 1) or random.random() < self.sample_ratio
+            return Trace(match.group(1), sampled, self.max_spans), match.group(2)
+        sampled = random.random() < self.sample_ratio
+        return Trace(f"{random.getrandbits(128):032x}", sampled, self.max_spans), None
+
+    def finish(self, trace: Trace, root: Span) -> None:
+        """Log N+1 patterns and slow requests, then export"""
+        repeated = [(statement, count) for statement, count in trace.statements.items()
+                    if count > self.n_plus_one_threshold]
+        for statement, count in repeated:
+            logger.warning(
+                "Possible N+1: statement executed %d times in %s (trace %s): %s",
+                count, root.name, trace.trace_id, statement[:300]
+            )
+        if repeated:
+            root.attributes["db.n_plus_one_statements"] = len(repeated)
+        root.attributes["db.statement_count"] = sum(trace.statements.values())
+
+        if root.duration_ms >= self.slow_request_ms:
+            logger.warning(
+                "Slow request %s: %.1f ms, %d SQL statement(s) (trace %s)\n%s",
+                root.name, root.duration_ms, root.attributes["db.statement_count"], trace.trace_id,
+                format_tree(trace)
+            )
+        if self.exporter and trace.sampled:
+            try:
+                self.exporter.export(trace)
+            except Exception as e:
+                logger.warning("Trace export failed: %s", e)
+
+    def shutdown(self) -> None:
+        if self.exporter:
+            self.exporter.close()
+            self.exporter = None
+
+
+tracer = Tracer()
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware opening the root span of each HTTP request.
+
+    The span is named '<METHOD> <route template>' once routing has run, and the
+    response carries the trace id in a traceresponse header.
+    """
+
+    def __init__(self, app, skip_paths=("/metrics", "/health")):
+        self.app = app
+        self.skip_paths = frozenset(skip_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = None
+        for name, value in scope.get("headers", ()):
+            if name == b"traceparent":
+                traceparent = value.decode("latin-1").strip()
+                break
+        trace, remote_parent = tracer.start_trace(traceparent)
+        root = trace.start_span(
+            f"{scope['method']} {scope['path']}", None,
+            {"http.request.method": scope["method"], "url.path": scope["path"]},
+            SPAN_KIND_SERVER, parent_id=remote_parent
+        )
+        trace_token = _current_trace.set(trace)
+        span_token = _current_span.set(root)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                flags = "01" if trace.sampled else "00"
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [
+                    (b"traceresponse", f"00-{trace.trace_id}-{root.span_id}-{flags}".encode("latin-1"))
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as exc:
+            root.error = type(exc).__name__
+            raise
+        finally:
+            _current_span.reset(span_token)
+            _current_trace.reset(trace_token)
+            root.end()
+            route = getattr(scope.get("route"), "path", None)
+            if route:
+                root.name = f"{scope['method']} {route}"
+                root.attributes["http.route"] = route
+            root.attributes["http.response.status_code"] = status_code
+            if status_code >= 500:
+                root.error = root.error or str(status_code)
+            tracer.finish(trace, root)
+
+
+def _traced_endpoint(endpoint, name: str):
+    if asyncio.iscoroutinefunction(endpoint):
+        @wraps(endpoint)
+        async def traced(*args, **kwargs):
+            with span("route.handler", **{"code.function": name}):
+                return await endpoint(*args, **kwargs)
+    else:
+        @wraps(endpoint)
+        def traced(*args, **kwargs):
+            with span("route.handler", **{"code.function": name}):
+                return endpoint(*args, **kwargs)
+    traced.__traced__ = True
+    return traced
+
+
+def instrument_routes(app) -> None:
+    """
+    Add route.handler spans around every endpoint and a response.serialize span
+    around FastAPI's response validation/encoding. Call after including routers.
+    """
+    import fastapi.routing
+    from starlette.routing import request_response
+
+    for route in app.routes:
+        if isinstance(route, fastapi.routing.APIRoute) and not getattr(route.dependant.call, "__traced__", False):
+            endpoint = route.dependant.call
+            route.dependant.call = _traced_endpoint(endpoint, getattr(endpoint, "__qualname__", route.name))
+            route.app = request_response(route.get_route_handler())
+
+    # serialize_response is looked up as a module global by the route handlers
+    serialize_response = fastapi.routing.serialize_response
+    if not getattr(serialize_response, "__traced__", False):
+        @wraps(serialize_response)
+        async def traced_serialize_response(**kwargs):
+            with span("response.serialize"):
+                return await serialize_response(**kwargs)
+
+        traced_serialize_response.__traced__ = True
+        fastapi.routing.serialize_response = traced_serialize_response
@@ -1,12 +1,41 @@
 # backend/app/utils/__init__.py
 # Utility functions package
+#
+# The exports below resolve on first access (PEP 562), so importing one submodule
+# (the models import app.utils.search) does not load security, jose, passlib and
+# the database engines with it.
 
-from .security import get_password_hash, verify_password, create_access_token, verify_token, get_current_user, get_current_user_optional
-from .config import settings
+import importlib
+from typing import TYPE_CHECKING
 
-__all__ = [
-    'get_password_hash', 'verify_password', 'create_access_token', 'verify_token', 'get_current_user', 'get_current_user_optional',
-    'settings',
-]
+if TYPE_CHECKING:
+    from .auth_cache import Principal
+    from .config import settings
+    from .security import (
+        create_access_token, get_current_principal, get_current_principal_optional, get_current_user,
+        get_current_user_optional, get_password_hash, verify_password, verify_token
+    )
 
+_EXPORTS = {
+    'get_password_hash': 'security',
+    'verify_password': 'security',
+    'create_access_token': 'security',
+    'verify_token': 'security',
+    'get_current_user': 'security',
+    'get_current_user_optional': 'security',
+    'get_current_principal': 'security',
+    'get_current_principal_optional': 'security',
+    'Principal': 'auth_cache',
+    'settings': 'config',
+}
 
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,49 @@
+# backend/app/utils/auth_cache.py
+# Authorization caches: authenticated principal and project ownership
+#
+# - Per request: the authenticated Principal (request.state.principal) and the
+#   project ids whose ownership was already verified (session.info)
+# - Across requests (per process, short TTL): user_id -> (is_active, is_superuser)
+#   and project_id -> owner_id. Writers invalidate the keys they change; other
+#   workers pick up changes within AUTH_CACHE_TTL_SECONDS.
+
+from dataclasses import dataclass
+from typing import Optional, Set
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .cache import TTLCache
+from .config import settings
+
+OWNED_PROJECTS_KEY = "owned_project_ids"
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Authenticated user as seen by authorization checks (no ORM row)"""
+    id: int
+    email: Optional[str]
+    is_active: bool
+    is_superuser: bool
+
+
+# user_id -> (is_active, is_superuser)
+user_status_cache = TTLCache(settings.AUTH_CACHE_TTL_SECONDS, settings.AUTH_CACHE_MAX_ENTRIES)
+
+# project_id -> owner_id
+project_owner_cache = TTLCache(settings.AUTH_CACHE_TTL_SECONDS, settings.AUTH_CACHE_MAX_ENTRIES)
+
+
+def owned_project_ids(db: AsyncSession) -> Set[int]:
+    """Project ids verified as owned by the current user within this session (request)"""
+    return db.info.setdefault(OWNED_PROJECTS_KEY, set())
+
+
+def invalidate_user(user_id: int) -> None:
+    """Drop the cached status of a user (after is_active/is_superuser/password changes)"""
+    user_status_cache.invalidate(user_id)
+
+
+def invalidate_project(project_id: int) -> None:
+    """Drop the cached owner of a project (after delete or ownership change)"""
+    project_owner_cache.invalidate(project_id)
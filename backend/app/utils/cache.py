@@ -0,0 +1,122 @@
+# backend/app/utils/cache.py
+# In-memory caching helpers
+
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class StaleWhileRevalidateCache:
+    """
+    Single-value async cache with stale-while-revalidate.
+
+    - Younger than ttl: served from memory
+    - Between ttl and ttl + stale_ttl: served from memory while one background
+      task reloads it
+    - Older (or never loaded): callers wait for one shared reload
+    - If a reload fails, the last value is served while any value exists
+    """
+
+    def __init__(self, loader: Callable[[], Awaitable[Any]], ttl: float, stale_ttl: float):
+        self.loader = loader
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._value: Any = None
+        self._loaded_at: Optional[float] = None
+        self._refresh: Optional[asyncio.Task] = None
+
+    def _start_refresh(self) -> asyncio.Task:
+        """Start a reload unless one is already running (single flight)"""
+        if self._refresh is None or self._refresh.done():
+            self._refresh = asyncio.create_task(self._reload())
+        return self._refresh
+
+    async def _reload(self) -> Any:
+        value = await self.loader()
+        self._value = value
+        self._loaded_at = time.monotonic()
+        return value
+
+    async def get(self) -> Any:
+        """
+        Current value, loading it if needed.
+
+        Raises:
+            Exception: Loader errors, only when there is no value to fall back to
+        """
+        if self._loaded_at is not None:
+            age = time.monotonic() - self._loaded_at
+            if age < self.ttl:
+                return self._value
+            if age < self.ttl + self.stale_ttl:
+                self._start_refresh().add_done_callback(self._log_failure)
+                return self._value
+
+        try:
+            return await asyncio.shield(self._start_refresh())
+        except Exception as e:
+            if self._loaded_at is None:
+                raise
+            logger.warning("Cache reload failed, serving expired value: %s", e)
+            return self._value
+
+    def invalidate(self) -> None:
+        """Force the next get() to reload"""
+        self._loaded_at = None
+
+    @staticmethod
+    def _log_failure(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Background cache refresh failed: %s", task.exception())
+
+
+class TTLCache:
+    """
+    Bounded key/value cache with a per-entry time to live.
+
+    Entries expire ttl seconds after they were set; beyond max_entries the
+    least recently used entry is evicted. Local to the process: writers must
+    invalidate() the keys they change, and other workers see the change once
+    their entry expires.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._items: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Cached value for key, or default if missing or expired"""
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return default
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._items[key]
+                return default
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._items[key] = (time.monotonic() + self.ttl, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
@@ -30,6 +30,17 @@ class Settings(BaseSettings):
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # Stateless access tokens: carry is_active/is_superuser/token_version claims so
+    # requests authenticate without a user lookup (revocation via token_version)
+    JWT_STATELESS_CLAIMS: bool = False
+    # memory (per worker, AUTH_CACHE_TTL_SECONDS) or redis (REDIS_URL, immediate on every worker);
+    # unset: redis when WEB_CONCURRENCY > 1, else memory. memory is refused in production with several workers
+    JWT_REVOCATION_BACKEND: str = ""
+    
+    # Password hashing (bcrypt, on a dedicated thread pool per worker)
+    BCRYPT_ROUNDS: int = 12  # Hashes with fewer rounds are upgraded on the next successful login
+    PASSWORD_HASH_WORKERS: int = 2  # Threads per worker process (bcrypt is CPU-bound)
+    PASSWORD_HASH_MAX_PENDING: int = 32  # Queued + running hash calls before 503 Retry-After
     
     # Bundle Signing (V4.1 Architecture)
     BUNDLE_SIGNING_KEY: str = os.getenv("BUNDLE_SIGNING_KEY", SECRET_KEY)  # Dedicated key for bundle signing
@@ -55,6 +66,69 @@ class Settings(BaseSettings):
             "This should only be used in development!"
         )
     
+    # Feedback view counters (write-behind buffer)
+    VIEW_COUNT_FLUSH_INTERVAL_SECONDS: float = 10.0  # How often buffered views are written
+    VIEW_COUNT_DEDUPE_WINDOW_SECONDS: float = 1800.0  # Repeat views by the same viewer are ignored within this window
+    
+    # Public statistics cache (/api/v1/stats)
+    STATS_CACHE_TTL_SECONDS: float = 60.0  # Served from memory without refreshing
+    STATS_CACHE_STALE_SECONDS: float = 600.0  # Served stale while refreshing in the background
+    
+    # Schema handling at startup: verify (check the Alembic revision, no DDL),
+    # migrate (upgrade first; development only) or skip. Deployments run
+    # `python manage_db.py migrate` once per release instead.
+    DB_STARTUP_SCHEMA: str = "verify"
+    
+    # Logging (app/log_config.py): queued output to stdout, request-id correlation
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"  # json (one object per line) or text
+    LOG_LEVELS: str = ""  # Per-logger levels, e.g. "sqlalchemy.engine=WARNING,app.services=DEBUG"
+    LOG_DEBUG_SAMPLE_RATIO: float = 1.0  # Share of DEBUG records kept
+    LOG_DEBUG_RATE_LIMIT: float = 0.0  # DEBUG records per second per call site (0 = unlimited)
+    
+    # Prometheus metrics (GET /metrics, per worker process)
+    METRICS_ENABLED: bool = True
+    
+    # Request tracing (app/tracing.py): span trees, slow request and N+1 logging
+    TRACING_ENABLED: bool = False
+    TRACING_EXPORTER: str = "none"  # none, stdout or file (OTLP/JSON lines)
+    TRACING_FILE: str = "traces.jsonl"
+    TRACING_SAMPLE_RATIO: float = 1.0  # Share of requests exported
+    TRACING_SLOW_REQUEST_MS: float = 1000.0  # Requests at least this slow log their span tree
+    TRACING_N_PLUS_ONE_THRESHOLD: int = 10  # Same statement more often than this in one request is logged
+    TRACING_MAX_SPANS: int = 2000  # Spans kept per request
+    
+    # Response compression (app/compression.py): zstd/br need the zstandard/brotli packages
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024  # Smaller bodies are sent uncompressed
+    COMPRESSION_ENCODINGS: str = "zstd,br,gzip"  # Server preference order
+    
+    # Validate calculation/feedback payloads against their response schema before
+    # sending (app/utils/responses.py); for development and CI, off in production
+    VALIDATE_RESPONSES: bool = False
+    
+    # Authorization caches (user status, project owner), per worker process
+    AUTH_CACHE_TTL_SECONDS: float = 30.0  # Max staleness of is_active/is_superuser/owner across workers
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+    
+    # Calculations partitioning (monthly, by created_at)
+    CALCULATIONS_PARTITION_MONTHS_AHEAD: int = 3  # Future monthly partitions kept ready
+    CALCULATIONS_PARTITION_CHECK_INTERVAL_SECONDS: float = 86400.0  # How often missing partitions are created
+    
+    # Cold storage of old signed calculation bundles ('' = disabled, 'local' or 's3')
+    COLD_STORAGE_BACKEND: str = ""
+    COLD_STORAGE_LOCAL_DIR: str = "./cold_storage"
+    COLD_STORAGE_S3_BUCKET: str = ""
+    COLD_STORAGE_S3_PREFIX: str = "tradespro"
+    COLD_STORAGE_S3_ENDPOINT_URL: Optional[str] = None  # S3-compatible stores (MinIO, R2, ...)
+    COLD_STORAGE_MIN_AGE_DAYS: int = 90  # Signed calculations older than this are offloaded
+    COLD_STORAGE_BATCH_SIZE: int = 200
+    COLD_STORAGE_OFFLOAD_INTERVAL_SECONDS: float = 3600.0
+    COLD_STORAGE_CACHE_SIZE: int = 128  # Recently rehydrated bundles kept in memory
+    
+    # Bulk calculation sync
+    BULK_SYNC_BATCH_SIZE: int = 100  # Rows per INSERT ... ON CONFLICT statement
+    
     # External Services
     CALCULATION_SERVICE_URL: str = os.getenv("CALCULATION_SERVICE_URL", "http://calc-service:3001")
     
@@ -0,0 +1,64 @@
+# backend/app/utils/password_hasher.py
+# Bounded executor for password hashing (bcrypt is CPU-bound, ~100-300 ms per call)
+#
+# Hashing on the event loop thread blocks every other request of the worker.
+# Calls run on a small dedicated thread pool instead (bcrypt releases the GIL);
+# when more than max_pending calls are queued or running, new calls are refused
+# with 503 so a login burst cannot grow an unbounded backlog.
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from fastapi import HTTPException, status
+
+
+class PasswordHashPool:
+    """Thread pool with a limit on queued + running calls"""
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = max(1, workers)
+        self.max_pending = max(self.workers, max_pending)
+        self.pending = 0
+        self.rejected = 0
+        self._executor = None
+
+    def executor(self) -> ThreadPoolExecutor:
+        """Thread pool (created on first use)"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run func(*args) on the pool.
+
+        Raises:
+            HTTPException: 503 if the queue is full
+        """
+        # Only touched from the event loop thread, so a plain counter is enough
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many authentication requests, please retry",
+                headers={"Retry-After": "1"},
+            )
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor(), func, *args)
+        finally:
+            self.pending -= 1
+
+    def status(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
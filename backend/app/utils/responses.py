@@ -0,0 +1,172 @@
+# backend/app/utils/responses.py
+# JSON responses built straight from to_dict() output, without response_model validation
+#
+# Returning a dict with response_model=... makes FastAPI validate the whole
+# payload (every step of a calculation bundle) and then encode it again. The
+# routes here already build their data from ORM rows, so json_response() only
+# shapes the dict to the schema's fields (defaults for missing keys, extra keys
+# dropped, nested models recursed, ISO datetime strings parsed) and encodes it
+# once with orjson. The bytes match what FastAPI would send: orjson with
+# OPT_UTC_Z formats datetimes the same way Pydantic does.
+#
+# Keep response_model on the route for the OpenAPI schema. Conformance is
+# checked outside the request path: tests/test_responses.py compares the bytes
+# with FastAPI's for every schema served this way, VALIDATE_RESPONSES=true
+# validates every payload against the schema (development) and
+# benchmarks/micro.py repeats the check for its fixture bundles.
+#
+# Conditional GET: etag_matches() compares If-None-Match with a route's ETag,
+# including the encoded variants CompressionMiddleware sends (app/compression.py).
+
+import types
+import typing
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Collection, Dict, Mapping, Optional, Tuple, Type
+
+import orjson
+from fastapi import status
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+from ..compression import encoded_etag
+from ..tracing import span
+from .config import settings
+
+# Signed bundles never change: clients may keep them for a year without revalidating
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+# Content codings whose ETag variants are accepted in If-None-Match
+ETAG_ENCODINGS = ("zstd", "br", "gzip")
+
+# Per field: (name, default, kind, nested model); kind is value, datetime, model or list
+_FieldPlan = Tuple[str, Any, str, Optional[Type[BaseModel]]]
+
+
+def _strip_optional(annotation: Any) -> Any:
+    if typing.get_origin(annotation) in (typing.Union, types.UnionType):
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
+
+
+def _is_model(annotation: Any) -> bool:
+    return isinstance(annotation, type) and issubclass(annotation, BaseModel)
+
+
+@lru_cache(maxsize=None)
+def _plan(model: Type[BaseModel]) -> Tuple[_FieldPlan, ...]:
+    """How each field of a schema is shaped, worked out once per model"""
+    plan = []
+    for name, field in model.model_fields.items():
+        annotation = _strip_optional(field.annotation)
+        default = None if field.is_required() else field.get_default(call_default_factory=True)
+        if annotation is datetime:
+            plan.append((name, default, "datetime", None))
+        elif _is_model(annotation):
+            plan.append((name, default, "model", annotation))
+        elif typing.get_origin(annotation) in (list, typing.List) and _is_model(typing.get_args(annotation)[0]):
+            plan.append((name, default, "list", typing.get_args(annotation)[0]))
+        else:
+            plan.append((name, default, "value", None))
+    return tuple(plan)
+
+
+def shape(model: Type[BaseModel], data: Mapping[str, Any], exclude: Collection[str] = ()) -> Dict[str, Any]:
+    """
+    Shape a dictionary to a schema's fields, in field order.
+
+    Values are not validated or coerced; the data must already have the right
+    types (to_dict() output does).
+
+    Args:
+        model: Response schema
+        data: Dictionary built by the route (e.g. from to_dict())
+        exclude: Top-level fields left out of the output
+
+    Returns:
+        Dictionary ready for orjson
+    """
+    shaped = {}
+    for name, default, kind, nested in _plan(model):
+        if name in exclude:
+            continue
+        value = data.get(name, default)
+        if value is not None:
+            if kind == "datetime" and isinstance(value, str):
+                value = datetime.fromisoformat(value)
+            elif kind == "model":
+                value = shape(nested, value)
+            elif kind == "list":
+                value = [shape(nested, item) for item in value]
+        shaped[name] = value
+    return shaped
+
+
+def json_response(
+    model: Type[BaseModel],
+    data: Mapping[str, Any],
+    status_code: int = status.HTTP_200_OK,
+    headers: Optional[Dict[str, str]] = None,
+    exclude: Collection[str] = ()
+) -> Response:
+    """
+    Serialize data as the given schema in one pass.
+
+    Args:
+        model: Response schema (the route's response_model)
+        data: Dictionary built by the route
+        status_code: HTTP status (the route decorator's status_code does not
+            apply to returned Response objects)
+        headers: Extra response headers (ETag, Cache-Control)
+        exclude: Top-level fields left out (projections)
+
+    Returns:
+        application/json response
+
+    Raises:
+        pydantic.ValidationError: If VALIDATE_RESPONSES is on and data does not match the schema
+    """
+    with span("response.serialize", model=model.__name__):
+        if settings.VALIDATE_RESPONSES:
+            model.model_validate(data)
+        body = orjson.dumps(shape(model, data, exclude), option=orjson.OPT_UTC_Z)
+    return Response(content=body, status_code=status_code, headers=headers, media_type="application/json")
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Weak comparison of an If-None-Match header with an ETag (RFC 9110 13.1.2).
+
+    The encoded variants of etag ("...-gzip") match as well.
+
+    Args:
+        if_none_match: Request header value (None: no condition)
+        etag: Current ETag of the identity representation
+
+    Returns:
+        True if the client's copy is current (respond 304)
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    accepted = {etag, *(encoded_etag(etag, encoding) for encoding in ETAG_ENCODINGS)}
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate in accepted:
+            return True
+    return False
+
+
+def not_modified_response(headers: Dict[str, str]) -> Response:
+    """
+    304 Not Modified with the validator and caching headers of the full response.
+
+    Args:
+        headers: ETag and Cache-Control the 200 response would carry
+    """
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
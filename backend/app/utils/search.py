@@ -0,0 +1,73 @@
+# backend/app/utils/search.py
+# Full-text search helpers (PostgreSQL tsvector/tsquery + pg_trgm)
+#
+# Posts and projects carry a generated `search_vector` column indexed with GIN.
+# The vector is built for both English and French (we serve en-CA and fr-CA),
+# so one query is matched against both stemmers.
+
+import re
+from typing import Optional
+
+from sqlalchemy import Computed, func
+
+# Text search configurations used for every search_vector
+SEARCH_CONFIGS = ("english", "french")
+
+
+def weighted_tsvector_sql(*weighted_columns) -> str:
+    """
+    Build the SQL expression for a generated tsvector column.
+
+    Args:
+        weighted_columns: (column_name, weight) pairs, weight in 'A'..'D'
+
+    Returns:
+        SQL expression concatenating the weighted vectors for every search config
+    """
+    parts = [
+        f"setweight(to_tsvector('{config}', coalesce({column}, '')), '{weight}')"
+        for config in SEARCH_CONFIGS
+        for column, weight in weighted_columns
+    ]
+    return " || ".join(parts)
+
+
+def search_vector_computed(*weighted_columns) -> Computed:
+    """Computed (GENERATED ALWAYS ... STORED) clause for a search_vector column"""
+    return Computed(weighted_tsvector_sql(*weighted_columns), persisted=True)
+
+
+def prefix_tsquery(search: str) -> Optional[str]:
+    """
+    Turn free user input into a prefix-matching tsquery string.
+
+    "load calc" -> "load:* & calc:*". Only word characters are kept, so user
+    input can never produce a tsquery syntax error.
+
+    Args:
+        search: Raw search string
+
+    Returns:
+        tsquery text, or None if the input has no searchable terms
+    """
+    terms = re.findall(r"\w+", search or "")
+    if not terms:
+        return None
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+def tsquery_expression(query_text: str):
+    """
+    tsquery matching query_text in any of the search configs.
+
+    Args:
+        query_text: Output of prefix_tsquery()
+
+    Returns:
+        SQL expression: to_tsquery('english', q) || to_tsquery('french', q)
+    """
+    expression = None
+    for config in SEARCH_CONFIGS:
+        config_query = func.to_tsquery(config, query_text)
+        expression = config_query if expression is None else expression.op("||")(config_query)
+    return expression
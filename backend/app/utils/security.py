@@ -2,21 +2,36 @@
 # Security utilities: password hashing, JWT token management
 
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from .auth_cache import Principal, user_status_cache
 from .config import settings
+from .token_versions import token_versions
+from .password_hasher import PasswordHashPool
+from ..metrics import PASSWORD_HASH_DURATION
+from ..tracing import span
 from ..database import get_db
 from ..models import User
 from ..schemas import TokenData
 
 
 # Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min_rounds = default rounds: hashes made with a lower cost need an update
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS
+)
+
+# Hashing/verification off the event loop (see app/utils/password_hasher.py)
+password_hash_pool = PasswordHashPool(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
 
 # JWT security scheme
 security = HTTPBearer(auto_error=False)  # Allow optional authentication
@@ -49,6 +64,47 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def _timed_hash(password: str) -> str:
+    with PASSWORD_HASH_DURATION.time("hash"):
+        return pwd_context.hash(password)
+
+
+def _timed_verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    with PASSWORD_HASH_DURATION.time("verify"):
+        return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Hash a password on the password hashing pool.
+    
+    Raises:
+        HTTPException: 503 if the pool's queue is full
+    """
+    with span("password.hash"):
+        return await password_hash_pool.run(_timed_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password on the password hashing pool.
+    
+    Args:
+        plain_password: Plain text password to verify
+        hashed_password: Stored hash
+        
+    Returns:
+        (matches, new_hash): new_hash is set when the password matches but the
+        stored hash uses outdated parameters (scheme or BCRYPT_ROUNDS) and
+        should be replaced
+        
+    Raises:
+        HTTPException: 503 if the pool's queue is full
+    """
+    with span("password.verify"):
+        return await password_hash_pool.run(_timed_verify_and_update, plain_password, hashed_password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT access token.
@@ -78,6 +134,29 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
+def access_token_claims(user: User) -> dict:
+    """
+    Claims of an access token for a user.
+    
+    With JWT_STATELESS_CLAIMS the token also carries is_active, is_superuser and
+    token_version, so get_current_principal can authenticate without a user lookup.
+    
+    Args:
+        user: Authenticated user
+        
+    Returns:
+        Data for create_access_token
+    """
+    claims = {"sub": str(user.id), "email": user.email}
+    if settings.JWT_STATELESS_CLAIMS:
+        claims.update({
+            "act": user.is_active,
+            "su": user.is_superuser,
+            "ver": user.token_version or 0,
+        })
+    return claims
+
+
 def verify_token(token: str) -> Optional[TokenData]:
     """
     Verify and decode a JWT token.
@@ -101,16 +180,22 @@ def verify_token(token: str) -> Optional[TokenData]:
         if user_id is None:
             return None
         
-        token_data = TokenData(user_id=int(user_id), email=email)
+        token_data = TokenData(
+            user_id=int(user_id),
+            email=email,
+            is_active=payload.get("act"),
+            is_superuser=payload.get("su"),
+            token_version=payload.get("ver")
+        )
         return token_data
         
     except JWTError:
         return None
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+async def get_current_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
+    db: AsyncSession = Depends(get_db)
 ) -> User:
     """
     Get the current authenticated user from JWT token.
@@ -132,17 +217,26 @@ def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
+    if credentials is None:
+        raise credentials_exception
+    
     token = credentials.credentials
     token_data = verify_token(token)
     
     if token_data is None:
         raise credentials_exception
     
-    user = db.query(User).filter(User.id == token_data.user_id).first()
+    user = await db.get(User, token_data.user_id)
     
     if user is None:
         raise credentials_exception
     
+    # Revoked by a password change / deactivation
+    if token_data.token_version is not None and token_data.token_version != user.token_version:
+        raise credentials_exception
+    
+    user_status_cache.set(user.id, (user.is_active, user.is_superuser))
+    
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -152,9 +246,9 @@ def get_current_user(
     return user
 
 
-def get_current_user_optional(
+async def get_current_user_optional(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> Optional[User]:
     """
     Get the current user if authenticated, otherwise return None.
@@ -178,17 +272,144 @@ def get_current_user_optional(
         if token_data is None:
             return None
         
-        user = db.query(User).filter(User.id == token_data.user_id).first()
+        user = await db.get(User, token_data.user_id)
         
         if user is None or not user.is_active:
             return None
         
+        if token_data.token_version is not None and token_data.token_version != user.token_version:
+            return None
+        
         return user
     except Exception:
         return None
 
 
-def get_current_active_superuser(
+async def _load_principal(db: AsyncSession, token_data: TokenData) -> Optional[Principal]:
+    """
+    Build the Principal for a verified token.
+    
+    Tokens carrying a token_version are checked against the current version
+    (normally a cache hit). Stateless tokens (JWT_STATELESS_CLAIMS) are then
+    trusted for is_active/is_superuser, so no query runs; otherwise the flags
+    come from the cross-request user status cache, and on a miss only those
+    two columns are selected.
+    
+    Returns:
+        Principal, or None if the user does not exist or the token was revoked
+    """
+    if token_data.token_version is not None:
+        current_version = await token_versions.current(db, token_data.user_id)
+        if current_version is None or current_version != token_data.token_version:
+            return None
+        if (settings.JWT_STATELESS_CLAIMS
+                and token_data.is_active is not None and token_data.is_superuser is not None):
+            return Principal(
+                id=token_data.user_id,
+                email=token_data.email,
+                is_active=token_data.is_active,
+                is_superuser=token_data.is_superuser
+            )
+    
+    cached = user_status_cache.get(token_data.user_id)
+    if cached is None:
+        row = (await db.execute(
+            select(User.is_active, User.is_superuser).where(User.id == token_data.user_id)
+        )).first()
+        if row is None:
+            return None
+        cached = (row.is_active, row.is_superuser)
+        user_status_cache.set(token_data.user_id, cached)
+    
+    is_active, is_superuser = cached
+    return Principal(
+        id=token_data.user_id,
+        email=token_data.email,
+        is_active=is_active,
+        is_superuser=is_superuser
+    )
+
+
+async def get_current_principal(
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
+    db: AsyncSession = Depends(get_db)
+) -> Principal:
+    """
+    Get the authenticated principal (id and flags) without loading the User row.
+    
+    Use this in routes that only need current_user.id / is_superuser; use
+    get_current_user where the full profile is needed. The principal is kept
+    on request.state for the rest of the request.
+    
+    Args:
+        request: Current request
+        credentials: HTTP Bearer credentials from request header
+        db: Database session
+        
+    Returns:
+        Current Principal
+        
+    Raises:
+        HTTPException: If token is invalid, user not found or disabled
+    """
+    principal = getattr(request.state, "principal", None)
+    if principal is not None:
+        return principal
+    
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    
+    if credentials is None:
+        raise credentials_exception
+    
+    token_data = verify_token(credentials.credentials)
+    if token_data is None:
+        raise credentials_exception
+    
+    principal = await _load_principal(db, token_data)
+    if principal is None:
+        raise credentials_exception
+    
+    if not principal.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="User account is disabled"
+        )
+    
+    request.state.principal = principal
+    return principal
+
+
+async def get_current_principal_optional(
+    request: Request,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
+    db: AsyncSession = Depends(get_db)
+) -> Optional[Principal]:
+    """
+    Get the authenticated principal if any, otherwise return None.
+    
+    Args:
+        request: Current request
+        credentials: Optional HTTP Bearer credentials from request header
+        db: Database session
+        
+    Returns:
+        Current Principal if authenticated and active, None otherwise
+    """
+    if credentials is None:
+        return None
+    
+    try:
+        return await get_current_principal(request, credentials, db)
+    except HTTPException:
+        return None
+
+
+async def get_current_active_superuser(
     current_user: User = Depends(get_current_user)
 ) -> User:
     """
@@ -18,6 +18,8 @@ import unicodedata
 import decimal
 
 from .config import settings
+from ..metrics import SIGNING_DURATION
+from ..tracing import span
 
 
 class BundleSigner:
@@ -99,14 +101,15 @@ class BundleSigner:
         Returns:
             Root hash string (format: 'sha256:<hex>')
         """
-        # Remove signatures field before canonicalization (signatures are applied to hash, not included)
-        canonical_target = {k: v for k, v in bundle_data.items() if k != 'signature' and k != 'is_signed' and k != 'signed_at' and k != 'signed_by'}
-        
-        # Canonicalize according to RFC 8785
-        canonical_json = BundleSigner.canonicalize_json(canonical_target)
-        
-        # Calculate SHA-256 hash
-        hash_hex = hashlib.sha256(canonical_json.encode('utf-8')).hexdigest()
+        with SIGNING_DURATION.time("root_hash"), span("signing.root_hash"):
+            # Remove signatures field before canonicalization (signatures are applied to hash, not included)
+            canonical_target = {k: v for k, v in bundle_data.items() if k != 'signature' and k != 'is_signed' and k != 'signed_at' and k != 'signed_by'}
+            
+            # Canonicalize according to RFC 8785
+            canonical_json = BundleSigner.canonicalize_json(canonical_target)
+            
+            # Calculate SHA-256 hash
+            hash_hex = hashlib.sha256(canonical_json.encode('utf-8')).hexdigest()
         
         # Return with 'sha256:' prefix (per V4.1 spec)
         return f'sha256:{hash_hex}'
@@ -188,14 +191,15 @@ class BundleSigner:
         }
         
         # Canonicalize signature payload according to RFC 8785
-        canonical_payload = BundleSigner.canonicalize_json(signature_payload)
-        
-        # Calculate signature over canonicalized payload
-        signature = hmac.new(
-            signing_key.encode('utf-8'),
-            canonical_payload.encode('utf-8'),
-            hashlib.sha256
-        ).hexdigest()
+        with SIGNING_DURATION.time("sign"), span("signing.sign"):
+            canonical_payload = BundleSigner.canonicalize_json(signature_payload)
+            
+            # Calculate signature over canonicalized payload
+            signature = hmac.new(
+                signing_key.encode('utf-8'),
+                canonical_payload.encode('utf-8'),
+                hashlib.sha256
+            ).hexdigest()
         
         # Create signature metadata (V4.1 Architecture)
         signature_data = {
@@ -252,12 +256,13 @@ class BundleSigner:
         
         # Canonicalize signature payload according to RFC 8785
         signing_key = BundleSigner.get_signing_key()
-        canonical_payload = BundleSigner.canonicalize_json(signature_payload)
-        expected_signature = hmac.new(
-            signing_key.encode('utf-8'),
-            canonical_payload.encode('utf-8'),
-            hashlib.sha256
-        ).hexdigest()
+        with SIGNING_DURATION.time("verify"), span("signing.verify"):
+            canonical_payload = BundleSigner.canonicalize_json(signature_payload)
+            expected_signature = hmac.new(
+                signing_key.encode('utf-8'),
+                canonical_payload.encode('utf-8'),
+                hashlib.sha256
+            ).hexdigest()
         
         # Compare signatures (constant-time comparison to prevent timing attacks)
         return hmac.compare_digest(original_signature, expected_signature)
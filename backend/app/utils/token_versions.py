@@ -0,0 +1,150 @@
+# backend/app/utils/token_versions.py
+# Access token revocation: current token_version per user
+#
+# Stateless access tokens (JWT_STATELESS_CLAIMS) carry the user's token_version.
+# A token is valid while its version equals the current one; bumping the version
+# (password change, deactivation) revokes every token issued before.
+#
+# Lookups: Redis (JWT_REVOCATION_BACKEND=redis, shared by all workers, so a bump
+# is visible immediately) or a per-worker memory cache (other workers see a bump
+# within AUTH_CACHE_TTL_SECONDS). The users table is only read on a miss.
+# Without an explicit backend, Redis is used as soon as WEB_CONCURRENCY > 1, and
+# the memory backend is refused in production with several workers.
+
+import logging
+from typing import Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .cache import TTLCache
+from .config import settings
+from ..db_pool import env_int
+from ..models import User
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "auth:token_version:"
+
+
+def resolve_backend(backend: str, workers: int, environment: str) -> str:
+    """
+    Pick the revocation backend for this deployment.
+
+    Args:
+        backend: JWT_REVOCATION_BACKEND ("memory", "redis" or empty for automatic)
+        workers: Worker processes per instance (WEB_CONCURRENCY)
+        environment: ENVIRONMENT setting
+
+    Returns:
+        "memory" or "redis"
+
+    Raises:
+        RuntimeError: If the memory backend is requested in production with several
+            workers (a bump would not reach the other workers immediately)
+    """
+    backend = (backend or "").strip().lower()
+    if not backend:
+        return "redis" if workers > 1 else "memory"
+    if backend == "memory" and workers > 1 and environment == "production":
+        raise RuntimeError(
+            f"JWT_REVOCATION_BACKEND=memory is per worker and cannot revoke tokens immediately "
+            f"with WEB_CONCURRENCY={workers}; use redis"
+        )
+    return backend
+
+
+class TokenVersionStore:
+    """Current token_version per user, cached in memory or Redis"""
+
+    def __init__(self, backend: str, redis_url: str, ttl: float, max_entries: int):
+        if backend not in ("memory", "redis"):
+            raise RuntimeError(f"Unknown JWT_REVOCATION_BACKEND '{backend}'")
+        self.backend = backend
+        self.redis_url = redis_url
+        self.local = TTLCache(ttl, max_entries)
+        self._redis = None
+
+    def redis(self):
+        """Redis client (created on first use, requires the redis package)"""
+        if self._redis is None:
+            try:
+                import redis.asyncio as redis_asyncio
+            except ImportError as e:
+                raise RuntimeError("JWT_REVOCATION_BACKEND=redis requires redis (pip install redis)") from e
+            self._redis = redis_asyncio.from_url(self.redis_url)
+        return self._redis
+
+    @staticmethod
+    def _redis_ttl() -> int:
+        # Tokens older than the access token lifetime are expired anyway
+        return settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60 + 60
+
+    async def _cached(self, user_id: int) -> Optional[int]:
+        if self.backend == "memory":
+            return self.local.get(user_id)
+        try:
+            value = await self.redis().get(f"{REDIS_KEY_PREFIX}{user_id}")
+        except Exception as e:
+            logger.warning("Token version lookup in Redis failed, reading the database: %s", e)
+            return None
+        return int(value) if value is not None else None
+
+    async def remember(self, user_id: int, version: int) -> None:
+        """Record the current version of a user"""
+        if self.backend == "memory":
+            self.local.set(user_id, version)
+            return
+        try:
+            await self.redis().set(f"{REDIS_KEY_PREFIX}{user_id}", version, ex=self._redis_ttl())
+        except Exception as e:
+            logger.warning("Token version write to Redis failed: %s", e)
+
+    async def current(self, db: AsyncSession, user_id: int) -> Optional[int]:
+        """
+        Current token_version of a user.
+
+        Args:
+            db: Database session (only used on a cache miss)
+            user_id: User ID
+
+        Returns:
+            Current version, or None if the user does not exist
+        """
+        version = await self._cached(user_id)
+        if version is not None:
+            return version
+
+        version = await db.scalar(select(User.token_version).where(User.id == user_id))
+        if version is not None:
+            await self.remember(user_id, version)
+        return version
+
+    async def bump(self, db: AsyncSession, user_id: int) -> int:
+        """
+        Increment a user's token_version and commit, revoking the tokens issued before.
+
+        Args:
+            db: Database session (pending changes are committed with the bump)
+            user_id: User ID
+
+        Returns:
+            New version
+        """
+        version = await db.scalar(
+            update(User)
+            .where(User.id == user_id)
+            .values(token_version=User.token_version + 1)
+            .returning(User.token_version)
+        )
+        await db.commit()
+        await self.remember(user_id, version)
+        return version
+
+
+token_versions = TokenVersionStore(
+    resolve_backend(settings.JWT_REVOCATION_BACKEND, env_int("WEB_CONCURRENCY", 1), settings.ENVIRONMENT),
+    settings.REDIS_URL,
+    settings.AUTH_CACHE_TTL_SECONDS,
+    settings.AUTH_CACHE_MAX_ENTRIES
+)
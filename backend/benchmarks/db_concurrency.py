@@ -0,0 +1,98 @@
+# backend/benchmarks/db_concurrency.py
+# Benchmark: sync engine + thread pool vs async engine under concurrent load
+#
+# Simulates the request pattern of the API (a few short queries per request)
+# against the configured DATABASE_URL and reports throughput and latency for:
+#   - sync:  SessionLocal sessions run in a thread pool (the old FastAPI model)
+#   - async: AsyncSessionLocal sessions on the event loop
+#
+# Usage (from backend/):
+#   python -m benchmarks.db_concurrency --requests 2000 --concurrency 50
+
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import select, func, text
+
+from app.database import engine, async_engine, SessionLocal, AsyncSessionLocal
+from app.models import User, Project
+
+
+def _sync_request() -> float:
+    """One simulated request on the sync engine; returns latency in seconds"""
+    start = time.perf_counter()
+    with SessionLocal() as db:
+        db.execute(text("SELECT pg_sleep(0.002)"))  # Simulated I/O wait in the query
+        db.scalar(select(func.count(User.id)))
+        db.scalar(select(func.count(Project.id)))
+    return time.perf_counter() - start
+
+
+async def _async_request() -> float:
+    """One simulated request on the async engine; returns latency in seconds"""
+    start = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        await db.execute(text("SELECT pg_sleep(0.002)"))
+        await db.scalar(select(func.count(User.id)))
+        await db.scalar(select(func.count(Project.id)))
+    return time.perf_counter() - start
+
+
+def run_sync(requests: int, concurrency: int) -> dict:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(lambda _: _sync_request(), range(requests)))
+    return _summary("sync", latencies, time.perf_counter() - start)
+
+
+async def run_async(requests: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited() -> float:
+        async with semaphore:
+            return await _async_request()
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(limited() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    await async_engine.dispose()
+    return _summary("async", list(latencies), elapsed)
+
+
+def _summary(name: str, latencies: list, elapsed: float) -> dict:
+    latencies.sort()
+    return {
+        "mode": name,
+        "requests": len(latencies),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare sync vs async DB throughput")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    results = [
+        run_sync(args.requests, args.concurrency),
+        asyncio.run(run_async(args.requests, args.concurrency)),
+    ]
+    engine.dispose()
+
+    for result in results:
+        print(
+            f"{result['mode']:>5}: {result['throughput_rps']:>8} req/s  "
+            f"p50={result['p50_ms']}ms p95={result['p95_ms']}ms p99={result['p99_ms']}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# backend/benchmarks/fixtures.py
+# Deterministic synthetic calculation bundles shaped like the engines' output
+#
+# Steps follow packages/calculation-engine CalculationStep (operationId, inputs,
+# outputs, justification, ruleCitations, tableReferences, ...); inputs/results
+# follow CecInputs / CecResults. Same seed -> same bundles.
+
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+CEC_OPERATIONS = [
+    ("living_area", "Living area", "CEC 8-110"),
+    ("basic_load", "Basic load (first 90 m2)", "CEC 8-200(1)(a)(i)"),
+    ("additional_area", "Additional living area", "CEC 8-200(1)(a)(ii)"),
+    ("space_heating", "Space heating demand", "CEC 62-118"),
+    ("air_conditioning", "Air conditioning", "CEC 8-200(1)(a)(iv)"),
+    ("range", "Electric range", "CEC 8-200(1)(a)(iv)"),
+    ("water_heater", "Water heater", "CEC 8-200(1)(a)(v)"),
+    ("evse", "Electric vehicle supply equipment", "CEC 8-200(1)(a)(vi)"),
+    ("other_loads", "Other loads > 1500 W", "CEC 8-200(1)(a)(vii)"),
+    ("item_b", "Minimum load (item b)", "CEC 8-200(1)(b)"),
+    ("service_current", "Service current", "CEC 8-200"),
+    ("conductor_size", "Conductor size", "CEC Table 2"),
+    ("panel_rating", "Panel rating", "CEC 8-104"),
+]
+
+NEC_OPERATIONS = [
+    ("general_lighting", "General lighting load", "NEC 220.12"),
+    ("small_appliance", "Small-appliance circuits", "NEC 220.52(A)"),
+    ("laundry", "Laundry circuit", "NEC 220.52(B)"),
+    ("lighting_demand", "Lighting demand factors", "NEC Table 220.42"),
+    ("fixed_appliances", "Fixed appliances", "NEC 220.53"),
+    ("dryer", "Clothes dryer", "NEC 220.54"),
+    ("cooking", "Cooking equipment", "NEC Table 220.55"),
+    ("hvac", "Heating / air conditioning", "NEC 220.60"),
+    ("neutral", "Feeder neutral load", "NEC 220.61"),
+    ("service_size", "Service size", "NEC 230.42"),
+]
+
+APPLIANCE_TYPES = ["range", "space_heating", "air_conditioning", "tankless_water_heater",
+                   "pool_spa", "evse", "water_heater", "other"]
+
+
+def make_inputs(rng: random.Random, code_type: str = "cec") -> Dict[str, Any]:
+    appliances = [
+        {
+            "id": f"a{i}",
+            "name": f"{kind.replace('_', ' ').title()} {i}",
+            "watts": rng.choice([1200, 1500, 3000, 4500, 5000, 7200, 9600]),
+            "type": kind,
+        }
+        for i, kind in enumerate(rng.choices(APPLIANCE_TYPES, k=rng.randint(2, 8)))
+    ]
+    return {
+        "codeType": code_type,
+        "codeEdition": "2023" if code_type == "nec" else "2024",
+        "livingArea_m2": rng.randint(60, 450),
+        "systemVoltage": 240,
+        "phase": 1,
+        "appliances": appliances,
+        "continuousLoads": [],
+        "heatingLoadW": rng.choice([0, 5000, 10000, 15000]),
+        "coolingLoadW": rng.choice([0, 3500, 5000]),
+        "isHeatingAcInterlocked": rng.random() < 0.5,
+        "hasElectricRange": True,
+        "electricRangeRatingKW": rng.choice([8, 12, 14]),
+        "hasEVSE": rng.random() < 0.3,
+        "evseRatingW": 7200,
+        "waterHeaterType": rng.choice(["none", "storage", "tankless"]),
+        "conductorMaterial": rng.choice(["Cu", "Al"]),
+        "terminationTempC": 75,
+        "ambientTempC": 30,
+    }
+
+
+def make_results(rng: random.Random) -> Dict[str, Any]:
+    load_w = rng.randint(12000, 48000)
+    current = load_w / 240
+    return {
+        "computedLivingArea_m2": f"{rng.randint(60, 450)}.00",
+        "basicVA": "5000.00",
+        "appliancesSumVA": f"{rng.randint(3000, 30000)}.00",
+        "continuousAdjustedVA": "0.00",
+        "itemA_total_W": f"{load_w}.00",
+        "itemB_value_W": "24000.00",
+        "chosenCalculatedLoad_W": f"{max(load_w, 24000)}.00",
+        "serviceCurrentA": f"{current:.2f}",
+        "conductorSize": rng.choice(["3 AWG", "2 AWG", "1/0 AWG", "3/0 AWG"]),
+        "conductorAmpacity": rng.choice(["100", "125", "150", "200"]),
+        "panelRatingA": rng.choice(["100", "125", "200"]),
+        "breakerSizeA": rng.choice(["100", "125", "200"]),
+        "demandVA": f"{load_w}.00",
+        "demand_kVA": f"{load_w / 1000:.2f}",
+        "sizingCurrentA": f"{current:.2f}",
+    }
+
+
+def make_steps(rng: random.Random, count: int, code_type: str = "cec") -> List[Dict[str, Any]]:
+    operations = NEC_OPERATIONS if code_type == "nec" else CEC_OPERATIONS
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    steps = []
+    for index in range(count):
+        operation_id, name, citation = operations[index % len(operations)]
+        value = rng.randint(100, 20000)
+        steps.append({
+            "stepIndex": index,
+            "operationId": operation_id,
+            "displayName": name,
+            "formulaRef": f"{operation_id}_v1",
+            "ruleCitations": [citation],
+            "inputs": {"value_W": value, "factor": rng.choice([0.25, 0.4, 0.75, 1.0])},
+            "outputs": {"result_W": f"{value * 0.75:.2f}"},
+            "intermediateValues": {"subtotal_W": f"{value:.2f}"},
+            "tableReferences": [{"tableId": "Table 2", "version": "2024", "rowIndex": rng.randint(0, 40),
+                                 "columnUsed": "75C"}] if operation_id == "conductor_size" else [],
+            "justification": f"{name}: {citation} applied to {value} W",
+            "timestamp": (base + timedelta(milliseconds=index)).isoformat(),
+        })
+    return steps
+
+
+def make_bundle(rng: random.Random, steps: int = 13, code_type: str = "cec") -> Dict[str, Any]:
+    """Engine bundle (UnsignedBundle shape) with the given number of steps"""
+    return {
+        "id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+        "inputs": make_inputs(rng, code_type),
+        "results": make_results(rng),
+        "steps": make_steps(rng, steps, code_type),
+        "warnings": ["Demand factor applied to EVSE load"] if rng.random() < 0.2 else [],
+        "engine": {"name": "tradespro-calculation-engine", "version": "1.0.0", "commit": "benchmark"},
+    }
@@ -0,0 +1,109 @@
+# backend/benchmarks/login_storm.py
+# Benchmark: bcrypt on the event loop vs the password hashing pool during a login storm
+#
+# Runs a burst of password verifications (the CPU part of POST /auth/login) on one
+# event loop while a probe coroutine plays an unrelated cheap endpoint, and reports
+# login throughput plus the probe's latency (how long other requests are stalled):
+#   - inline: pwd_context.verify called directly in the coroutine (the old behaviour)
+#   - pool:   verify_password_async on the bounded password hashing pool
+#
+# Usage (from backend/):
+#   python -m benchmarks.login_storm --logins 200 --concurrency 50 --rounds 12
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+from app.utils import security
+from app.utils.password_hasher import PasswordHashPool
+
+PROBE_INTERVAL = 0.005  # Seconds between probe "requests"
+
+
+async def _probe(stop: asyncio.Event, latencies: list) -> None:
+    """Unrelated endpoint: should answer in ~PROBE_INTERVAL unless the loop is blocked"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        latencies.append(time.perf_counter() - start - PROBE_INTERVAL)
+
+
+async def run(mode: str, logins: int, concurrency: int, stored_hash: str) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    login_latencies, probe_latencies = [], []
+    rejected = 0
+
+    async def login() -> None:
+        nonlocal rejected
+        async with semaphore:
+            start = time.perf_counter()
+            if mode == "inline":
+                security.pwd_context.verify("correct horse battery staple", stored_hash)
+            else:
+                try:
+                    await security.verify_password_async("correct horse battery staple", stored_hash)
+                except HTTPException:
+                    rejected += 1
+                    return
+            login_latencies.append(time.perf_counter() - start)
+
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe(stop, probe_latencies))
+    start = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe
+
+    login_latencies.sort()
+    probe_latencies.sort()
+    return {
+        "mode": mode,
+        "logins": len(login_latencies),
+        "rejected": rejected,
+        "logins_per_s": round(len(login_latencies) / elapsed, 1),
+        "login_p50_ms": round(statistics.median(login_latencies) * 1000, 1) if login_latencies else None,
+        "probe_samples": len(probe_latencies),
+        "probe_p50_ms": round(statistics.median(probe_latencies) * 1000, 2) if probe_latencies else None,
+        "probe_p99_ms": round(probe_latencies[int(len(probe_latencies) * 0.99) - 1] * 1000, 2) if probe_latencies else None,
+        "probe_max_ms": round(probe_latencies[-1] * 1000, 2) if probe_latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Login storm: inline bcrypt vs password hashing pool")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost")
+    parser.add_argument("--workers", type=int, default=None, help="Pool threads (default PASSWORD_HASH_WORKERS)")
+    parser.add_argument("--max-pending", type=int, default=None, help="Pool queue limit (default: no rejections)")
+    args = parser.parse_args()
+
+    security.pwd_context = CryptContext(schemes=["bcrypt"], bcrypt__default_rounds=args.rounds)
+    security.password_hash_pool = PasswordHashPool(
+        args.workers or security.settings.PASSWORD_HASH_WORKERS,
+        args.max_pending or args.logins
+    )
+    stored_hash = security.pwd_context.hash("correct horse battery staple")
+
+    results = [
+        asyncio.run(run(mode, args.logins, args.concurrency, stored_hash))
+        for mode in ("inline", "pool")
+    ]
+    security.password_hash_pool.shutdown()
+
+    for result in results:
+        print(
+            f"{result['mode']:>6}: {result['logins_per_s']:>7} logins/s  "
+            f"login p50={result['login_p50_ms']}ms  rejected={result['rejected']}  "
+            f"probe p50={result['probe_p50_ms']}ms p99={result['probe_p99_ms']}ms "
+            f"max={result['probe_max_ms']}ms (n={result['probe_samples']})"
+        )
+
+
+if __name__ == "__main__":
+    main()
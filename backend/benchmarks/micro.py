@@ -0,0 +1,129 @@
+# backend/benchmarks/micro.py
+# Micro-benchmarks: bundle canonicalization/hashing, to_dict and response serialization
+#
+# Cases run on deterministic bundles (benchmarks/fixtures.py) of increasing size:
+#   - BundleSigner.canonicalize_json / calculate_root_hash
+#   - Calculation.to_dict(include_bundle=True)
+#   - CalculationResponse validation of the to_dict output (what FastAPI does
+#     for response_model)
+#   - json_response (app/utils/responses.py), what the calculation routes send
+# Before timing, json_response output is checked against Pydantic's for every
+# fixture (exit status 2 on a mismatch), so a schema change that the shaping
+# misses fails here rather than in production.
+# No database is needed.
+#
+# Usage (from backend/):
+#   python -m benchmarks.micro                                  # compare to baselines/micro.json
+#   python -m benchmarks.micro --output benchmarks/results/micro.json
+#   python -m benchmarks.micro --save-baseline                  # refresh the stored baseline
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import timeit
+from datetime import datetime, timezone
+
+from app.models import Calculation
+from app.schemas import CalculationResponse
+from app.utils.responses import json_response
+from app.utils.signing import BundleSigner
+
+from .fixtures import make_bundle
+from .results import BASELINE_DIR, check_baseline, write_results
+
+STEP_COUNTS = (13, 100, 1000)  # Typical engine bundle, long audit trail, stress
+
+
+def _calculation(bundle: dict) -> Calculation:
+    return Calculation(
+        id=bundle["id"],
+        project_id=1,
+        building_type="single-dwelling",
+        calculation_type="cec_load",
+        code_edition="2024",
+        code_type="cec",
+        inputs=bundle["inputs"],
+        results=bundle["results"],
+        steps=bundle["steps"],
+        warnings=bundle["warnings"],
+        engine_version="1.0.0",
+        engine_commit="benchmark",
+        bundle_hash=BundleSigner.calculate_root_hash(bundle),
+        is_signed=False,
+        created_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        calculation_time_ms=42,
+    )
+
+
+def cases():
+    """(name, callable) pairs, built once so setup is not measured"""
+    rng = random.Random(42)
+    for steps in STEP_COUNTS:
+        bundle = make_bundle(rng, steps=steps)
+        calculation = _calculation(bundle)
+        as_dict = calculation.to_dict(include_bundle=True)
+        yield f"canonicalize_json[steps={steps}]", lambda b=bundle: BundleSigner.canonicalize_json(b)
+        yield f"calculate_root_hash[steps={steps}]", lambda b=bundle: BundleSigner.calculate_root_hash(b)
+        yield f"calculation_to_dict[steps={steps}]", lambda c=calculation: c.to_dict(include_bundle=True)
+        yield f"response_validation[steps={steps}]", lambda d=as_dict: CalculationResponse.model_validate(d)
+        yield f"response_json[steps={steps}]", lambda d=as_dict: json_response(CalculationResponse, d)
+
+
+def check_conformance() -> list:
+    """Fixture bundles whose json_response body differs from Pydantic's serialization"""
+    rng = random.Random(42)
+    mismatches = []
+    for steps in STEP_COUNTS:
+        as_dict = _calculation(make_bundle(rng, steps=steps)).to_dict(include_bundle=True)
+        expected = CalculationResponse.model_validate(as_dict).model_dump(mode="json")
+        if json.loads(json_response(CalculationResponse, as_dict).body) != expected:
+            mismatches.append(f"steps={steps}")
+    return mismatches
+
+
+def measure(func, repeat: int) -> dict:
+    """Per-call time: timeit autorange for the loop count, best and median of `repeat` runs"""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    runs = [elapsed / number for elapsed in timer.repeat(repeat=repeat, number=number)]
+    best = min(runs)
+    return {
+        "us_per_op": round(best * 1e6, 2),
+        "us_per_op_median": round(statistics.median(runs) * 1e6, 2),
+        "ops_per_s": round(1 / best, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backend micro-benchmarks")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--filter", default="", help="Only run cases containing this text")
+    parser.add_argument("--output", default=None, help="Result JSON path (default: stdout)")
+    parser.add_argument("--baseline", default=str(BASELINE_DIR / "micro.json"))
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown")
+    parser.add_argument("--save-baseline", action="store_true", help="Write results as the new baseline")
+    args = parser.parse_args()
+
+    mismatches = check_conformance()
+    if mismatches:
+        print(f"json_response does not match CalculationResponse for: {', '.join(mismatches)}", file=sys.stderr)
+        sys.exit(2)
+
+    results = {}
+    for name, func in cases():
+        if args.filter in name:
+            results[name] = measure(func, args.repeat)
+            print(f"{name:<40} {results[name]['us_per_op']:>12} us/op", file=sys.stderr)
+
+    if args.save_baseline:
+        write_results(args.baseline, "micro", results)
+        print(f"Baseline written to {args.baseline}", file=sys.stderr)
+        return
+    document = write_results(args.output, "micro", results)
+    sys.exit(check_baseline(document, args.baseline, lower_is_better=["us_per_op"], tolerance=args.tolerance))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# backend/benchmarks/results.py
+# JSON results and baseline comparison shared by the benchmark suites
+#
+# Result file: {"suite", "environment", "cases": {case: {metric: value}}}
+# A case regresses when a compared metric is worse than the baseline by more
+# than the tolerance (relative).
+
+import json
+import platform
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+
+
+def environment() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def write_results(path: Optional[str], suite: str, cases: Dict[str, Dict[str, float]]) -> Dict:
+    """Build the result document and write it to path ('-' or None: stdout)"""
+    document = {"suite": suite, "environment": environment(), "cases": cases}
+    text = json.dumps(document, indent=2, sort_keys=True)
+    if path and path != "-":
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    return document
+
+
+def compare(
+    current: Dict,
+    baseline: Dict,
+    lower_is_better: List[str],
+    higher_is_better: List[str] = (),
+    tolerance: float = 0.25
+) -> List[str]:
+    """
+    Compare two result documents.
+
+    Returns:
+        Regression messages (empty when nothing regressed). Cases or metrics
+        missing from either side are skipped.
+    """
+    regressions = []
+    for case, metrics in sorted(current["cases"].items()):
+        base = baseline["cases"].get(case)
+        if not base:
+            continue
+        for metric in lower_is_better:
+            if metric in metrics and base.get(metric):
+                change = metrics[metric] / base[metric] - 1
+                if change > tolerance:
+                    regressions.append(f"{case}: {metric} {base[metric]} -> {metrics[metric]} (+{change:.0%})")
+        for metric in higher_is_better:
+            if metric in metrics and base.get(metric):
+                change = 1 - metrics[metric] / base[metric]
+                if change > tolerance:
+                    regressions.append(f"{case}: {metric} {base[metric]} -> {metrics[metric]} (-{change:.0%})")
+    return regressions
+
+
+def check_baseline(
+    document: Dict,
+    baseline_path: Optional[str],
+    lower_is_better: List[str],
+    higher_is_better: List[str] = (),
+    tolerance: float = 0.25
+) -> int:
+    """
+    Print the comparison against a baseline file.
+
+    Returns:
+        Process exit code: 1 if anything regressed, 0 otherwise (or without baseline)
+    """
+    if not baseline_path:
+        return 0
+    path = Path(baseline_path)
+    if not path.exists():
+        print(f"Baseline {path} not found, skipping comparison", file=sys.stderr)
+        return 0
+    baseline = json.loads(path.read_text(encoding="utf-8"))
+    regressions = compare(document, baseline, lower_is_better, higher_is_better, tolerance)
+    if regressions:
+        print(f"{len(regressions)} regression(s) vs {path} (tolerance {tolerance:.0%}):", file=sys.stderr)
+        for message in regressions:
+            print(f"  {message}", file=sys.stderr)
+        return 1
+    print(f"No regressions vs {path} (tolerance {tolerance:.0%})", file=sys.stderr)
+    return 0
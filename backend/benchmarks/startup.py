@@ -0,0 +1,146 @@
+# backend/benchmarks/startup.py
+# Cold start: import time of app.main, time to the first served request, import profile
+#
+# Each run is a fresh interpreter (python -X importtime for the profile, plain
+# runs for the timings), so nothing is warm in sys.modules. The first request is
+# GET /health through the ASGI lifespan with DB_STARTUP_SCHEMA=skip, so no
+# database is needed and the numbers do not include network round trips.
+#
+# Cases:
+#   import_app_main, first_request   ms (median of --runs), checked against --budget-ms
+#   import[<module>]                 cumulative import ms of modules above --min-module-ms
+# The two timings are compared to baselines/startup.json like the other suites
+# (exit status 1 on a regression or over budget). Per-module changes and modules
+# new compared to the baseline are only listed: single -X importtime runs are
+# noisy, but a new heavy import is the usual cause of a startup regression.
+#
+# Usage (from backend/):
+#   python -m benchmarks.startup
+#   python -m benchmarks.startup --save-baseline
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from .results import BASELINE_DIR, check_baseline, compare, write_results
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Cold start budget for import + lifespan + first request (single shared-CPU core)
+STARTUP_BUDGET_MS = 2000.0
+
+PROBE = """
+import asyncio, json, time
+import httpx
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+
+async def first_request():
+    async with app.main.app.router.lifespan_context(app.main.app):
+        transport = httpx.ASGITransport(app=app.main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://startup") as client:
+            (await client.get("/health")).raise_for_status()
+
+asyncio.run(first_request())
+print(json.dumps({
+    "import_app_main": (imported - started) * 1000,
+    "first_request": (time.perf_counter() - started) * 1000,
+}))
+"""
+
+
+def _environment() -> Dict[str, str]:
+    return {**os.environ, "DB_STARTUP_SCHEMA": "skip"}
+
+
+def probe() -> Dict[str, float]:
+    """One cold start in a fresh interpreter"""
+    completed = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=BACKEND_DIR, env=_environment(),
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def import_profile(module: str = "app.main") -> List[Tuple[str, int, float, float]]:
+    """
+    Parse `python -X importtime -c 'import <module>'`.
+
+    Returns:
+        (module, depth, self ms, cumulative ms) in import order
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=BACKEND_DIR,
+        env=_environment(), capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), depth, int(self_us) / 1000, int(cumulative_us) / 1000))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start and import-time profile")
+    parser.add_argument("--runs", type=int, default=5, help="Cold starts to time")
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS, help="Max median first_request")
+    parser.add_argument("--min-module-ms", type=float, default=20.0, help="Report modules at least this slow")
+    parser.add_argument("--top", type=int, default=15, help="Modules printed by self time")
+    parser.add_argument("--output", default=None, help="Result JSON path (default: stdout)")
+    parser.add_argument("--baseline", default=str(BASELINE_DIR / "startup.json"))
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown")
+    parser.add_argument("--save-baseline", action="store_true", help="Write results as the new baseline")
+    args = parser.parse_args()
+
+    runs = [probe() for _ in range(args.runs)]
+    results = {}
+    for case in ("import_app_main", "first_request"):
+        samples = [run[case] for run in runs]
+        results[case] = {"ms": round(statistics.median(samples), 1), "ms_min": round(min(samples), 1)}
+        print(f"{case:<40} {results[case]['ms']:>10} ms (min {results[case]['ms_min']})", file=sys.stderr)
+
+    profile = import_profile()
+    for name, _, _, cumulative in profile:
+        if cumulative >= args.min_module_ms:
+            results[f"import[{name}]"] = {"cumulative_ms": round(cumulative, 1)}
+    print("Slowest modules by self time:", file=sys.stderr)
+    for name, _, self_ms, cumulative in sorted(profile, key=lambda row: -row[2])[:args.top]:
+        print(f"  {self_ms:>8.1f} ms self {cumulative:>8.1f} ms cumulative  {name}", file=sys.stderr)
+
+    if args.save_baseline:
+        write_results(args.baseline, "startup", results)
+        print(f"Baseline written to {args.baseline}", file=sys.stderr)
+        return
+    document = write_results(args.output, "startup", results)
+
+    status = check_baseline(document, args.baseline, lower_is_better=["ms"], tolerance=args.tolerance)
+    baseline_path = Path(args.baseline)
+    if baseline_path.exists():
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+        for message in compare(document, baseline, ["cumulative_ms"], tolerance=args.tolerance):
+            print(f"  import time: {message}", file=sys.stderr)
+        for case in sorted(set(results) - set(baseline["cases"])):
+            if case.startswith("import["):
+                print(f"  new import above {args.min_module_ms} ms: {case} {results[case]['cumulative_ms']} ms",
+                      file=sys.stderr)
+
+    first_request = results["first_request"]["ms"]
+    if first_request > args.budget_ms:
+        print(f"Startup budget exceeded: first_request {first_request} ms > {args.budget_ms} ms", file=sys.stderr)
+        status = 1
+    else:
+        print(f"Within startup budget: first_request {first_request} ms <= {args.budget_ms} ms", file=sys.stderr)
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+#!/bin/sh
+# backend/docker-entrypoint.sh
+# 容器入口：启动前执行数据库迁移，然后运行 CMD（uvicorn）
+#
+# 应用启动时只校验 Alembic 版本（DB_STARTUP_SCHEMA=verify），未迁移的数据库会拒绝启动，
+# 所以这里先运行 `python manage_db.py migrate`。迁移是幂等的，并由 advisory lock 串行化，
+# 多个容器同时启动也安全。已有独立发布步骤的平台（fly.toml 的 release_command）
+# 设置 RUN_MIGRATIONS=false 跳过。
+
+set -e
+
+if [ "${RUN_MIGRATIONS:-true}" = "true" ]; then
+    echo "Running database migrations..."
+    python manage_db.py migrate
+fi
+
+exec "$@"
@@ -0,0 +1,49 @@
+# backend/manage_db.py
+# Database schema CLI (Alembic): one-shot migrations instead of DDL at app startup
+#
+# Usage (from backend/):
+#   python manage_db.py migrate [--revision head]   # fly.toml release_command, docker-entrypoint.sh, render.yaml
+#   python manage_db.py status                      # current vs expected revision, exit 1 if behind
+
+import argparse
+import asyncio
+import sys
+
+from app.database import SCHEMA_REVISION, async_engine, current_schema_revision, run_migrations
+
+
+async def status() -> int:
+    try:
+        revision = await current_schema_revision()
+    finally:
+        await async_engine.dispose()
+    print(f"Database revision: {revision or 'none'}, expected: {SCHEMA_REVISION}")
+    return 0 if revision == SCHEMA_REVISION else 1
+
+
+def check_head() -> None:
+    """SCHEMA_REVISION must name the Alembic head, or startup checks would never pass"""
+    from alembic.script import ScriptDirectory
+    from app.database import alembic_config
+
+    heads = ScriptDirectory.from_config(alembic_config()).get_heads()
+    if heads != [SCHEMA_REVISION]:
+        sys.exit(f"SCHEMA_REVISION is {SCHEMA_REVISION} but the Alembic head(s) are {heads}: update app/database.py")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Database schema migrations")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrate = commands.add_parser("migrate", help="Upgrade the schema (serialized by an advisory lock)")
+    migrate.add_argument("--revision", default="head")
+
+    commands.add_parser("status", help="Show the current and expected revisions")
+
+    args = parser.parse_args()
+    check_head()
+    if args.command == "migrate":
+        run_migrations(args.revision, configure_logging=True)
+        print(f"Database migrated to {args.revision}")
+    else:
+        sys.exit(asyncio.run(status()))
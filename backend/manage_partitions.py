@@ -0,0 +1,54 @@
+# backend/manage_partitions.py
+# Calculations partition maintenance CLI
+#
+# Usage (from backend/):
+#   python manage_partitions.py list
+#   python manage_partitions.py ensure [--months-ahead 3]
+#   python manage_partitions.py detach 2023-01 [--archive-schema archive] [--tablespace cold] [--drop]
+
+import argparse
+import asyncio
+
+from app.database import async_engine
+from app.services.partition_service import PartitionService
+
+
+async def main(args) -> None:
+    try:
+        if args.command == "list":
+            for partition in await PartitionService.list_partitions():
+                print(
+                    f"{partition['name']:<28} {partition['bounds']:<80} "
+                    f"~{partition['estimated_rows']} rows  {partition['total_bytes'] / 1024 / 1024:.1f} MB"
+                )
+        elif args.command == "ensure":
+            created = await PartitionService.ensure_partitions(args.months_ahead)
+            print(f"Created {created} partition(s)")
+        elif args.command == "detach":
+            result = await PartitionService.detach_partition(
+                args.month,
+                archive_schema=args.archive_schema or None,
+                tablespace=args.tablespace,
+                drop=args.drop
+            )
+            print(f"{'Dropped' if args.drop else 'Detached and archived as'} {result}")
+    finally:
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage monthly calculations partitions")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list", help="List attached partitions")
+
+    ensure = commands.add_parser("ensure", help="Create missing current/future partitions")
+    ensure.add_argument("--months-ahead", type=int, default=None)
+
+    detach = commands.add_parser("detach", help="Detach a month and archive or drop it")
+    detach.add_argument("month", help="Month to detach, YYYY-MM")
+    detach.add_argument("--archive-schema", default="archive", help="Schema for archived partitions ('' to keep in place)")
+    detach.add_argument("--tablespace", default=None, help="Move the archived partition to this tablespace")
+    detach.add_argument("--drop", action="store_true", help="Drop the partition instead of archiving it")
+
+    asyncio.run(main(parser.parse_args()))
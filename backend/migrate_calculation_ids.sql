@@ -0,0 +1,75 @@
+-- Migration: Unique calculation ids for the partitioned calculations table
+-- calculations is partitioned by created_at, so its primary key is (id, created_at)
+-- and nothing in the table itself keeps a bundle id unique. calculation_ids
+-- (not partitioned) holds one row per id with the row's created_at:
+-- - inserting a second row with an existing id fails with a unique violation on
+--   calculation_ids_pkey, including concurrent inserts of the same new id
+-- - by-id lookups read created_at here first, so only one partition is scanned
+--   (Calculation.by_id() in app/models/calculation.py)
+-- - calculation_jobs.result_id references it
+-- Rows are maintained by statement-level triggers in the same transaction as the
+-- calculations change. Detaching a partition removes its ids (PartitionService.detach_partition).
+
+CREATE TABLE IF NOT EXISTS calculation_ids (
+    id VARCHAR(36) PRIMARY KEY,
+    created_at TIMESTAMPTZ NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS ix_calculation_ids_created_at ON calculation_ids (created_at);
+
+-- INSERT ... ON CONFLICT DO UPDATE puts only newly inserted rows in the INSERT
+-- transition table, so re-synced bundles do not collide with their own id
+CREATE OR REPLACE FUNCTION calculation_ids_apply() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO calculation_ids (id, created_at)
+        SELECT id, created_at FROM changed_rows;
+    ELSE
+        DELETE FROM calculation_ids c
+        USING changed_rows r
+        WHERE c.id = r.id AND c.created_at = r.created_at;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS calculation_ids_insert ON calculations;
+CREATE TRIGGER calculation_ids_insert AFTER INSERT ON calculations
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION calculation_ids_apply();
+
+DROP TRIGGER IF EXISTS calculation_ids_delete ON calculations;
+CREATE TRIGGER calculation_ids_delete AFTER DELETE ON calculations
+    REFERENCING OLD TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION calculation_ids_apply();
+
+-- Backfill. Ids duplicated while nothing enforced uniqueness keep their oldest row here;
+-- the others are reported and stay reachable only through their (id, created_at)
+DO $$
+DECLARE
+    v_duplicates BIGINT;
+BEGIN
+    INSERT INTO calculation_ids (id, created_at)
+    SELECT DISTINCT ON (id) id, created_at FROM calculations ORDER BY id, created_at
+    ON CONFLICT (id) DO NOTHING;
+
+    SELECT count(*) INTO v_duplicates FROM (
+        SELECT id FROM calculations GROUP BY id HAVING count(*) > 1
+    ) d;
+    IF v_duplicates > 0 THEN
+        RAISE WARNING '% calculation id(s) have more than one row; resolve them manually', v_duplicates;
+    END IF;
+END $$;
+
+-- calculation_jobs.result_id lost its foreign key when calculations was partitioned.
+-- NOT VALID: existing dangling references are kept, new ones are rejected.
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint
+        WHERE conname = 'calculation_jobs_result_id_fkey' AND conrelid = 'calculation_jobs'::regclass
+    ) THEN
+        ALTER TABLE calculation_jobs ADD CONSTRAINT calculation_jobs_result_id_fkey
+            FOREIGN KEY (result_id) REFERENCES calculation_ids (id) ON DELETE SET NULL NOT VALID;
+    END IF;
+END $$;
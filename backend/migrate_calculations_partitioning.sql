@@ -0,0 +1,136 @@
+-- Migration: Monthly range partitioning of calculations by created_at
+-- - Partition management functions (idempotent, safe to re-run at every startup)
+-- - One-time conversion of an existing plain calculations table:
+--     calculations -> calculations_legacy, new partitioned calculations, rows copied.
+--     calculations_legacy is kept until verified, then: DROP TABLE calculations_legacy;
+--   For very large tables run this script in a maintenance window: the copy holds
+--   an ACCESS EXCLUSIVE lock on the old table.
+-- - Current month plus CALCULATIONS_PARTITION_MONTHS_AHEAD months of partitions
+--
+-- Partitions are named calculations_pYYYY_MM, bounds are UTC month starts.
+-- Rows outside every partition land in calculations_default, which
+-- calculations_ensure_partitions() drains when it creates the matching month.
+-- Detach/archive of old months: see manage_partitions.py.
+
+CREATE OR REPLACE FUNCTION calculations_partition_name(p_month TIMESTAMPTZ) RETURNS TEXT AS $$
+    SELECT 'calculations_p' || to_char(p_month AT TIME ZONE 'UTC', 'YYYY_MM');
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Create monthly partitions from the month of p_from up to p_months_ahead months
+-- after the current month. Returns the number of partitions created.
+CREATE OR REPLACE FUNCTION calculations_ensure_partitions(
+    p_from TIMESTAMPTZ,
+    p_months_ahead INTEGER
+) RETURNS INTEGER AS $$
+DECLARE
+    v_month TIMESTAMPTZ := date_trunc('month', p_from AT TIME ZONE 'UTC') AT TIME ZONE 'UTC';
+    v_last TIMESTAMPTZ := (date_trunc('month', now() AT TIME ZONE 'UTC')
+                           + make_interval(months => p_months_ahead)) AT TIME ZONE 'UTC';
+    v_next TIMESTAMPTZ;
+    v_name TEXT;
+    v_created INTEGER := 0;
+BEGIN
+    -- Serialize concurrent callers (every worker runs the maintenance loop)
+    PERFORM pg_advisory_xact_lock(hashtext('calculations_ensure_partitions'));
+
+    IF to_regclass('calculations_default') IS NULL THEN
+        CREATE TABLE calculations_default PARTITION OF calculations DEFAULT;
+    END IF;
+
+    WHILE v_month <= v_last LOOP
+        v_next := ((v_month AT TIME ZONE 'UTC') + INTERVAL '1 month') AT TIME ZONE 'UTC';
+        v_name := calculations_partition_name(v_month);
+
+        IF to_regclass(v_name) IS NULL THEN
+            IF EXISTS (
+                SELECT 1 FROM calculations_default
+                WHERE created_at >= v_month AND created_at < v_next
+            ) THEN
+                -- Rows for this month are in the default partition: move them into a
+                -- standalone table, then attach it (direct partition DML does not fire
+                -- the statement-level stat counter triggers on calculations)
+                EXECUTE format(
+                    'CREATE TABLE %I (LIKE calculations INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+                    v_name
+                );
+                EXECUTE format(
+                    'WITH moved AS (DELETE FROM calculations_default '
+                    'WHERE created_at >= %L AND created_at < %L RETURNING *) '
+                    'INSERT INTO %I SELECT * FROM moved',
+                    v_month, v_next, v_name
+                );
+                EXECUTE format(
+                    'ALTER TABLE calculations ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                    v_name, v_month, v_next
+                );
+            ELSE
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF calculations FOR VALUES FROM (%L) TO (%L)',
+                    v_name, v_month, v_next
+                );
+            END IF;
+            v_created := v_created + 1;
+        END IF;
+
+        v_month := v_next;
+    END LOOP;
+
+    RETURN v_created;
+END;
+$$ LANGUAGE plpgsql;
+
+-- One-time conversion of a plain (non-partitioned) calculations table
+DO $$
+DECLARE
+    v_index RECORD;
+    v_oldest TIMESTAMPTZ;
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = to_regclass('calculations')) IS DISTINCT FROM 'r' THEN
+        RETURN;
+    END IF;
+
+    LOCK TABLE calculations IN ACCESS EXCLUSIVE MODE;
+
+    -- Free the index/constraint names for the new table
+    FOR v_index IN
+        SELECT indexname FROM pg_indexes WHERE schemaname = current_schema() AND tablename = 'calculations'
+    LOOP
+        EXECUTE format('ALTER INDEX %I RENAME TO %I', v_index.indexname, left(v_index.indexname, 56) || '_legacy');
+    END LOOP;
+    ALTER TABLE calculations RENAME TO calculations_legacy;
+
+    -- Stat counters must not follow the old table
+    DROP TRIGGER IF EXISTS stat_counters_calculations_insert ON calculations_legacy;
+    DROP TRIGGER IF EXISTS stat_counters_calculations_delete ON calculations_legacy;
+
+    -- calculations.id is no longer unique on its own (primary key is (id, created_at));
+    -- migrate_calculation_ids.sql re-adds the key against calculation_ids
+    ALTER TABLE calculation_jobs DROP CONSTRAINT IF EXISTS calculation_jobs_result_id_fkey;
+
+    CREATE TABLE calculations (
+        LIKE calculations_legacy INCLUDING DEFAULTS INCLUDING STORAGE INCLUDING COMMENTS,
+        PRIMARY KEY (id, created_at),
+        FOREIGN KEY (project_id) REFERENCES projects (id) ON DELETE CASCADE
+    ) PARTITION BY RANGE (created_at);
+
+    -- Same index names as the model (app/models/calculation.py)
+    CREATE INDEX ix_calculations_project_live_created
+        ON calculations (project_id, created_at DESC) WHERE deleted_at IS NULL;
+    CREATE INDEX ix_calculations_project_id ON calculations (project_id);
+    CREATE INDEX ix_calculations_building_type ON calculations (building_type);
+    CREATE INDEX ix_calculations_calculation_type ON calculations (calculation_type);
+    CREATE INDEX ix_calculations_code_edition ON calculations (code_edition);
+    CREATE INDEX ix_calculations_is_signed ON calculations (is_signed);
+    CREATE INDEX ix_calculations_created_at ON calculations (created_at);
+    CREATE INDEX ix_calculations_deleted_at ON calculations (deleted_at);
+
+    SELECT min(created_at) INTO v_oldest FROM calculations_legacy;
+    PERFORM calculations_ensure_partitions(coalesce(v_oldest, now()), 3);
+
+    INSERT INTO calculations SELECT * FROM calculations_legacy;
+
+    RAISE NOTICE 'calculations converted to a partitioned table; drop calculations_legacy after verification';
+END $$;
+
+-- Partitions for the current month and the next 3 months (the app extends this daily)
+SELECT calculations_ensure_partitions(now(), 3);
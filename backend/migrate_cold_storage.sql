@@ -0,0 +1,14 @@
+-- Migration: Cold storage of old signed calculation bundles
+-- Offloaded rows keep bundle_hash and a pointer to the compressed blob; their
+-- JSONB bundle columns become NULL (see app/services/cold_storage.py).
+
+ALTER TABLE calculations ADD COLUMN IF NOT EXISTS cold_storage_key VARCHAR(255);
+ALTER TABLE calculations ADD COLUMN IF NOT EXISTS offloaded_at TIMESTAMPTZ;
+
+ALTER TABLE calculations ALTER COLUMN inputs DROP NOT NULL;
+ALTER TABLE calculations ALTER COLUMN results DROP NOT NULL;
+ALTER TABLE calculations ALTER COLUMN steps DROP NOT NULL;
+
+CREATE INDEX IF NOT EXISTS ix_calculations_offload_candidates
+    ON calculations (created_at)
+    WHERE is_signed IS true AND cold_storage_key IS NULL;
@@ -0,0 +1,41 @@
+-- Migration: One like per user per post/reply
+-- Removes duplicate likes left by the old read-then-write toggle, adds the unique
+-- constraints the atomic toggle (INSERT ... ON CONFLICT) relies on, and re-syncs
+-- the denormalized like_count columns.
+
+DO $$
+BEGIN
+    -- Post likes
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint WHERE conname = 'uq_feedback_post_likes_post_user'
+    ) THEN
+        DELETE FROM feedback_post_likes a
+        USING feedback_post_likes b
+        WHERE a.post_id = b.post_id AND a.user_id = b.user_id AND a.id > b.id;
+
+        ALTER TABLE feedback_post_likes
+            ADD CONSTRAINT uq_feedback_post_likes_post_user UNIQUE (post_id, user_id);
+
+        UPDATE feedback_posts p
+        SET like_count = (SELECT COUNT(*) FROM feedback_post_likes l WHERE l.post_id = p.id);
+
+        RAISE NOTICE 'Added uq_feedback_post_likes_post_user and re-synced post like counts';
+    END IF;
+
+    -- Reply likes
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint WHERE conname = 'uq_feedback_reply_likes_reply_user'
+    ) THEN
+        DELETE FROM feedback_reply_likes a
+        USING feedback_reply_likes b
+        WHERE a.reply_id = b.reply_id AND a.user_id = b.user_id AND a.id > b.id;
+
+        ALTER TABLE feedback_reply_likes
+            ADD CONSTRAINT uq_feedback_reply_likes_reply_user UNIQUE (reply_id, user_id);
+
+        UPDATE feedback_replies r
+        SET like_count = (SELECT COUNT(*) FROM feedback_reply_likes l WHERE l.reply_id = r.id);
+
+        RAISE NOTICE 'Added uq_feedback_reply_likes_reply_user and re-synced reply like counts';
+    END IF;
+END $$;
@@ -0,0 +1,36 @@
+-- Migration: Full-text search for feedback posts and projects
+-- Adds generated tsvector columns (English + French) with GIN indexes, plus
+-- pg_trgm indexes for fuzzy matching on project names and clients.
+-- Expressions must match app/utils/search.py (weighted_tsvector_sql).
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+ALTER TABLE feedback_posts ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(content, '')), 'B') ||
+        setweight(to_tsvector('french', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('french', coalesce(content, '')), 'B')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS ix_feedback_posts_search_vector
+    ON feedback_posts USING gin (search_vector);
+
+ALTER TABLE projects ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(client_name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(location, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'C') ||
+        setweight(to_tsvector('french', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('french', coalesce(client_name, '')), 'A') ||
+        setweight(to_tsvector('french', coalesce(location, '')), 'B') ||
+        setweight(to_tsvector('french', coalesce(description, '')), 'C')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS ix_projects_search_vector
+    ON projects USING gin (search_vector);
+CREATE INDEX IF NOT EXISTS ix_projects_name_trgm
+    ON projects USING gin (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_projects_client_name_trgm
+    ON projects USING gin (client_name gin_trgm_ops);
@@ -0,0 +1,89 @@
+-- Migration: Incrementally maintained counters for /api/v1/stats
+-- Statement-level triggers keep per-table and per-month row counts in
+-- stat_counters, so the stats endpoint never counts the big tables.
+-- Counters are sharded by backend pid: concurrent inserts update different
+-- rows instead of queueing on one hot row. Readers sum the shards.
+--
+-- Counter names: 'projects', 'calculations', 'calculations:YYYY-MM' (UTC month)
+-- After a TRUNCATE or manual bulk load that bypasses triggers, run:
+--     SELECT stat_counters_reconcile();
+
+CREATE TABLE IF NOT EXISTS stat_counters (
+    name VARCHAR(64) NOT NULL,
+    shard SMALLINT NOT NULL DEFAULT 0,
+    value BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (name, shard)
+);
+
+-- TG_ARGV[0]: counter name; TG_ARGV[1] = 'monthly' also maintains <name>:YYYY-MM
+CREATE OR REPLACE FUNCTION stat_counters_apply() RETURNS TRIGGER AS $$
+DECLARE
+    v_delta INTEGER := CASE WHEN TG_OP = 'DELETE' THEN -1 ELSE 1 END;
+    v_shard SMALLINT := pg_backend_pid() % 16;
+BEGIN
+    INSERT INTO stat_counters AS c (name, shard, value)
+    SELECT TG_ARGV[0], v_shard, v_delta * COUNT(*) FROM changed_rows HAVING COUNT(*) > 0
+    ON CONFLICT (name, shard) DO UPDATE SET value = c.value + EXCLUDED.value;
+
+    IF TG_NARGS > 1 AND TG_ARGV[1] = 'monthly' THEN
+        INSERT INTO stat_counters AS c (name, shard, value)
+        SELECT TG_ARGV[0] || ':' || to_char(created_at AT TIME ZONE 'UTC', 'YYYY-MM'),
+               v_shard, v_delta * COUNT(*)
+        FROM changed_rows
+        GROUP BY 1
+        ON CONFLICT (name, shard) DO UPDATE SET value = c.value + EXCLUDED.value;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Recompute every counter from the tables (takes a SHARE lock on both tables)
+CREATE OR REPLACE FUNCTION stat_counters_reconcile() RETURNS VOID AS $$
+BEGIN
+    LOCK TABLE projects, calculations IN SHARE MODE;
+
+    DELETE FROM stat_counters
+    WHERE name IN ('projects', 'calculations') OR name LIKE 'calculations:%';
+
+    INSERT INTO stat_counters (name, shard, value)
+    SELECT 'projects', 0, COUNT(*) FROM projects;
+
+    INSERT INTO stat_counters (name, shard, value)
+    SELECT 'calculations', 0, COUNT(*) FROM calculations;
+
+    INSERT INTO stat_counters (name, shard, value)
+    SELECT 'calculations:' || to_char(created_at AT TIME ZONE 'UTC', 'YYYY-MM'), 0, COUNT(*)
+    FROM calculations
+    GROUP BY 1;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Transition tables allow one event per trigger: separate INSERT and DELETE triggers
+DROP TRIGGER IF EXISTS stat_counters_projects_insert ON projects;
+CREATE TRIGGER stat_counters_projects_insert AFTER INSERT ON projects
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION stat_counters_apply('projects');
+
+DROP TRIGGER IF EXISTS stat_counters_projects_delete ON projects;
+CREATE TRIGGER stat_counters_projects_delete AFTER DELETE ON projects
+    REFERENCING OLD TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION stat_counters_apply('projects');
+
+DROP TRIGGER IF EXISTS stat_counters_calculations_insert ON calculations;
+CREATE TRIGGER stat_counters_calculations_insert AFTER INSERT ON calculations
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION stat_counters_apply('calculations', 'monthly');
+
+DROP TRIGGER IF EXISTS stat_counters_calculations_delete ON calculations;
+CREATE TRIGGER stat_counters_calculations_delete AFTER DELETE ON calculations
+    REFERENCING OLD TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION stat_counters_apply('calculations', 'monthly');
+
+-- Initial backfill (first run only)
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM stat_counters WHERE name = 'projects') THEN
+        PERFORM stat_counters_reconcile();
+    END IF;
+END $$;
@@ -0,0 +1,5 @@
+-- Migration: Access token revocation version
+-- users.token_version is bumped on password change and deactivation; access
+-- tokens carrying an older version are rejected (see app/utils/token_versions.py).
+
+ALTER TABLE users ADD COLUMN IF NOT EXISTS token_version INTEGER NOT NULL DEFAULT 0;
@@ -27,10 +27,10 @@ if [ -n "$DATABASE_URL" ]; then
     echo "✅ 数据库连接正常"
 fi
 
-# 运行数据库迁移（如果启用）
-if [ "$RUN_MIGRATIONS" = "true" ]; then
+# 运行数据库迁移（默认启用，RUN_MIGRATIONS=false 跳过；应用启动时只校验 schema 版本，不执行 DDL）
+if [ "${RUN_MIGRATIONS:-true}" = "true" ]; then
     echo "🔄 运行数据库迁移..."
-    # alembic upgrade head
+    python manage_db.py migrate
 fi
 
 # 启动应用
@@ -47,10 +47,11 @@ if [ "$ENVIRONMENT" = "development" ]; then
         --reload \
         --log-level debug
 else
-    # 生产模式：多进程
+    # 生产模式：多进程（连接池大小按 WEB_CONCURRENCY 分配）
+    export WEB_CONCURRENCY=${WEB_CONCURRENCY:-4}
     uvicorn app.main:app \
         --host 0.0.0.0 \
         --port ${PORT:-8000} \
-        --workers 4 \
+        --workers ${WEB_CONCURRENCY:-4} \
         --log-level info
 fi
\ No newline at end of file
@@ -0,0 +1,2 @@
+# backend/tests/__init__.py
+# Backend test suite
@@ -0,0 +1,81 @@
+# backend/tests/conftest.py
+# Shared fixtures: in-memory SQLite databases (aiosqlite) standing in for PostgreSQL
+#
+# PostgreSQL-only column types are mapped to SQLite ones: JSONB to JSON, and the
+# generated search_vector columns become plain nullable TEXT columns (full-text
+# search itself is not exercised here). Partitioning, triggers and partial
+# indexes do not exist in SQLite; tests that need calculation_ids rows add them
+# the way the triggers would.
+
+from contextlib import contextmanager
+from typing import Iterator, List
+
+import pytest
+from sqlalchemy import Computed, event
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+import app.models  # noqa: F401  (register every mapper)
+
+SQLITE_TABLES = [
+    "users", "feedback_posts", "feedback_post_likes", "feedback_replies", "feedback_reply_likes",
+    "projects", "calculations", "calculation_ids",
+]
+
+
+@compiles(JSONB, "sqlite")
+def _jsonb_sqlite(element, compiler, **kw):
+    return "JSON"
+
+
+@compiles(TSVECTOR, "sqlite")
+def _tsvector_sqlite(element, compiler, **kw):
+    return "TEXT"
+
+
+@compiles(Computed, "sqlite")
+def _computed_sqlite(element, compiler, **kw):
+    return ""  # to_tsvector() does not exist in SQLite: keep the column, drop the expression
+
+
+def sqlite_engine() -> AsyncEngine:
+    """New in-memory database; StaticPool keeps the one connection (and its data) alive"""
+    return create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+
+
+@pytest.fixture
+async def engine() -> AsyncEngine:
+    engine = sqlite_engine()
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all, tables=[Base.metadata.tables[name] for name in SQLITE_TABLES])
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine: AsyncEngine) -> async_sessionmaker:
+    return async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+
+@pytest.fixture
+async def db(session_factory: async_sessionmaker) -> AsyncSession:
+    async with session_factory() as session:
+        yield session
+
+
+@contextmanager
+def count_statements(engine: AsyncEngine) -> Iterator[List[str]]:
+    """Collect the SQL statements executed on engine inside the block"""
+    statements: List[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
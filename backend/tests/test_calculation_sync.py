@@ -0,0 +1,202 @@
+# backend/tests/test_calculation_sync.py
+# Legacy /calculations/sync and /sync/bulk against the calculations routes on SQLite
+
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import select
+
+from app.database import get_db
+from app.models import Calculation, CalculationId, Project, User
+from app.routes.calculations import router as calculations_router
+from app.services.cold_storage import ColdStorage
+from app.utils.config import settings
+from app.utils.auth_cache import Principal, project_owner_cache
+from app.utils.security import get_current_principal
+
+CREATED_AT = datetime(2024, 3, 1, tzinfo=timezone.utc)
+
+PAYLOAD = {
+    "inputs": {"livingArea_m2": 120},
+    "results": {"calculatedLoad_W": 21000, "serviceRatingA": 100},
+    "steps": [{"operationId": "basic_load", "outputs": {"load_W": 5000}}],
+    "warnings": [],
+}
+
+CHANGED = {**PAYLOAD, "results": {"calculatedLoad_W": 42000, "serviceRatingA": 200}}
+
+
+@pytest.fixture(autouse=True)
+def clear_owner_cache():
+    project_owner_cache.clear()
+    yield
+    project_owner_cache.clear()
+
+
+@pytest.fixture
+async def users(db):
+    """Two users, each owning one project (owner: project 1, other: project 2)"""
+    owner = User(email="owner@example.com", hashed_password="x")
+    other = User(email="other@example.com", hashed_password="x")
+    db.add_all([owner, other])
+    await db.flush()
+    db.add_all([
+        Project(id=1, owner_id=owner.id, name="House"),
+        Project(id=2, owner_id=other.id, name="Shop"),
+    ])
+    await db.commit()
+    return owner, other
+
+
+async def add_calculation(db, calc_id: str, project_id: int = 1, signed: bool = False, deleted: bool = False):
+    """A calculation plus the calculation_ids row the PostgreSQL trigger would insert"""
+    db.add_all([
+        Calculation(
+            id=calc_id,
+            project_id=project_id,
+            building_type="single-dwelling",
+            engine_version="1.0.0",
+            engine_commit="tests",
+            bundle_hash=ColdStorage.compute_bundle_hash(calc_id, PAYLOAD, "1.0.0", "tests") if signed else None,
+            is_signed=signed,
+            created_at=CREATED_AT,
+            deleted_at=CREATED_AT if deleted else None,
+            **PAYLOAD,
+        ),
+        CalculationId(id=calc_id, created_at=CREATED_AT),
+    ])
+    await db.commit()
+
+
+async def stored(session_factory, calc_id: str) -> Calculation:
+    async with session_factory() as db:
+        return await db.scalar(select(Calculation).where(Calculation.id == calc_id))
+
+
+@pytest.fixture
+async def client(session_factory, users):
+    owner, _ = users
+    app = FastAPI()
+    app.include_router(calculations_router)
+
+    async def session():
+        async with session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = session
+    app.dependency_overrides[get_current_principal] = lambda: Principal(
+        id=owner.id, email=owner.email, is_active=True, is_superuser=False
+    )
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+def sync_body(calc_id: str, project_id: int = 1, bundle=CHANGED) -> dict:
+    return {"project_id": project_id, "bundle_id": calc_id, "bundle_data": bundle, "calculation_type": "cec_load"}
+
+
+async def test_sync_updates_unsigned_bundle(client, db):
+    await add_calculation(db, "calc-1")
+
+    response = await client.post("/calculations/sync", json=sync_body("calc-1"))
+
+    assert response.status_code == 201
+    assert response.json()["results"] == CHANGED["results"]
+
+
+async def test_sync_refuses_signed_bundle_and_etag_stays_valid(client, db):
+    await add_calculation(db, "calc-1", signed=True)
+    first = await client.get("/calculations/calc-1")
+    etag = first.headers["etag"]
+    assert "immutable" in first.headers["cache-control"]
+
+    response = await client.post("/calculations/sync", json=sync_body("calc-1"))
+    assert response.status_code == 409
+
+    assert (await client.get("/calculations/calc-1", headers={"If-None-Match": etag})).status_code == 304
+    again = await client.get("/calculations/calc-1")
+    assert again.headers["etag"] == etag
+    assert again.json()["results"] == PAYLOAD["results"]
+
+
+async def test_sync_refuses_bundle_of_another_user(client, db, session_factory):
+    await add_calculation(db, "calc-2", project_id=2)
+
+    response = await client.post("/calculations/sync", json=sync_body("calc-2"))
+
+    assert response.status_code == 403
+    assert (await stored(session_factory, "calc-2")).results == PAYLOAD["results"]
+
+
+async def bulk_sync(client, *items) -> dict:
+    response = await client.post("/calculations/sync/bulk", json={"calculations": list(items)})
+    assert response.status_code == 200
+    return response.json()
+
+
+def statuses(body: dict) -> list:
+    return [(result["bundle_id"], result["status"]) for result in body["results"]]
+
+
+async def test_bulk_sync_creates_and_updates(client, db, session_factory):
+    await add_calculation(db, "calc-1")
+
+    body = await bulk_sync(client, sync_body("calc-1"), sync_body("calc-new"))
+
+    assert statuses(body) == [("calc-1", "updated"), ("calc-new", "created")]
+    assert (body["created"], body["updated"], body["skipped"], body["failed"]) == (1, 1, 0, 0)
+    assert (await stored(session_factory, "calc-1")).results == CHANGED["results"]
+    assert (await stored(session_factory, "calc-new")).results == CHANGED["results"]
+
+
+async def test_bulk_sync_last_duplicate_wins(client, session_factory):
+    first = sync_body("calc-1", bundle=PAYLOAD)
+
+    body = await bulk_sync(client, first, sync_body("calc-1"))
+
+    assert statuses(body) == [("calc-1", "skipped"), ("calc-1", "created")]
+    assert "Superseded" in body["results"][0]["detail"]
+    assert (await stored(session_factory, "calc-1")).results == CHANGED["results"]
+
+
+async def test_bulk_sync_skips_signed_and_deleted(client, db, session_factory):
+    await add_calculation(db, "calc-signed", signed=True)
+    await add_calculation(db, "calc-deleted", deleted=True)
+
+    body = await bulk_sync(client, sync_body("calc-signed"), sync_body("calc-deleted"))
+
+    assert statuses(body) == [("calc-signed", "skipped"), ("calc-deleted", "skipped")]
+    assert body["results"][1]["detail"] == "Calculation was deleted"
+    for calc_id in ("calc-signed", "calc-deleted"):
+        assert (await stored(session_factory, calc_id)).results == PAYLOAD["results"]
+
+
+async def test_bulk_sync_refuses_other_owners(client, db, session_factory):
+    await add_calculation(db, "calc-2", project_id=2)
+
+    body = await bulk_sync(
+        client,
+        sync_body("calc-2"),               # Bundle in another user's project
+        sync_body("calc-3", project_id=2),  # Project of another user
+        sync_body("calc-4", project_id=99),  # No such project
+    )
+
+    assert [result["status"] for result in body["results"]] == ["error", "error", "error"]
+    assert body["failed"] == 3
+    assert (await stored(session_factory, "calc-2")).results == PAYLOAD["results"]
+    assert await stored(session_factory, "calc-3") is None
+
+
+async def test_bulk_sync_failing_batch_rolls_back_alone(client, session_factory, monkeypatch):
+    monkeypatch.setattr(settings, "BULK_SYNC_BATCH_SIZE", 1)
+    invalid = sync_body("calc-2", bundle={**CHANGED, "building_type": None})  # NOT NULL violation
+
+    body = await bulk_sync(client, sync_body("calc-1"), invalid, sync_body("calc-3"))
+
+    assert statuses(body) == [("calc-1", "created"), ("calc-2", "error"), ("calc-3", "created")]
+    assert body["results"][1]["detail"] == "Database error: IntegrityError"
+    assert await stored(session_factory, "calc-1") is not None
+    assert await stored(session_factory, "calc-2") is None
+    assert await stored(session_factory, "calc-3") is not None
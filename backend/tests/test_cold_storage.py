@@ -0,0 +1,144 @@
+# backend/tests/test_cold_storage.py
+# Cold storage with a local-directory blob store: offload, rehydrate, integrity checks
+
+import gzip
+import json
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.models import Calculation, CalculationId, Project, User
+from app.schemas import CalculationCreate
+from app.services.calculation_service import CalculationService
+from app.services.cold_storage import BUNDLE_FIELDS, BundleLRU, ColdStorage
+from app.utils.blob_store import LocalBlobStore
+
+CREATED_AT = datetime(2020, 1, 15, tzinfo=timezone.utc)
+
+PAYLOAD = {
+    "inputs": {"livingArea_m2": 150, "notes": "Sous-sol aménagé"},
+    "results": {"calculatedLoad_W": 23450, "serviceRatingA": 200},
+    "steps": [{"operationId": "basic_load", "outputs": {"load_W": 5000}}],
+    "warnings": [],
+}
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch) -> LocalBlobStore:
+    store = LocalBlobStore(str(tmp_path / "cold"))
+    monkeypatch.setattr(ColdStorage, "_store", store)
+    monkeypatch.setattr(ColdStorage, "cache", BundleLRU(16))
+    return store
+
+
+@pytest.fixture
+async def owner(db) -> User:
+    user = User(email="owner@example.com", hashed_password="x")
+    db.add(user)
+    await db.flush()
+    db.add(Project(id=1, owner_id=user.id, name="House"))
+    await db.commit()
+    return user
+
+
+async def add_calculation(db, calc_id: str, payload=PAYLOAD, bundle_hash=None) -> Calculation:
+    """A signed calculation, plus the calculation_ids row the PostgreSQL trigger would insert"""
+    calculation = Calculation(
+        id=calc_id,
+        project_id=1,
+        building_type="single-dwelling",
+        engine_version="1.0.0",
+        engine_commit="tests",
+        bundle_hash=bundle_hash or ColdStorage.compute_bundle_hash(calc_id, payload, "1.0.0", "tests"),
+        is_signed=True,
+        created_at=CREATED_AT,
+        **payload,
+    )
+    db.add_all([calculation, CalculationId(id=calc_id, created_at=CREATED_AT)])
+    await db.commit()
+    return calculation
+
+
+async def load(session_factory, calc_id: str) -> Calculation:
+    async with session_factory() as db:
+        return await db.scalar(select(Calculation).where(Calculation.id == calc_id))
+
+
+async def test_offload_then_rehydrate_round_trip(db, session_factory, owner, store):
+    await add_calculation(db, "calc-1")
+
+    counts = await ColdStorage.offload_batch(db, min_age_days=30, limit=10)
+    assert counts == {"offloaded": 1, "skipped": 0, "cursor": None}
+
+    offloaded = await load(session_factory, "calc-1")
+    assert offloaded.cold_storage_key == "calculations/2020/01/calc-1.json.gz"
+    assert all(getattr(offloaded, field) is None for field in BUNDLE_FIELDS)
+    assert ColdStorage.decode(store.get(offloaded.cold_storage_key)) == PAYLOAD
+
+    rehydrated = await ColdStorage.rehydrate(offloaded)
+    assert {field: getattr(rehydrated, field) for field in BUNDLE_FIELDS} == PAYLOAD
+
+
+async def test_recent_calculations_stay_inline(db, owner, store):
+    await add_calculation(db, "calc-1")
+
+    counts = await ColdStorage.offload_batch(db, min_age_days=365 * 100, limit=10)
+
+    assert counts["offloaded"] == 0
+
+
+async def test_offload_skips_payload_not_matching_bundle_hash(db, session_factory, owner, store):
+    await add_calculation(db, "calc-1", bundle_hash="sha256:" + "0" * 64)
+
+    counts = await ColdStorage.offload_batch(db, min_age_days=30, limit=10)
+
+    assert counts["offloaded"] == 0 and counts["skipped"] == 1
+    calculation = await load(session_factory, "calc-1")
+    assert calculation.cold_storage_key is None
+    assert calculation.results == PAYLOAD["results"]
+
+
+async def test_rehydrate_rejects_tampered_blob(db, session_factory, owner, store):
+    await add_calculation(db, "calc-1")
+    await ColdStorage.offload_batch(db, min_age_days=30, limit=10)
+    offloaded = await load(session_factory, "calc-1")
+
+    tampered = {**PAYLOAD, "results": {**PAYLOAD["results"], "serviceRatingA": 100}}
+    store.put(offloaded.cold_storage_key, gzip.compress(json.dumps(tampered).encode("utf-8")))
+
+    with pytest.raises(HTTPException) as error:
+        await ColdStorage.rehydrate(offloaded)
+    assert error.value.status_code == 500
+
+
+async def test_rehydrate_missing_blob_is_unavailable(db, session_factory, owner, store):
+    await add_calculation(db, "calc-1")
+    await ColdStorage.offload_batch(db, min_age_days=30, limit=10)
+    offloaded = await load(session_factory, "calc-1")
+    store.delete(offloaded.cold_storage_key)
+
+    with pytest.raises(HTTPException) as error:
+        await ColdStorage.rehydrate(offloaded)
+    assert error.value.status_code == 503
+
+
+async def test_legacy_update_rejects_offloaded_bundle(db, session_factory, owner, store):
+    await add_calculation(db, "calc-1")
+    await ColdStorage.offload_batch(db, min_age_days=30, limit=10)
+
+    bundle = {**PAYLOAD, "results": {"calculatedLoad_W": 30000, "serviceRatingA": 200}}
+    async with session_factory() as session:
+        with pytest.raises(HTTPException) as error:
+            await CalculationService.create_calculation(
+                session,
+                CalculationCreate(project_id=1, bundle_id="calc-1", bundle_data=bundle, calculation_type="cec_load"),
+                owner.id
+            )
+    assert error.value.status_code == 409
+
+    calculation = await load(session_factory, "calc-1")
+    assert calculation.cold_storage_key == "calculations/2020/01/calc-1.json.gz"
+    rehydrated = await ColdStorage.rehydrate(calculation)
+    assert {field: getattr(rehydrated, field) for field in BUNDLE_FIELDS} == PAYLOAD
@@ -0,0 +1,14 @@
+# backend/tests/test_db_pool.py
+# Pool sizing from the per-instance connection budget
+
+from app.db_pool import derive_pool_size
+
+
+def test_pools_fit_the_budget_with_reserved_connections():
+    for workers in (1, 2, 4, 8):
+        size, overflow = derive_pool_size(max_connections=40, workers=workers, reserved=2)
+        assert workers * (size + overflow + 2) <= 40
+
+
+def test_explicit_sizes_are_kept():
+    assert derive_pool_size(max_connections=40, workers=4, pool_size=3, max_overflow=1, reserved=2) == (3, 1)
@@ -0,0 +1,145 @@
+# backend/tests/test_db_routing.py
+# Read-replica routing with two SQLite databases standing in for primary and replica
+#
+# Each database has a `source` row naming it, so a read shows which one answered,
+# and a `writes` table to see where writes landed. The replica's lag comes from
+# its replica_lag table instead of the PostgreSQL recovery functions.
+
+import httpx
+import pytest
+from fastapi import Depends, FastAPI, Request
+from sqlalchemy import column, select, table, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+import app.database as database
+import app.db_routing as db_routing
+import app.main as main
+from app.database import get_db
+from app.db_routing import ReplicaRouter, RoutingSession, client_key
+
+from .conftest import sqlite_engine
+
+MAX_LAG = 1.0
+
+# Routing looks at the statement type: reads must be Select constructs (text() goes to the primary)
+SELECT_SOURCE = select(column("name")).select_from(table("source"))
+
+
+async def _create(engine, name):
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE source (name TEXT)"))
+        await conn.execute(text("INSERT INTO source VALUES (:name)"), {"name": name})
+        await conn.execute(text("CREATE TABLE writes (id INTEGER)"))
+        await conn.execute(text("CREATE TABLE replica_lag (seconds REAL)"))
+        await conn.execute(text("INSERT INTO replica_lag VALUES (0)"))
+
+
+async def count_writes(engine) -> int:
+    async with engine.connect() as conn:
+        return await conn.scalar(text("SELECT count(*) FROM writes"))
+
+
+async def set_lag(engine, seconds: float):
+    async with engine.begin() as conn:
+        await conn.execute(text("UPDATE replica_lag SET seconds = :seconds"), {"seconds": seconds})
+
+
+@pytest.fixture
+async def primary():
+    engine = sqlite_engine()
+    await _create(engine, "primary")
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+async def replica():
+    engine = sqlite_engine()
+    await _create(engine, "replica")
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def router(monkeypatch, primary, replica):
+    router = ReplicaRouter([replica], max_lag=MAX_LAG, check_interval=5.0, sticky_seconds=30.0)
+    monkeypatch.setattr(db_routing, "REPLICA_LAG_SQL", text("SELECT seconds FROM replica_lag"))
+    monkeypatch.setattr(database, "replica_router", router)
+    monkeypatch.setattr(main, "replica_router", router)
+    monkeypatch.setattr(database, "AsyncSessionLocal", async_sessionmaker(
+        bind=primary, sync_session_class=RoutingSession, autoflush=False, expire_on_commit=False
+    ))
+    return router
+
+
+@pytest.fixture
+async def client(router):
+    app = FastAPI()
+    app.middleware("http")(main.pin_writers_to_primary)
+
+    @app.get("/source")
+    async def read_source(db=Depends(get_db)):
+        return {"source": await db.scalar(SELECT_SOURCE)}
+
+    @app.post("/writes")
+    async def write(db=Depends(get_db)):
+        await db.execute(text("INSERT INTO writes VALUES (1)"))
+        read_after_write = await db.scalar(SELECT_SOURCE)
+        await db.commit()
+        return {"source": read_after_write}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+async def source(client, **headers) -> str:
+    response = await client.get("/source", headers=headers)
+    response.raise_for_status()
+    return response.json()["source"]
+
+
+async def test_get_reads_from_replica(client):
+    assert await source(client) == "replica"
+
+
+async def test_write_goes_to_primary(client, primary, replica):
+    response = await client.post("/writes")
+
+    assert response.json()["source"] == "primary"  # Read after the write in the same session
+    assert await count_writes(primary) == 1
+    assert await count_writes(replica) == 0
+
+
+async def test_writer_is_pinned_to_primary(client):
+    writer = {"Authorization": "Bearer writer"}
+    await client.post("/writes", headers=writer)
+
+    assert await source(client, **writer) == "primary"
+    assert await source(client, Authorization="Bearer someone-else") == "replica"
+
+
+async def test_consistency_header_overrides_routing(client):
+    assert await source(client, **{"X-Read-Consistency": "primary"}) == "primary"
+
+
+async def test_lagging_replica_falls_back_to_primary(client, router, replica):
+    await set_lag(replica, MAX_LAG * 10)
+
+    assert await source(client) == "primary"
+    assert router.status() == [{"replica": 0, "lag_seconds": MAX_LAG * 10, "healthy": False}]
+
+
+async def test_unreachable_replica_falls_back_to_primary(client, router, replica):
+    async with replica.begin() as conn:
+        await conn.execute(text("DROP TABLE replica_lag"))  # Lag query fails like a dead connection
+
+    assert await source(client) == "primary"
+    assert router.status()[0]["lag_seconds"] is None
+
+
+def test_client_key_uses_forwarded_address():
+    def request(headers):
+        return Request({"type": "http", "headers": headers, "client": ("10.0.0.2", 5000)})
+
+    assert client_key(request([])) == "addr:10.0.0.2"
+    assert client_key(request([(b"x-forwarded-for", b"203.0.113.7, 10.0.0.1")])) == "addr:203.0.113.7"
@@ -0,0 +1,167 @@
+# backend/tests/test_feedback_likes.py
+# Like toggling: the single-statement toggle (compiled for PostgreSQL), the 404 path,
+# and like / unlike / re-like against a real database when TEST_DATABASE_URL is set
+#
+# The toggle uses data-modifying CTEs and ON CONFLICT, which SQLite cannot run, so the
+# round-trip tests are marked postgres and skipped without a PostgreSQL test database.
+
+import os
+import re
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.database import Base, to_psycopg_url
+from app.models import FeedbackPost, FeedbackPostLike, FeedbackReply, FeedbackReplyLike, User
+from app.routes.feedback import toggle_post_like, toggle_reply_like
+from app.services.feedback_service import FeedbackService
+from app.utils.auth_cache import Principal
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+VIEWER = Principal(id=3, email="viewer@example.com", is_active=True, is_superuser=False)
+
+
+def compiled(like_model, target_model, target_fk) -> str:
+    stmt = FeedbackService.toggle_like_statement(like_model, target_model, target_fk, 7, 3)
+    sql = str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+    return re.sub(r"\s+", " ", sql)
+
+
+@pytest.mark.parametrize("like_model, target_model, target_fk, likes, target", [
+    (FeedbackPostLike, FeedbackPost, "post_id", "feedback_post_likes", "feedback_posts"),
+    (FeedbackReplyLike, FeedbackReply, "reply_id", "feedback_reply_likes", "feedback_replies"),
+])
+def test_toggle_is_one_statement(like_model, target_model, target_fk, likes, target):
+    sql = compiled(like_model, target_model, target_fk)
+
+    # Unlike: remove the user's like, if any
+    assert sql.startswith(
+        f"WITH removed AS (DELETE FROM {likes} WHERE {likes}.{target_fk} = 7 AND {likes}.user_id = 3 "
+        f"RETURNING {likes}.{target_fk})"
+    )
+    # Like: insert only when nothing was removed; a racing duplicate is ignored
+    assert f"added AS (INSERT INTO {likes} ({target_fk}, user_id) SELECT 7" in sql
+    assert f"WHERE NOT (EXISTS (SELECT removed.{target_fk} FROM removed)) ON CONFLICT ({target_fk}, user_id) DO NOTHING" in sql
+    # Counter: +added -removed, never below zero; edits timestamp untouched
+    assert (
+        f"UPDATE {target} SET like_count=greatest(({target}.like_count + (SELECT count(*) AS count_1 FROM added)) "
+        f"- (SELECT count(*) AS count_2 FROM removed), 0), updated_at={target}.updated_at WHERE {target}.id = 7"
+    ) in sql
+    assert sql.endswith(f"RETURNING {target}.like_count, (SELECT count(*) AS count_1 FROM added) AS anon_3")
+
+
+class ForeignKeyViolation:
+    """Session whose statement fails like an insert referencing a missing post/reply"""
+
+    def __init__(self):
+        self.rolled_back = False
+
+    async def execute(self, stmt):
+        raise IntegrityError(str(stmt), {}, Exception("violates foreign key constraint"))
+
+    async def commit(self):
+        raise AssertionError("nothing to commit")
+
+    async def rollback(self):
+        self.rolled_back = True
+
+
+async def test_missing_target_is_none_after_rollback():
+    db = ForeignKeyViolation()
+
+    result = await FeedbackService.toggle_like(db, FeedbackPostLike, FeedbackPost, "post_id", 7, 3)
+
+    assert result is None
+    assert db.rolled_back
+
+
+@pytest.mark.parametrize("route, kwargs", [
+    (toggle_post_like, {"post_id": 7}),
+    (toggle_reply_like, {"reply_id": 7}),
+])
+async def test_missing_target_is_404(route, kwargs):
+    with pytest.raises(HTTPException) as error:
+        await route(**kwargs, current_user=VIEWER, db=ForeignKeyViolation())
+    assert error.value.status_code == 404
+
+
+PG_TABLES = ["users", "feedback_posts", "feedback_post_likes", "feedback_replies", "feedback_reply_likes"]
+
+
+@pytest.fixture
+async def pg_session_factory():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    engine = create_async_engine(to_psycopg_url(TEST_DATABASE_URL))
+    tables = [Base.metadata.tables[name] for name in PG_TABLES]
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all, tables=tables)
+        await conn.run_sync(Base.metadata.create_all, tables=tables)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all, tables=tables)
+    await engine.dispose()
+
+
+@pytest.fixture
+async def pg_thread(pg_session_factory):
+    """(user id, post id, reply id)"""
+    async with pg_session_factory() as db:
+        user = User(email="viewer@example.com", hashed_password="x")
+        db.add(user)
+        await db.flush()
+        post = FeedbackPost(user_id=user.id, title="Post", content="Content")
+        db.add(post)
+        await db.flush()
+        reply = FeedbackReply(post_id=post.id, user_id=user.id, content="Reply")
+        db.add(reply)
+        await db.commit()
+        return user.id, post.id, reply.id
+
+
+TARGETS = [
+    (FeedbackPostLike, FeedbackPost, "post_id", 1),
+    (FeedbackReplyLike, FeedbackReply, "reply_id", 2),
+]
+
+
+@pytest.mark.postgres
+@pytest.mark.parametrize("like_model, target_model, target_fk, id_index", TARGETS)
+async def test_like_unlike_relike(pg_session_factory, pg_thread, like_model, target_model, target_fk, id_index):
+    user_id, target_id = pg_thread[0], pg_thread[id_index]
+
+    async def toggle():
+        async with pg_session_factory() as db:
+            return await FeedbackService.toggle_like(db, like_model, target_model, target_fk, target_id, user_id)
+
+    assert await toggle() == (True, 1)
+    assert await toggle() == (False, 0)
+    assert await toggle() == (True, 1)
+
+    async with pg_session_factory() as db:
+        likes = (await db.scalars(select(like_model).where(getattr(like_model, target_fk) == target_id))).all()
+    assert [like.user_id for like in likes] == [user_id]
+
+
+@pytest.mark.postgres
+@pytest.mark.parametrize("like_model, target_model, target_fk, id_index", TARGETS)
+async def test_missing_target_on_postgres(pg_session_factory, pg_thread, like_model, target_model, target_fk, id_index):
+    async with pg_session_factory() as db:
+        assert await FeedbackService.toggle_like(db, like_model, target_model, target_fk, 999999, pg_thread[0]) is None
+
+
+@pytest.mark.postgres
+@pytest.mark.parametrize("like_model, target_model, target_fk, id_index", TARGETS)
+async def test_like_count_never_below_zero(pg_session_factory, pg_thread, like_model, target_model, target_fk, id_index):
+    user_id, target_id = pg_thread[0], pg_thread[id_index]
+    async with pg_session_factory() as db:
+        db.add(like_model(**{target_fk: target_id, "user_id": user_id}))
+        await db.execute(update(target_model).where(target_model.id == target_id).values(like_count=0))
+        await db.commit()
+
+        assert await FeedbackService.toggle_like(db, like_model, target_model, target_fk, target_id, user_id) == (False, 0)
@@ -0,0 +1,158 @@
+# backend/tests/test_feedback_queries.py
+# Query budget of the feedback list: a fixed number of statements per page, whatever its size;
+# reply trees: one statement, depth and paging limits, flat order
+
+from datetime import datetime, timedelta, timezone
+
+import orjson
+import pytest
+
+from app.models import FeedbackPost, FeedbackPostLike, FeedbackReply, FeedbackReplyLike, User
+from app.routes.feedback import get_posts
+from app.services.feedback_service import FeedbackService
+from app.utils.auth_cache import Principal
+
+from .conftest import count_statements
+
+POSTS = 100
+
+# count, page (authors joined), likes of the page
+STATEMENTS_SIGNED_IN = 3
+STATEMENTS_ANONYMOUS = 2
+
+
+@pytest.fixture
+async def viewer(db) -> Principal:
+    users = [User(email=f"user{i}@example.com", hashed_password="x") for i in range(5)]
+    db.add_all(users)
+    await db.flush()
+    posts = [FeedbackPost(user_id=users[i % 5].id, title=f"Post {i}", content="Content") for i in range(POSTS)]
+    db.add_all(posts)
+    await db.flush()
+    db.add_all([FeedbackPostLike(post_id=post.id, user_id=users[0].id) for post in posts[::3]])
+    await db.commit()
+    return Principal(id=users[0].id, email=users[0].email, is_active=True, is_superuser=False)
+
+
+async def list_posts(db, page_size, current_user):
+    response = await get_posts(
+        page=1, page_size=page_size, category=None, search=None, sort="newest",
+        current_user=current_user, db=db
+    )
+    return orjson.loads(response.body)
+
+
+@pytest.mark.parametrize("page_size", [1, POSTS])
+async def test_page_statement_count_is_constant(engine, session_factory, viewer, page_size):
+    async with session_factory() as db:
+        with count_statements(engine) as statements:
+            body = await list_posts(db, page_size, viewer)
+
+    assert len(body["items"]) == page_size
+    assert body["total"] == POSTS
+    assert all(item["author"] for item in body["items"])
+    assert len(statements) == STATEMENTS_SIGNED_IN, statements
+
+
+async def test_user_has_liked_matches_likes(session_factory, viewer):
+    async with session_factory() as db:
+        body = await list_posts(db, POSTS, viewer)
+
+    liked = {item["id"] for item in body["items"] if item["user_has_liked"]}
+    assert len(liked) == len(range(0, POSTS, 3))
+
+
+@pytest.mark.parametrize("page_size", [1, POSTS])
+async def test_anonymous_page_skips_like_lookup(engine, session_factory, viewer, page_size):
+    async with session_factory() as db:
+        with count_statements(engine) as statements:
+            body = await list_posts(db, page_size, None)
+
+    assert not any(item["user_has_liked"] for item in body["items"])
+    assert len(statements) == STATEMENTS_ANONYMOUS, statements
+
+
+# Reply thread: (name, parent, minutes after the post); depth-first order differs from creation order
+THREAD = [
+    ("a", None, 1),
+    ("b", None, 2),
+    ("a1", "a", 3),
+    ("a1x", "a1", 4),
+    ("c", None, 5),
+    ("b1", "b", 6),
+]
+LIKED = {"a1", "c"}
+
+
+@pytest.fixture
+async def thread(db, viewer):
+    """Post id and reply ids by name; the viewer likes the LIKED replies"""
+    post = FeedbackPost(user_id=viewer.id, title="Thread", content="Content")
+    db.add(post)
+    await db.flush()
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    ids = {}
+    for name, parent, minutes in THREAD:
+        reply = FeedbackReply(
+            post_id=post.id, user_id=viewer.id, parent_reply_id=ids.get(parent),
+            content=name, created_at=start + timedelta(minutes=minutes)
+        )
+        db.add(reply)
+        await db.flush()
+        ids[name] = reply.id
+    db.add_all([FeedbackReplyLike(reply_id=ids[name], user_id=viewer.id) for name in LIKED])
+    await db.commit()
+    return post.id, ids
+
+
+def names(replies, ids):
+    by_id = {reply_id: name for name, reply_id in ids.items()}
+    return [(by_id[reply["id"]], names(reply["replies"], ids)) if "replies" in reply else by_id[reply["id"]]
+            for reply in replies]
+
+
+async def load_replies(session_factory, post_id, **kwargs):
+    async with session_factory() as db:
+        return await FeedbackService.load_reply_tree(db, post_id, **kwargs)
+
+
+async def test_reply_tree_is_one_statement(engine, session_factory, viewer, thread):
+    post_id, ids = thread
+    with count_statements(engine) as statements:
+        replies = await load_replies(session_factory, post_id, user_id=viewer.id)
+
+    assert names(replies, ids) == [("a", [("a1", [("a1x", [])])]), ("b", [("b1", [])]), ("c", [])]
+    assert len(statements) == 1, statements
+
+
+async def test_flat_replies_keep_creation_order(session_factory, viewer, thread):
+    post_id, ids = thread
+    replies = await load_replies(session_factory, post_id, threaded=False)
+
+    assert names(replies, ids) == [name for name, _, _ in THREAD]
+
+
+@pytest.mark.parametrize("max_depth, expected", [
+    (0, [("a", []), ("b", []), ("c", [])]),
+    (1, [("a", [("a1", [])]), ("b", [("b1", [])]), ("c", [])]),
+])
+async def test_reply_tree_max_depth(session_factory, thread, max_depth, expected):
+    post_id, ids = thread
+    assert names(await load_replies(session_factory, post_id, max_depth=max_depth), ids) == expected
+
+
+async def test_reply_tree_pages_top_level_replies(session_factory, thread):
+    post_id, ids = thread
+    page = await load_replies(session_factory, post_id, limit=1, offset=1)
+
+    assert names(page, ids) == [("b", [("b1", [])])]
+
+
+async def test_reply_user_has_liked(session_factory, viewer, thread):
+    post_id, ids = thread
+    signed_in = await load_replies(session_factory, post_id, user_id=viewer.id, threaded=False)
+    anonymous = await load_replies(session_factory, post_id, threaded=False)
+
+    by_id = {reply_id: name for name, reply_id in ids.items()}
+    assert {by_id[reply["id"]] for reply in signed_in if reply["user_has_liked"]} == LIKED
+    assert not any(reply["user_has_liked"] for reply in anonymous)
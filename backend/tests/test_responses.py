@@ -0,0 +1,164 @@
+# backend/tests/test_responses.py
+# json_response conformance: the same bytes FastAPI sends for response_model=<schema>
+#
+# The reference validates the data with the schema, dumps it in JSON mode and
+# encodes it with Starlette's JSONResponse, which is FastAPI's own path for a
+# returned dict. Feedback payloads are the dictionaries the routes build
+# (recorded from the real route functions on the SQLite test database).
+
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.responses import JSONResponse
+from starlette.requests import Request
+
+from app.models import Calculation, User
+from app.routes import feedback as feedback_routes
+from app.schemas import CalculationPartialResponse, CalculationResponse
+from app.schemas.feedback import (
+    FeedbackPostCreate, FeedbackPostList, FeedbackPostResponse, FeedbackPostUpdate,
+    FeedbackReplyCreate, FeedbackReplyResponse, FeedbackReplyUpdate
+)
+from app.utils.auth_cache import Principal
+from app.utils.responses import json_response
+from app.utils.signing import BundleSigner
+from benchmarks.fixtures import make_bundle
+
+
+def fastapi_body(model, data, exclude=()) -> bytes:
+    """Body FastAPI would send for data with response_model=model"""
+    dumped = model.model_validate(data).model_dump(mode="json", exclude=set(exclude) or None)
+    return JSONResponse(dumped).body
+
+
+def assert_conforms(model, data, exclude=()):
+    assert json_response(model, data, exclude=exclude).body == fastapi_body(model, data, exclude)
+
+
+def calculation(steps: int, seed: int = 42, **overrides) -> Calculation:
+    bundle = make_bundle(random.Random(seed), steps=steps)
+    values = dict(
+        id=bundle["id"],
+        project_id=1,
+        building_type="single-dwelling",
+        calculation_type="cec_load",
+        code_edition="2024",
+        code_type="cec",
+        inputs=bundle["inputs"],
+        results=bundle["results"],
+        steps=bundle["steps"],
+        warnings=bundle["warnings"],
+        engine_version="1.0.0",
+        engine_commit="tests",
+        bundle_hash=BundleSigner.calculate_root_hash(bundle),
+        is_signed=False,
+        created_at=datetime(2024, 1, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+        calculation_time_ms=42,
+    )
+    values.update(overrides)
+    return Calculation(**values)
+
+
+@pytest.mark.parametrize("steps", [0, 13, 1000])
+def test_calculation_response(steps):
+    assert_conforms(CalculationResponse, calculation(steps).to_dict(include_bundle=True))
+
+
+def test_calculation_response_signed_and_deleted():
+    toronto = timezone(timedelta(hours=-5))
+    signed = calculation(
+        13,
+        is_signed=True,
+        signature={"algorithm": "HMAC-SHA256", "value": "abc"},
+        signed_at=datetime(2024, 2, 1, 8, 0, tzinfo=toronto),
+        signed_by="électricien@example.com",
+        deleted_at=datetime(2024, 3, 1, tzinfo=timezone.utc),
+    )
+    assert_conforms(CalculationResponse, signed.to_dict(include_bundle=True))
+
+
+def test_calculation_response_non_ascii_and_nulls():
+    data = calculation(13, warnings=None, engine_version=None, calculation_time_ms=None).to_dict(include_bundle=True)
+    data["inputs"] = {**data["inputs"], "notes": "Sous-sol aménagé, 200 m² — 电"}
+    data["results"] = {**data["results"], "ratio": 0.1 + 0.2, "large": 12345678901234567890}
+    assert_conforms(CalculationResponse, data)
+
+
+@pytest.mark.parametrize("fields", [("inputs",), ("steps", "warnings"), ("results",)])
+def test_calculation_partial_response(fields):
+    data = calculation(100).to_dict(include_bundle=True, fields=fields)
+    if "results" not in fields:
+        data.pop("calculated_load_w", None)
+        data.pop("service_amperage", None)
+    if "steps" in fields:
+        data.update(steps=data["steps"][10:20], steps_offset=10, steps_total=100)
+    exclude = [
+        field for field in ("inputs", "results", "steps", "warnings", "steps_offset", "steps_total",
+                            "calculated_load_w", "service_amperage")
+        if field not in data
+    ]
+    assert_conforms(CalculationPartialResponse, data, exclude)
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+    """(model, data) of every json_response call made by the feedback routes"""
+    calls = []
+
+    def recording_json_response(model, data, *args, **kwargs):
+        calls.append((model, data))
+        return json_response(model, data, *args, **kwargs)
+
+    monkeypatch.setattr(feedback_routes, "json_response", recording_json_response)
+    return calls
+
+
+def viewer_request() -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": [], "client": ("203.0.113.7", 4000)})
+
+
+async def test_feedback_responses(db, recorded):
+    user = User(email="author@example.com", hashed_password="x", full_name="Zoë Tremblay", company=None)
+    db.add(user)
+    await db.commit()
+    principal = Principal(id=user.id, email=user.email, is_active=True, is_superuser=False)
+
+    await feedback_routes.create_post(
+        FeedbackPostCreate(title="Calcul de charge", content="Résultat différent — pourquoi ?", category="question"),
+        current_user=principal, db=db
+    )
+    post_id = recorded[-1][1]["id"]
+    await feedback_routes.update_post(
+        post_id, FeedbackPostUpdate(is_resolved=True), current_user=principal, db=db
+    )
+
+    parent_id = None
+    for depth in range(3):  # A nested thread: reply, reply to it, reply to that
+        await feedback_routes.create_reply(
+            post_id, FeedbackReplyCreate(content=f"Reply {depth}", parent_reply_id=parent_id),
+            current_user=principal, db=db
+        )
+        parent_id = recorded[-1][1]["id"]
+    await feedback_routes.update_reply(
+        parent_id, FeedbackReplyUpdate(content="Edited"), current_user=principal, db=db
+    )
+
+    for threaded in (False, True):
+        await feedback_routes.get_post(
+            post_id, viewer_request(), threaded=threaded, max_depth=None, reply_limit=None, reply_offset=0,
+            current_user=principal, db=db
+        )
+    await feedback_routes.get_posts(
+        page=1, page_size=20, category=None, search=None, sort="newest", current_user=principal, db=db
+    )
+
+    models = [model for model, _ in recorded]
+    assert models.count(FeedbackPostResponse) == 4
+    assert models.count(FeedbackReplyResponse) == 4
+    assert models.count(FeedbackPostList) == 1
+    threaded_post = recorded[-2][1]
+    assert threaded_post["replies"][0]["replies"][0]["replies"], "expected a nested reply tree"
+
+    for model, data in recorded:
+        assert_conforms(model, data)
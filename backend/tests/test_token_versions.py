@@ -0,0 +1,37 @@
+# backend/tests/test_token_versions.py
+# Token revocation: backend selection and deactivation bumping token_version
+
+import pytest
+
+from app.models import User
+from app.services.user_service import UserService
+from app.utils.token_versions import resolve_backend, token_versions
+
+
+@pytest.mark.parametrize("backend, workers, environment, expected", [
+    ("", 1, "production", "memory"),
+    ("", 4, "development", "redis"),
+    ("", 4, "production", "redis"),
+    ("memory", 4, "development", "memory"),
+    ("memory", 1, "production", "memory"),
+    ("redis", 1, "development", "redis"),
+])
+def test_resolve_backend(backend, workers, environment, expected):
+    assert resolve_backend(backend, workers, environment) == expected
+
+
+def test_memory_backend_refused_in_production_with_several_workers():
+    with pytest.raises(RuntimeError):
+        resolve_backend("memory", 4, "production")
+
+
+async def test_deactivation_revokes_tokens(db):
+    user = User(email="member@example.com", hashed_password="x")
+    db.add(user)
+    await db.commit()
+    issued_version = await token_versions.current(db, user.id)
+
+    await UserService.set_user_active(db, user, False)
+
+    assert user.is_active is False
+    assert await token_versions.current(db, user.id) == issued_version + 1